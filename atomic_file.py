@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+ATOMIC FILE
+-----------
+Crash-safe replacement of small files (heads, manifests, checkpoints,
+sidecar metadata).
+
+atomic_write() writes to a uniquely named temp file in the target's
+directory, fsyncs it, renames it over the target and fsyncs the
+directory. A crash leaves either the old contents or the new ones, and
+concurrent writers of the same path never rename each other's
+half-written temp file into place: the last rename wins.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from typing import Any, Union
+
+
+def fsync_file(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_dir(path: str) -> None:
+    fsync_file(os.path.dirname(os.path.abspath(path)) or ".")
+
+
+def atomic_write(path: str, data: Union[str, bytes]) -> os.stat_result:
+    """
+    Replace path with data (str is written as UTF-8). Returns the stat of
+    the file written, which stays valid after the rename even if another
+    writer has replaced path again since.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(f.fileno(), mode)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+    fsync_dir(path)
+    return st
+
+
+def atomic_write_json(path: str, obj: Any, **dump_options: Any) -> os.stat_result:
+    return atomic_write(path, json.dumps(obj, **dump_options))
@@ -1,54 +1,200 @@
 import copy
-from wal import WAL
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+from pmap import PersistentMap
+from wal import open_wal
 
 
 class VersionConflict(Exception):
     pass
 
 
+class Snapshot(Mapping):
+    """
+    Read-only view of one version's map.
+
+    Versions share value objects (only changed keys are copied on write),
+    so a nested list or dict read from one version is the same object in
+    every later version that did not rewrite that key. Values are
+    deep-copied as they are read: callers may mutate what they get back
+    without touching what any later read sees. Opening the view stays
+    O(1); the copy is paid per value read.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, key):
+        return copy.deepcopy(self._data[key])
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __repr__(self):
+        return f"Snapshot({dict(self.items())!r})"
+
+
 class CanonicalState:
     """
     Canonical state with WAL-backed atomic transitions.
     Disk (WAL) is the authority.
+
+    Recent committed versions are retained as immutable maps, so readers
+    can pin and read version N while writers keep committing.
     """
 
-    def __init__(self, wal_path="wal.log"):
-        self.data = {}
+    def __init__(self, wal_path="wal.log", wal=None, checkpoints=None, checkpoint_every=0,
+                 history_limit=64):
+        # Persistent map: transitions share structure with older snapshots
+        self.data = PersistentMap()
         self.version = 0
-        self.wal = WAL(wal_path)
+        # Seq of the last WAL transition reflected in data
+        self.applied_seq = 0
+        # A shared WAL (e.g. group_commit=True) lets several states batch fsyncs
+        self.wal = wal if wal is not None else open_wal(wal_path)
+
+        # Optional CheckpointStore, written every checkpoint_every commits
+        self.checkpoints = checkpoints
+        self.checkpoint_every = checkpoint_every
 
-    def snapshot(self):
-        return copy.deepcopy(self.data)
+        # MVCC: version -> (data, keys changed by that version)
+        self.history_limit = history_limit
+        self._history = {}
+        self._pins = {}
+        self._history_lock = threading.Lock()
+        self._remember(frozenset())
+
+    def restore(self, data, version: int, applied_seq: int):
+        """
+        Reset to a known committed state, e.g. a loaded checkpoint.
+        """
+        self.data = PersistentMap(data)
+        self.version = version
+        self.applied_seq = applied_seq
+        with self._history_lock:
+            self._history.clear()
+        self._remember(frozenset())
+
+    # --- versioned reads ---
+
+    def _remember(self, changed_keys):
+        with self._history_lock:
+            self._history[self.version] = (self.data, changed_keys)
+
+            self._evict()
+
+    def _evict(self):
+        # Oldest unpinned versions fall out of the window
+        excess = len(self._history) - self.history_limit
+        for v in sorted(self._history):
+            if excess <= 0:
+                break
+            if v != self.version and not self._pins.get(v):
+                del self._history[v]
+                excess -= 1
+
+    def snapshot(self, version=None):
+        """
+        Stable read-only view of the state at version (default: current).
+        O(1): later transitions build new maps and never touch this one.
+        Values are copied as they are read (see Snapshot).
+        """
+        if version is None:
+            return Snapshot(self.data)
+        with self._history_lock:
+            if version not in self._history:
+                raise KeyError(f"version {version} is not retained")
+            return Snapshot(self._history[version][0])
+
+    @contextmanager
+    def pin(self, version=None):
+        """
+        Keep version retained while the block reads it.
+        Yields a Snapshot; never blocks, and copies only the values read.
+        """
+        with self._history_lock:
+            if version is None:
+                version = self.version
+            if version not in self._history:
+                raise KeyError(f"version {version} is not retained")
+            self._pins[version] = self._pins.get(version, 0) + 1
+            view = Snapshot(self._history[version][0])
+        try:
+            yield view
+        finally:
+            with self._history_lock:
+                self._pins[version] -= 1
+                if not self._pins[version]:
+                    del self._pins[version]
+                    self._evict()
+
+    def changed_since(self, version: int):
+        """
+        Keys written by versions after version, or None when part of
+        that range is no longer retained.
+        """
+        keys = set()
+        with self._history_lock:
+            for v in range(version + 1, self.version + 1):
+                if v not in self._history:
+                    return None
+                keys |= self._history[v][1]
+        return keys
 
     def apply_transition(self, event: dict):
         """
         Deterministic, idempotent transition.
+        Copies only the changed keys' values and the trie paths leading to them.
         """
-        new_data = self.snapshot()
+        return self._apply_to(self.data, event)
 
+    @staticmethod
+    def _apply_to(data, event: dict):
         # Simple idempotent key-value merge
-        for k, v in event.items():
-            new_data[k] = v
-
-        return new_data
+        return data.update(
+            (k, copy.deepcopy(v)) for k, v in event.items()
+        )
 
     def _current_committed_version(self):
         """
         Count committed transitions in WAL.
-        Disk truth.
+        Disk truth, read from the WAL's incremental tail index.
         """
-        entries = self.wal.read_all()
-        committed = 0
-        for e in entries:
-            if e.get("status") == "committed":
-                committed += 1
-        return committed
+        return self.wal.committed_count()
 
     def transition(self, event: dict, expected_version: int) -> bool:
         """
         Atomic transition with strict version assertion.
         """
+        return self._transition(
+            {"event": event, "version_before": self.version},
+            [event],
+            expected_version,
+        )
 
+    def transition_many(self, events: list, expected_version: int) -> bool:
+        """
+        Apply a batch of events as one atomic transition:
+        one version check, one WAL record, one commit marker.
+        Either every event is applied or none is.
+        """
+        return self._transition(
+            {"events": list(events), "version_before": self.version},
+            events,
+            expected_version,
+        )
+
+    def _transition(self, record: dict, events, expected_version: int) -> bool:
         # --- Sync with WAL ---
         canonical_version = self._current_committed_version()
 
@@ -63,21 +209,116 @@ class CanonicalState:
             )
 
         # --- Step 1: Write pending ---
-        seq = self.wal.append({
-            "event": event,
-            "version_before": self.version
-        })
+        seq = self.wal.append(record)
 
         # --- Step 2: Apply ---
         try:
-            new_data = self.apply_transition(event)
+            new_data = self.data
+            for event in events:
+                new_data = self._apply_to(new_data, event)
         except Exception as e:
             self.wal.mark_failed(seq, str(e))
             return False
 
         # --- Step 3: Commit ---
-        self.data = new_data
-        self.version += 1
         self.wal.mark_committed(seq)
+        self._advance(new_data, seq, events)
+
+        if self.checkpoint_every and self.version % self.checkpoint_every == 0:
+            self.checkpoint()
 
         return True
+
+    def _advance(self, new_data, seq, events):
+        self.data = new_data
+        self.version += 1
+        self.applied_seq = max(self.applied_seq, seq)
+        self._remember(frozenset(k for event in events for k in event))
+
+    # --- replay ---
+
+    def replay(self, entries) -> int:
+        """
+        Fold committed WAL transitions into state in a single pass.
+        Only transitions still awaiting their marker are held in memory.
+        Returns the number of versions applied.
+        """
+        in_flight = {}
+        applied = 0
+        # Markers may arrive out of seq order, so only the starting point filters
+        floor = self.applied_seq
+
+        for entry in entries:
+            status = entry.get("status")
+            seq = entry.get("seq")
+
+            if seq is None or seq <= floor:
+                continue
+
+            if status == "pending":
+                in_flight[seq] = entry
+
+            elif status == "failed":
+                in_flight.pop(seq, None)
+
+            elif status == "committed":
+                pending = in_flight.pop(seq, None)
+                if pending is None:
+                    continue
+
+                transition_block = pending.get("transition", {})
+
+                # Schema-tolerant extraction
+                if not isinstance(transition_block, dict):
+                    continue
+                if isinstance(transition_block.get("events"), list):
+                    events = transition_block["events"]
+                else:
+                    events = [transition_block.get("event", transition_block)]
+
+                # A batch record holds many events under one commit marker
+                new_data = self.data
+                for event in events:
+                    new_data = self._apply_to(new_data, event)
+                self._advance(new_data, seq, events)
+                applied += 1
+
+        return applied
+
+    def refresh(self) -> int:
+        """
+        Catch up with transitions committed by other writers of the WAL.
+        Returns the number of versions applied.
+        """
+        return self.replay(self.wal.iter_entries(from_seq=self.applied_seq + 1))
+
+    def transition_with_retry(self, event: dict, expected_version: int, retries: int = 3) -> bool:
+        """
+        Optimistic transition. On VersionConflict, catch up with the WAL
+        and retry on the latest version, provided no commit since
+        expected_version wrote any of this event's keys. An expected_version
+        ahead of the WAL is never rebased: the conflict is raised.
+        """
+        for attempt in range(retries + 1):
+            try:
+                return self.transition(event, expected_version)
+            except VersionConflict:
+                if attempt == retries:
+                    raise
+
+                self.refresh()
+                if expected_version > self.version:
+                    raise
+                changed = self.changed_since(expected_version)
+                if changed is None or changed & set(event):
+                    raise
+
+                expected_version = self.version
+
+    def checkpoint(self):
+        """
+        Persist data/version tagged with the last applied WAL seq.
+        """
+        if self.checkpoints is None:
+            return None
+        return self.checkpoints.write(self.data, self.version, self.applied_seq)
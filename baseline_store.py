@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+BASELINE STORE
+--------------
+Drift baselines kept as mergeable count sketches, one per time bucket
+(drift_baseline.d/bucket-<start>.json), instead of one snapshot
+recomputed from the whole ledger.
+
+Each bucket holds exact event-type counts and transition-pair counts, or
+a Count-Min sketch for transitions when pair cardinality is high. Sketches
+from any range of buckets merge by addition, so "last hour vs last 30
+days" reads ~720 small files instead of rescanning 30 days of events.
+ingest() only reads ledger records appended since the previous call.
+
+Usage:
+  python baseline_store.py ingest
+  python baseline_store.py show --since 2026-03-01T00:00:00+00:00
+  python drift_detector.py --store --current 1h --baseline 30d
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from atomic_file import atomic_write_json
+from ledger_index import to_epoch
+from ledger_reader import iter_records, record_at
+
+STORE_DEFAULT = "drift_baseline.d"
+BUCKET_SECONDS = 3600
+
+Pair = Tuple[str, str]
+
+
+def _pair_key(pair: Pair) -> str:
+    return f"{pair[0]}->{pair[1]}"
+
+
+class CountMin:
+    """
+    Count-Min sketch over string keys. Row hashes come from blake2b with a
+    per-row salt, so sketches built in different processes merge.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4, table: Optional[List[List[int]]] = None):
+        self.width = width
+        self.depth = depth
+        self.table = table if table is not None else [[0] * width for _ in range(depth)]
+        self.total = sum(self.table[0]) if self.table else 0
+
+    def _cols(self, key: str) -> List[int]:
+        data = key.encode("utf-8")
+        return [
+            int.from_bytes(hashlib.blake2b(data, digest_size=8, salt=row.to_bytes(16, "little")).digest(),
+                           "little") % self.width
+            for row in range(self.depth)
+        ]
+
+    def add(self, key: str, n: int = 1) -> None:
+        for row, col in enumerate(self._cols(key)):
+            self.table[row][col] += n
+        self.total += n
+
+    def estimate(self, key: str) -> int:
+        return min(self.table[row][col] for row, col in enumerate(self._cols(key)))
+
+    def merge(self, other: "CountMin") -> None:
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("cannot merge Count-Min sketches of different shapes")
+        for mine, theirs in zip(self.table, other.table):
+            for i, v in enumerate(theirs):
+                if v:
+                    mine[i] += v
+        self.total += other.total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"width": self.width, "depth": self.depth, "table": self.table}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "CountMin":
+        return cls(d["width"], d["depth"], d["table"])
+
+
+class Sketch:
+    """
+    Counts for a contiguous run of events. first/last type are kept so
+    that merging adjacent sketches also counts the transition across the
+    boundary, making merge(a, b) equal to counting a+b directly.
+    """
+
+    def __init__(self, cms: Optional[Tuple[int, int]] = None):
+        self.total = 0
+        self.types: Counter = Counter()
+        self.transitions: Optional[Counter] = None if cms else Counter()
+        self.cms: Optional[CountMin] = CountMin(*cms) if cms else None
+        self.first: Optional[str] = None
+        self.last: Optional[str] = None
+
+    def _add_pair(self, pair: Pair, n: int = 1) -> None:
+        if self.cms is not None:
+            self.cms.add(_pair_key(pair), n)
+        else:
+            self.transitions[pair] += n
+
+    def add(self, t: str) -> None:
+        if self.last is not None:
+            self._add_pair((self.last, t))
+        if self.first is None:
+            self.first = t
+        self.last = t
+        self.types[t] += 1
+        self.total += 1
+
+    def merge(self, other: "Sketch") -> "Sketch":
+        """Append other (the later run) into self; returns self."""
+        if other.total == 0:
+            return self
+        if (self.cms is None) != (other.cms is None):
+            raise ValueError("cannot merge exact and Count-Min transition sketches")
+
+        if self.last is not None and other.first is not None:
+            self._add_pair((self.last, other.first))
+        if self.cms is not None:
+            self.cms.merge(other.cms)
+        else:
+            self.transitions.update(other.transitions)
+
+        self.types.update(other.types)
+        self.total += other.total
+        if self.first is None:
+            self.first = other.first
+        self.last = other.last
+        return self
+
+    # --- distributions ---
+
+    def type_distribution(self) -> Dict[str, float]:
+        return {k: v / self.total for k, v in self.types.items()} if self.total else {}
+
+    def transition_total(self) -> int:
+        return self.cms.total if self.cms is not None else sum(self.transitions.values())
+
+    def transition_estimate(self, pair: Pair) -> int:
+        if self.cms is not None:
+            return self.cms.estimate(_pair_key(pair))
+        return self.transitions.get(pair, 0)
+
+    # --- persistence ---
+
+    def to_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {
+            "total": self.total,
+            "types": dict(self.types),
+            "first": self.first,
+            "last": self.last,
+        }
+        if self.cms is not None:
+            d["cms"] = self.cms.to_dict()
+        else:
+            d["transitions"] = {_pair_key(p): n for p, n in self.transitions.items()}
+        return d
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Sketch":
+        s = cls()
+        s.total = d["total"]
+        s.types = Counter(d["types"])
+        s.first, s.last = d.get("first"), d.get("last")
+        if "cms" in d:
+            s.transitions = None
+            s.cms = CountMin.from_dict(d["cms"])
+        else:
+            s.transitions = Counter({tuple(k.split("->", 1)): n for k, n in d["transitions"].items()})
+        return s
+
+
+def transition_drift(current: Sketch, baseline: Sketch) -> float:
+    """
+    L1 distance between transition distributions. When either side is a
+    Count-Min sketch the candidate pairs are every (a, b) over the current
+    window's event types (pairs can only be drawn from those); baseline
+    mass on other pairs is counted once as the remainder.
+    """
+    cur_total = current.transition_total()
+    base_total = baseline.transition_total()
+    if not cur_total or not base_total:
+        return 0.0
+
+    if current.transitions is not None and baseline.transitions is not None:
+        keys = set(current.transitions) | set(baseline.transitions)
+        return sum(abs(current.transitions.get(k, 0) / cur_total - baseline.transitions.get(k, 0) / base_total)
+                   for k in keys)
+
+    score = 0.0
+    covered = 0.0
+    for a in current.types:
+        for b in current.types:
+            c = current.transition_estimate((a, b)) / cur_total
+            base = min(baseline.transition_estimate((a, b)) / base_total, 1.0)
+            covered += base
+            score += abs(c - base)
+    return score + max(0.0, 1.0 - covered)
+
+
+def parse_duration(s: str) -> float:
+    """'90', '15m', '1h', '30d', '2w' -> seconds."""
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*", s)
+    if not m:
+        raise ValueError(f"bad duration: {s!r}")
+    scale = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}[m.group(2)]
+    return float(m.group(1)) * scale
+
+
+class BaselineStore:
+    def __init__(self, directory: str = STORE_DEFAULT, bucket_seconds: int = BUCKET_SECONDS,
+                 cms: Optional[Tuple[int, int]] = None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        meta = self._load_json("meta.json")
+        if meta is None:
+            meta = {"bucket_seconds": bucket_seconds, "cms": list(cms) if cms else None, "ledgers": {}}
+            self._save_json("meta.json", meta)
+        self.meta = meta
+        # The store's own settings win: buckets and sketches must stay mergeable
+        self.bucket_seconds = meta["bucket_seconds"]
+        self.cms = tuple(meta["cms"]) if meta["cms"] else None
+
+    # --- files ---
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load_json(self, name: str) -> Optional[Any]:
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _save_json(self, name: str, obj: Any) -> None:
+        atomic_write_json(self._path(name), obj)
+
+    def _bucket_name(self, start: int) -> str:
+        return f"bucket-{start:012d}.json"
+
+    def bucket_starts(self) -> List[int]:
+        names = glob.glob(self._path("bucket-*.json"))
+        return sorted(int(os.path.basename(n)[7:-5]) for n in names)
+
+    def load_bucket(self, start: int) -> Sketch:
+        d = self._load_json(self._bucket_name(start))
+        return Sketch.from_dict(d) if d else Sketch(self.cms)
+
+    # --- ingest ---
+
+    def _stale(self, event_file: str, pos: Dict[str, Any], size: int) -> bool:
+        """True if the ingested prefix of event_file no longer matches it."""
+        if size < pos["offset"]:
+            return True
+        last = pos.get("last")
+        if last is None:
+            return False
+        rec = record_at(event_file, last[0], pos["offset"], ("hash",))
+        return rec is None or rec.get("hash") != last[1]
+
+    def clear(self) -> None:
+        """Drop every bucket and forget how far each ledger was ingested."""
+        for start in self.bucket_starts():
+            os.remove(self._path(self._bucket_name(start)))
+        self.meta["ledgers"] = {}
+        self._save_json("meta.json", self.meta)
+
+    def ingest(self, event_file: str) -> int:
+        """
+        Fold records appended to event_file since the last ingest into
+        buckets. If the ledger was truncated or rewritten, counts already
+        folded in cannot be taken back, so the store is cleared and every
+        ledger it knows is folded in again from the start.
+        """
+        if not os.path.exists(event_file):
+            return 0
+
+        key = os.path.abspath(event_file)
+        pos = self.meta["ledgers"].get(key)
+        if pos is not None and self._stale(event_file, pos, os.path.getsize(event_file)):
+            others = [k for k in self.meta["ledgers"] if k != key and os.path.exists(k)]
+            self.clear()
+            for other in others:
+                self._fold(other)
+        return self._fold(key)
+
+    def _fold(self, key: str) -> int:
+        pos = self.meta["ledgers"].get(key, {"offset": 0, "line": 0, "ts": None, "last": None})
+
+        touched: Dict[int, Sketch] = {}
+        offset, line, last_ts, last = pos["offset"], pos["line"], pos["ts"], pos.get("last")
+        n = 0
+
+        # A line still being appended is picked up next time
+        for idx, start, end, rec in iter_records(key, ("type", "ts", "hash"), offset, line,
+                                                 skip_errors=True, complete_only=True):
+            ts = to_epoch(rec.get("ts"))
+            if ts is None:
+                ts = last_ts if last_ts is not None else time.time()
+            last_ts = ts
+
+            bucket = int(ts // self.bucket_seconds) * self.bucket_seconds
+            sketch = touched.get(bucket)
+            if sketch is None:
+                sketch = touched[bucket] = self.load_bucket(bucket)
+            t = rec.get("type", "unknown")
+            sketch.add(t if isinstance(t, str) else "unknown")
+
+            offset, line, last = end, idx, [start, rec.get("hash")]
+            n += 1
+
+        for bucket, sketch in touched.items():
+            self._save_json(self._bucket_name(bucket), sketch.to_dict())
+        self.meta["ledgers"][key] = {"offset": offset, "line": line, "ts": last_ts, "last": last}
+        self._save_json("meta.json", self.meta)
+        return n
+
+    # --- queries ---
+
+    def merged(self, since: Optional[float] = None, until: Optional[float] = None) -> Sketch:
+        """One sketch over buckets whose start lies in [since, until)."""
+        out = Sketch(self.cms)
+        for start in self.bucket_starts():
+            if since is not None and start < since:
+                continue
+            if until is not None and start >= until:
+                continue
+            out.merge(self.load_bucket(start))
+        return out
+
+    def latest(self) -> Optional[float]:
+        """End of the newest bucket (the store's notion of 'now')."""
+        starts = self.bucket_starts()
+        return starts[-1] + self.bucket_seconds if starts else None
+
+    def compare(self, current: float, baseline: float, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Current window = last `current` seconds; baseline = the `baseline`
+        seconds before it. Windows are whole buckets: the current one
+        starts at the bucket holding now - current. Returns both sketches
+        and their drift scores.
+        """
+        if now is None:
+            now = self.latest() or time.time()
+        cur_start = (now - current) // self.bucket_seconds * self.bucket_seconds
+        cur = self.merged(cur_start, now)
+        base = self.merged(cur_start - baseline, cur_start)
+
+        keys = set(cur.types) | set(base.types)
+        cur_dist, base_dist = cur.type_distribution(), base.type_distribution()
+        type_drift = sum(abs(cur_dist.get(k, 0.0) - base_dist.get(k, 0.0)) for k in keys)
+
+        return {
+            "current": cur,
+            "baseline": base,
+            "type_drift": type_drift if cur.total and base.total else None,
+            "transition_drift": transition_drift(cur, base) if cur.total and base.total else None,
+        }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Per-bucket mergeable drift baselines")
+    ap.add_argument("--store", default=STORE_DEFAULT)
+    ap.add_argument("--bucket", type=int, default=BUCKET_SECONDS, help="bucket width (s), new stores only")
+    ap.add_argument("--cms", default=None, metavar="WIDTHxDEPTH",
+                    help="Count-Min sketch for transitions, e.g. 2048x4 (new stores only)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_ing = sub.add_parser("ingest")
+    p_ing.add_argument("--events", default="events.jsonl")
+    p_show = sub.add_parser("show")
+    p_show.add_argument("--since")
+    p_show.add_argument("--until")
+    args = ap.parse_args()
+
+    cms = tuple(int(x) for x in args.cms.lower().split("x")) if args.cms else None
+    store = BaselineStore(args.store, args.bucket, cms)
+
+    if args.cmd == "ingest":
+        n = store.ingest(args.events)
+        print("BASELINE INGEST OK")
+        print("new_events:", n)
+        print("buckets:", len(store.bucket_starts()))
+        return 0
+
+    def bound(v: Optional[str]) -> Optional[float]:
+        if v is None:
+            return None
+        try:
+            return float(v)
+        except ValueError:
+            return to_epoch(v)
+
+    s = store.merged(bound(args.since), bound(args.until))
+    out = s.to_dict()
+    if s.cms is not None:
+        # The table itself is not useful to read
+        out["cms"] = {"width": s.cms.width, "depth": s.cms.depth, "total": s.cms.total}
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
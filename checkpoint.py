@@ -0,0 +1,68 @@
+import hashlib
+import json
+import os
+
+from atomic_file import atomic_write_json
+
+
+class CheckpointStore:
+    """
+    Atomic snapshots of CanonicalState.
+    Each checkpoint holds data and version plus the last WAL seq it covers,
+    so recovery only replays WAL entries after that seq.
+    """
+
+    PREFIX = "checkpoint-"
+    SUFFIX = ".json"
+
+    def __init__(self, directory="checkpoints", keep=3):
+        self.directory = directory
+        self.keep = keep
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def _digest(body: dict) -> str:
+        payload = json.dumps(body, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _paths(self):
+        """Checkpoint files, newest first."""
+        names = [
+            n for n in os.listdir(self.directory)
+            if n.startswith(self.PREFIX) and n.endswith(self.SUFFIX)
+        ]
+        return [os.path.join(self.directory, n) for n in sorted(names, reverse=True)]
+
+    def write(self, data: dict, version: int, seq: int) -> str:
+        """
+        Write a checkpoint via tmp file + fsync + rename.
+        Returns the checkpoint path.
+        """
+        body = {"seq": seq, "version": version, "data": dict(data)}
+        record = dict(body, sha256=self._digest(body))
+
+        path = os.path.join(self.directory, f"{self.PREFIX}{seq:012d}{self.SUFFIX}")
+        atomic_write_json(path, record, separators=(",", ":"))
+
+        for old in self._paths()[self.keep:]:
+            os.remove(old)
+
+        return path
+
+    def latest(self):
+        """
+        Newest checkpoint that parses and matches its digest, or None.
+        Torn or corrupt checkpoints are skipped.
+        """
+        for path in self._paths():
+            try:
+                with open(path, "r") as f:
+                    record = json.load(f)
+                body = {k: record[k] for k in ("seq", "version", "data")}
+            except (ValueError, KeyError, OSError):
+                continue
+
+            if record.get("sha256") == self._digest(body):
+                return body
+
+        return None
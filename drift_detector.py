@@ -8,16 +8,30 @@ Outputs:
 - event distribution
 - transition entropy
 - drift score vs baseline
+
+--follow tails the ledger and reports the same scores continuously over
+a sliding window (last N events) and tumbling windows (each block of N).
+
+--store compares a recent range against a longer baseline range using
+the per-bucket sketches in baseline_store.py, without rescanning.
 """
 
+import argparse
 import json
 import math
-from collections import Counter, defaultdict
+import time
+from collections import Counter, defaultdict, deque
 from pathlib import Path
 
+from baseline_store import STORE_DEFAULT, BaselineStore, parse_duration
+from ledger_columns import ColumnStore
+from ledger_reader import follow, load_records
+
 EVENT_FILE = "events.jsonl"
 BASELINE_FILE = "drift_baseline.json"
 
+DRIFT_THRESHOLD = 0.25
+
 
 # -----------------------------
 # helpers
@@ -29,17 +43,8 @@ def load_events():
         print("NO EVENTS FILE")
         return []
 
-    events = []
-    with open(p, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                events.append(json.loads(line))
-            except Exception:
-                continue
-    return events
+    # Only the event type is needed; skip full JSON decoding where possible
+    return list(load_records(str(p), fields=("type",)))
 
 
 def event_types(events):
@@ -103,16 +108,23 @@ def drift_score(current, baseline):
 def analyze(events):
 
     types = event_types(events)
-    type_count = Counter(types)
-    type_dist = normalize(type_count)
+    return analyze_counts(len(events), Counter(types), transitions(types))
+
+
+def analyze_columns(store):
+    """Same stats as analyze(), from the columnar store (vectorized counts)."""
+    return analyze_counts(store.rows, store.counts("type"), store.transitions("type"))
+
 
-    trans_count = transitions(types)
+def analyze_counts(total, type_count, trans_count):
+
+    type_dist = normalize(type_count)
     trans_dist = normalize(trans_count)
 
     trans_entropy = entropy(trans_dist)
 
     stats = {
-        "total_events": len(events),
+        "total_events": total,
         "type_distribution": type_dist,
         "transition_distribution": {
             f"{a}->{b}": v for (a, b), v in trans_dist.items()
@@ -142,21 +154,222 @@ def pretty_print(stats, drift=None):
 
     if drift is not None:
         print("DRIFT SCORE:", f"{drift:.6f}")
-        if drift > 0.25:
+        if drift > DRIFT_THRESHOLD:
             print("⚠ BEHAVIORAL DRIFT DETECTED")
         else:
             print("STABLE BEHAVIOR")
 
 
-def main():
+# -----------------------------
+# streaming (--follow)
+# -----------------------------
+
+class SlidingWindow:
+    """
+    Type and transition counts over the last `size` events. Each push
+    adjusts the counters for the event entering and the one leaving, so
+    an update is O(1) and memory is bounded by the window.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.types = deque()
+        self.type_count = Counter()
+        self.trans_count = Counter()
+
+    def push(self, t):
+        if self.types:
+            self.trans_count[(self.types[-1], t)] += 1
+        self.types.append(t)
+        self.type_count[t] += 1
+
+        if len(self.types) > self.size:
+            old = self.types.popleft()
+            _dec(self.type_count, old)
+            _dec(self.trans_count, (old, self.types[0]))
+
+    def stats(self):
+        return analyze_counts(len(self.types), self.type_count, self.trans_count)
+
+
+class TumblingWindow:
+    """Counts over consecutive, non-overlapping blocks of `size` events."""
+
+    def __init__(self, size):
+        self.size = size
+        self.index = 0
+        self._reset()
+
+    def _reset(self):
+        self.n = 0
+        self.last = None
+        self.type_count = Counter()
+        self.trans_count = Counter()
+
+    def push(self, t):
+        """Add one event; returns the closed window's stats when it fills."""
+        if self.last is not None:
+            self.trans_count[(self.last, t)] += 1
+        self.last = t
+        self.type_count[t] += 1
+        self.n += 1
+
+        if self.n < self.size:
+            return None
+        stats = analyze_counts(self.n, self.type_count, self.trans_count)
+        self.index += 1
+        self._reset()
+        return stats
+
+
+def _dec(counter, key):
+    counter[key] -= 1
+    if counter[key] <= 0:
+        del counter[key]
+
+
+def emit(kind, stats, reference, as_json, **extra):
+    drift = None
+    if reference is not None:
+        drift = drift_score(stats["type_distribution"], reference)
+
+    if as_json:
+        print(json.dumps({
+            "ts": time.time(),
+            "window": kind,
+            "events": stats["total_events"],
+            "transition_entropy": stats["transition_entropy"],
+            "drift": drift,
+            "alert": drift is not None and drift > DRIFT_THRESHOLD,
+            **extra,
+        }), flush=True)
+        return
+
+    line = f"[{kind}] n={stats['total_events']} entropy={stats['transition_entropy']:.6f}"
+    if drift is not None:
+        line += f" drift={drift:.6f}"
+        if drift > DRIFT_THRESHOLD:
+            line += " ⚠ BEHAVIORAL DRIFT DETECTED"
+    for k, v in extra.items():
+        line += f" {k}={v}"
+    print(line, flush=True)
+
+
+def follow_drift(window=500, tumble=1000, emit_every=50, poll=0.5,
+                 from_start=False, as_json=False, idle=None):
+    """
+    Tail EVENT_FILE and report drift as events arrive. Drift is measured
+    against drift_baseline.json; without one, the first tumbling window
+    becomes the reference.
+    """
+    baseline = load_baseline()
+    reference = baseline.get("type_distribution") if baseline else None
+
+    sliding = SlidingWindow(window) if window else None
+    tumbling = TumblingWindow(tumble) if tumble else None
+    seen = 0
+
+    for _idx, _start, _end, rec in follow(EVENT_FILE, ("type",), poll, from_start, idle):
+        t = rec.get("type", "unknown")
+        seen += 1
+
+        if tumbling is not None:
+            closed = tumbling.push(t)
+            if closed is not None:
+                if reference is None:
+                    reference = closed["type_distribution"]
+                    emit("tumbling", closed, None, as_json, index=tumbling.index, baseline="set")
+                else:
+                    emit("tumbling", closed, reference, as_json, index=tumbling.index)
+
+        if sliding is not None:
+            sliding.push(t)
+            if seen % emit_every == 0:
+                emit("sliding", sliding.stats(), reference, as_json)
+
+    return 0
+
 
-    events = load_events()
+def store_drift(directory, current, baseline):
+    store = BaselineStore(directory)
+    store.ingest(EVENT_FILE)
+    result = store.compare(parse_duration(current), parse_duration(baseline))
 
-    if not events:
+    cur, base = result["current"], result["baseline"]
+    if not cur.total:
         print("No events found.")
         return 1
 
-    current = analyze(events)
+    stats = analyze_counts(cur.total, cur.types, cur.transitions or Counter())
+    if cur.cms is not None:
+        # Entropy needs the pair keys, which a Count-Min sketch does not keep
+        stats["transition_entropy"] = float("nan")
+    pretty_print(stats)
+
+    print(f"WINDOW: last {current} vs previous {baseline} ({base.total} baseline events)")
+    drift = result["type_drift"]
+    if drift is None:
+        print("NO BASELINE EVENTS IN RANGE")
+        return 0
+
+    print("TRANSITION DRIFT:", f"{result['transition_drift']:.6f}")
+    print("DRIFT SCORE:", f"{drift:.6f}")
+    if drift > DRIFT_THRESHOLD:
+        print("⚠ BEHAVIORAL DRIFT DETECTED")
+    else:
+        print("STABLE BEHAVIOR")
+    return 0
+
+
+def main():
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--columnar", action="store_true",
+                    help="analyze from the ledger_columns.py store (synced first)")
+    ap.add_argument("--follow", action="store_true",
+                    help="tail the ledger and report windowed drift continuously")
+    ap.add_argument("--window", type=int, default=500, help="sliding window size in events (0 disables)")
+    ap.add_argument("--tumble", type=int, default=1000, help="tumbling window size in events (0 disables)")
+    ap.add_argument("--emit-every", type=int, default=50, help="report the sliding window every N events")
+    ap.add_argument("--poll", type=float, default=0.5, help="seconds between checks for new events")
+    ap.add_argument("--from-start", action="store_true", help="replay the existing ledger before tailing")
+    ap.add_argument("--json", action="store_true", help="one JSON object per report")
+    ap.add_argument("--store", nargs="?", const=STORE_DEFAULT, default=None, metavar="DIR",
+                    help="compare time ranges using the bucketed baseline store")
+    ap.add_argument("--current", default="1h", help="recent range for --store (e.g. 15m, 1h)")
+    ap.add_argument("--baseline", default="30d", help="baseline range before it for --store")
+    args = ap.parse_args()
+
+    if args.store:
+        return store_drift(args.store, args.current, args.baseline)
+
+    if args.follow:
+        try:
+            return follow_drift(args.window, args.tumble, max(1, args.emit_every), args.poll,
+                                args.from_start, args.json)
+        except KeyboardInterrupt:
+            return 0
+
+    if args.columnar:
+        if not Path(EVENT_FILE).exists():
+            print("NO EVENTS FILE")
+            print("No events found.")
+            return 1
+        store = ColumnStore(EVENT_FILE)
+        store.sync()
+        if not store.rows:
+            print("No events found.")
+            return 1
+        current = analyze_columns(store)
+    else:
+        events = load_events()
+
+        if not events:
+            print("No events found.")
+            return 1
+
+        current = analyze(events)
+
     baseline = load_baseline()
 
     if baseline is None:
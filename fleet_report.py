@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+FLEET REPORT
+------------
+model_reveal / drift_detector over many ledgers at once.
+
+Each ledger matching the globs is streamed through a worker process into
+type, actor, outcome and transition Counters; the partial Counters are then
+merged into a fleet-wide summary. Per ledger: event count, transition
+entropy and drift against the fleet distribution (and against
+drift_baseline.json with --baseline).
+
+Usage:
+  python fleet_report.py 'runs/*/events.jsonl' 'runs/*/events.saferoom.jsonl'
+  python fleet_report.py '**/events*.jsonl' --jobs 8 --json > fleet.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from drift_detector import DRIFT_THRESHOLD, analyze_counts, drift_score, load_baseline, normalize
+from model_reveal import iter_events, now_iso, print_section, summarize
+
+COUNTERS = ("types", "actors", "outcomes", "transitions")
+
+
+def summarize_ledger(path: str) -> Dict[str, Any]:
+    """
+    Worker: model_reveal.summarize() for one ledger (picklable Counters).
+    Records are streamed into the Counters, so a worker holds the counts,
+    never the ledger.
+    """
+    try:
+        s = summarize(iter_events(path))
+    except (OSError, ValueError) as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+    s["path"] = path
+    return s
+
+
+def merge(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    fleet: Dict[str, Any] = {"total": 0, **{k: Counter() for k in COUNTERS}}
+    for s in summaries:
+        fleet["total"] += s["total"]
+        for k in COUNTERS:
+            fleet[k].update(s[k])
+    return fleet
+
+
+def expand(patterns: List[str]) -> List[str]:
+    paths = set()
+    for pattern in patterns:
+        paths.update(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+    # Largest first so one big ledger does not start last and hold up the pool
+    return sorted(paths, key=lambda p: (-os.path.getsize(p), p))
+
+
+def run(paths: List[str], jobs: int = 0) -> List[Dict[str, Any]]:
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) <= 1:
+        results = [summarize_ledger(p) for p in paths]
+    else:
+        with multiprocessing.Pool(min(jobs, len(paths))) as pool:
+            results = list(pool.imap_unordered(summarize_ledger, paths))
+    return sorted(results, key=lambda s: s["path"])
+
+
+def report(summaries: List[Dict[str, Any]], baseline: Optional[Dict[str, float]] = None,
+           top: Optional[int] = 20) -> Dict[str, Any]:
+    """Per-ledger rows plus the merged fleet summary; top=None keeps every transition."""
+    ok = [s for s in summaries if "error" not in s]
+    fleet = merge(ok)
+    fleet_stats = analyze_counts(fleet["total"], fleet["types"], fleet["transitions"])
+    fleet_dist = fleet_stats["type_distribution"]
+
+    ledgers = []
+    for s in summaries:
+        if "error" in s:
+            ledgers.append({"path": s["path"], "error": s["error"]})
+            continue
+        stats = analyze_counts(s["total"], s["types"], s["transitions"])
+        row = {
+            "path": s["path"],
+            "events": s["total"],
+            "transition_entropy": stats["transition_entropy"],
+            "drift_vs_fleet": drift_score(stats["type_distribution"], fleet_dist) if s["total"] else None,
+            "types": dict(s["types"]),
+            "actors": dict(s["actors"]),
+            "outcomes": dict(s["outcomes"]),
+        }
+        if baseline is not None and s["total"]:
+            row["drift_vs_baseline"] = drift_score(stats["type_distribution"], baseline)
+        ledgers.append(row)
+
+    return {
+        "ts": now_iso(),
+        "ledgers": ledgers,
+        "fleet": {
+            "ledgers": len(ok),
+            "events": fleet["total"],
+            "transition_entropy": fleet_stats["transition_entropy"],
+            "type_distribution": fleet_dist,
+            "actor_distribution": normalize(fleet["actors"]),
+            "outcome_distribution": normalize(fleet["outcomes"]),
+            "types": dict(fleet["types"]),
+            "actors": dict(fleet["actors"]),
+            "outcomes": dict(fleet["outcomes"]),
+            "top_transitions": [
+                {"from": a, "to": b, "count": n} for (a, b), n in fleet["transitions"].most_common(top)
+            ],
+        },
+    }
+
+
+def pretty_print(rep: Dict[str, Any]) -> None:
+    print("=== FLEET REPORT ===")
+    print("ts:", rep["ts"])
+
+    print_section("PER LEDGER")
+    for row in rep["ledgers"]:
+        if "error" in row:
+            print(f"{row['path']}\n    ERROR {row['error']}")
+            continue
+        line = f"{row['path']}\n    events={row['events']} entropy={row['transition_entropy']:.6f}"
+        if row["drift_vs_fleet"] is not None:
+            line += f" drift_vs_fleet={row['drift_vs_fleet']:.6f}"
+        if "drift_vs_baseline" in row:
+            line += f" drift_vs_baseline={row['drift_vs_baseline']:.6f}"
+            if row["drift_vs_baseline"] > DRIFT_THRESHOLD:
+                line += " ⚠ BEHAVIORAL DRIFT DETECTED"
+        print(line)
+
+    fleet = rep["fleet"]
+    print_section("FLEET")
+    print("ledgers:", fleet["ledgers"])
+    print("total_events:", fleet["events"])
+    print("transition_entropy:", f"{fleet['transition_entropy']:.6f}")
+
+    for title, key in (("EVENT TYPE DISTRIBUTION", "types"), ("ACTOR DISTRIBUTION", "actors"),
+                       ("OUTCOME DISTRIBUTION", "outcomes")):
+        print_section(title)
+        for k, v in Counter(fleet[key]).most_common():
+            print(f"{k:25s} {v}")
+
+    print_section("TOP TRANSITIONS (behavior flow)")
+    for t in fleet["top_transitions"]:
+        print(f"{t['from']} -> {t['to']} : {t['count']}")
+
+    print("\n=== FLEET REPORT COMPLETE ===")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Drift and model-reveal summaries across many ledgers")
+    ap.add_argument("patterns", nargs="+", help="ledger globs (quote them; ** is recursive)")
+    ap.add_argument("--jobs", type=int, default=0, help="worker processes (0 = all cores)")
+    ap.add_argument("--baseline", action="store_true",
+                    help="also score each ledger against drift_baseline.json")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    ap.add_argument("--top", type=int, default=20, help="transitions to list")
+    args = ap.parse_args()
+
+    paths = expand(args.patterns)
+    if not paths:
+        print("No ledgers matched.")
+        return 1
+
+    baseline = None
+    if args.baseline:
+        b = load_baseline()
+        baseline = b.get("type_distribution", {}) if b else None
+        if baseline is None:
+            print("NO BASELINE FOUND")
+            return 1
+
+    rep = report(run(paths, args.jobs), baseline, args.top)
+
+    if args.json:
+        print(json.dumps(rep, indent=2, ensure_ascii=False))
+    else:
+        pretty_print(rep)
+    return 0 if all("error" not in row for row in rep["ledgers"]) else 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
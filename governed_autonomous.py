@@ -1,7 +1,11 @@
+import os
 import time
 import json
 from datetime import datetime
 
+import head_store
+from ledger_service import LedgerClient
+
 # 🔒 canonical hashing + payload rules
 from verify_events import canonical_payload, sha256_hex
 
@@ -10,21 +14,30 @@ HEAD_FILE = "events.head"
 
 GENESIS = "0" * 64
 
+# Set to a ledger_service.py socket to append through the shared sequencer
+LEDGER_SOCKET = os.environ.get("LEDGER_SOCKET")
+_client = None
+
+
+def _service_client():
+    global _client
+    if _client is None:
+        _client = LedgerClient(LEDGER_SOCKET)
+    return _client
+
 
 def load_head():
-    try:
-        with open(HEAD_FILE, "r", encoding="utf-8") as f:
-            return f.read().strip() or GENESIS
-    except FileNotFoundError:
-        return GENESIS
+    return head_store.read_head(HEAD_FILE, GENESIS)
 
 
 def write_head(h):
-    with open(HEAD_FILE, "w", encoding="utf-8") as f:
-        f.write(h + "\n")
+    head_store.write_head(HEAD_FILE, h, EVENT_FILE)
 
 
 def append_event(rec):
+    if LEDGER_SOCKET:
+        return _service_client().append(rec)
+
     payload = canonical_payload(rec)
     h = sha256_hex(payload)
     rec["hash"] = h
@@ -51,7 +64,7 @@ def make_cycle_event(cycle, prev):
 def run_autonomous_x5():
     print("=== AUTONOMOUS GOVERNED RUNTIME (X5 PUSH) ===")
 
-    prev = load_head()
+    prev = _service_client().head() if LEDGER_SOCKET else load_head()
     print("Starting head:", prev)
 
     for i in range(1, 6):
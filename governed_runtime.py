@@ -14,6 +14,8 @@ import hmac
 from datetime import datetime, timezone
 from openai import OpenAI
 
+from ledger_service import LedgerClient
+
 # ==============================================================
 # CONFIG
 # ==============================================================
@@ -27,6 +29,9 @@ K_STAR = 0.15
 
 HMAC_KEY = os.environ.get("EVENT_HMAC_KEY")
 
+# Set to a ledger_service.py socket to append through the shared sequencer
+LEDGER_SOCKET = os.environ.get("LEDGER_SOCKET")
+
 client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
 # ==============================================================
@@ -49,10 +54,13 @@ def compute_hmac(data: bytes) -> str:
 
 class Probe:
 
-    def __init__(self, file):
+    def __init__(self, file, socket_path=LEDGER_SOCKET):
         self.file = file
         self.eid = 0
         self.prev_hash = "GENESIS"
+        # With a ledger service, prev/hash come from its sequencer (legacy
+        # hash, no per-record HMAC) and the service owns the file.
+        self.client = LedgerClient(socket_path) if socket_path else None
 
     def log(self, actor, event_type, **kwargs):
 
@@ -68,6 +76,11 @@ class Probe:
 
         record.update(kwargs)
 
+        if self.client is not None:
+            record.pop("prev")
+            self.prev_hash = self.client.append(record)
+            return
+
         payload = json.dumps(
             record,
             sort_keys=True,
@@ -2,41 +2,26 @@
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import time
-from typing import Any, Dict
+from typing import Union
 
+import head_store
+from ledger_index import LedgerIndex
+from ledger_service import ServiceWriter
+from ledger_writer import LedgerWriter
+from merkle_ledger import MerkleLedger
 from utils_time import now_iso
-from verify_events import legacy_hash, verify
+from verify_events import verify
 
 EVENTS_DEFAULT = "events.jsonl"
 HEAD_DEFAULT = "events.head"
 
 def read_head(path: str) -> str:
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read().strip() or ("0" * 64)
-    except FileNotFoundError:
-        return "0" * 64
-
-def write_head(path: str, h: str) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(h + "\n")
-
-def append_line(path: str, rec: Dict[str, Any]) -> None:
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-
-def add_event(event_path: str, head_path: str, prev: str, rec: Dict[str, Any]) -> str:
-    rec["prev"] = prev
-    rec["hash"] = legacy_hash(rec)
-    append_line(event_path, rec)
-    write_head(head_path, rec["hash"])
-    return rec["hash"]
-
-def cycle_block(event_path: str, head_path: str, prev: str, cycle_id: int, do_model: bool) -> str:
-    prev = add_event(event_path, head_path, prev, {
+    return head_store.read_head(path, "0" * 64)
+
+def cycle_block(writer: Union[LedgerWriter, ServiceWriter], cycle_id: int, do_model: bool) -> str:
+    writer.add({
         "ts": now_iso(),
         "type": "cycle_start",
         "actor": "runtime",
@@ -44,7 +29,7 @@ def cycle_block(event_path: str, head_path: str, prev: str, cycle_id: int, do_mo
         "outcome": "ok",
     })
 
-    prev = add_event(event_path, head_path, prev, {
+    writer.add({
         "ts": now_iso(),
         "type": "model_call",
         "actor": "router" if do_model else "runtime",
@@ -52,7 +37,7 @@ def cycle_block(event_path: str, head_path: str, prev: str, cycle_id: int, do_mo
         "outcome": "ok" if do_model else "allow",
     })
 
-    prev = add_event(event_path, head_path, prev, {
+    writer.add({
         "ts": now_iso(),
         "type": "classification",
         "actor": "openai" if do_model else "runtime",
@@ -60,7 +45,7 @@ def cycle_block(event_path: str, head_path: str, prev: str, cycle_id: int, do_mo
         "outcome": "ok" if do_model else "unknown",
     })
 
-    prev = add_event(event_path, head_path, prev, {
+    writer.add({
         "ts": now_iso(),
         "type": "action_executed",
         "actor": "runtime",
@@ -68,7 +53,7 @@ def cycle_block(event_path: str, head_path: str, prev: str, cycle_id: int, do_mo
         "outcome": "ok",
     })
 
-    prev = add_event(event_path, head_path, prev, {
+    writer.add({
         "ts": now_iso(),
         "type": "cycle_end",
         "actor": "runtime",
@@ -76,7 +61,8 @@ def cycle_block(event_path: str, head_path: str, prev: str, cycle_id: int, do_mo
         "outcome": "ok",
     })
 
-    return prev
+    # One write + fsync for the cycle, then one head update
+    return writer.flush()
 
 def main() -> int:
     ap = argparse.ArgumentParser()
@@ -85,15 +71,28 @@ def main() -> int:
     ap.add_argument("--cycles", type=int, default=5)
     ap.add_argument("--sleep", type=float, default=0.0)
     ap.add_argument("--do-model", action="store_true")
+    ap.add_argument("--full", action="store_true",
+                    help="verify from genesis instead of resuming after the last verified record")
+    ap.add_argument("--merkle", action="store_true",
+                    help="extend the Merkle index sidecar after the run")
+    ap.add_argument("--index", action="store_true",
+                    help="extend the ledger_index.py sidecar after the run (appends alone never update it)")
+    ap.add_argument("--socket", default=None,
+                    help="append through a ledger_service.py socket instead of writing the files directly")
     args = ap.parse_args()
 
     print("=== GOVERNOR (A+B) ===")
     print("events:", args.events)
     print("head:", args.head)
 
+    if args.socket:
+        # The service owns the ledger: it verified it on startup and sequences
+        # every append, so a local verify would race other writers.
+        return run_via_service(args)
+
     # PRE-VERIFY (fail closed)
     if os.path.exists(args.events):
-        rc = verify(args.events, args.head)
+        rc = verify(args.events, args.head, full=args.full)
         if rc != 0:
             print("PRE-VERIFY FAILED (chain broken). Run rechain_events.py first.")
             return 1
@@ -103,18 +102,48 @@ def main() -> int:
     print("do_model:", bool(args.do_model))
     print("cycles:", args.cycles)
 
-    for i in range(1, args.cycles + 1):
-        prev = cycle_block(args.events, args.head, prev, i, bool(args.do_model))
-        print(f"[CYCLE {i}] head -> {prev[:16]}...")
-        if args.sleep:
-            time.sleep(args.sleep)
+    with LedgerWriter(args.events, args.head, prev) as writer:
+        for i in range(1, args.cycles + 1):
+            prev = cycle_block(writer, i, bool(args.do_model))
+            print(f"[CYCLE {i}] head -> {prev[:16]}...")
+            if args.sleep:
+                time.sleep(args.sleep)
 
     # POST-VERIFY
-    rc = verify(args.events, args.head)
+    rc = verify(args.events, args.head, full=args.full)
     if rc != 0:
         print("POST-VERIFY FAILED")
         return 1
 
+    if args.merkle:
+        tree = MerkleLedger(args.events)
+        tree.sync()
+        print("merkle_size:", tree.size)
+        print("merkle_root:", tree.root().hex())
+
+    if args.index:
+        with LedgerIndex(args.events) as index:
+            index.sync()
+            print("index_records:", index.size)
+
+    print("=== GOVERNOR COMPLETE ===")
+    print("final_head:", prev)
+    return 0
+
+def run_via_service(args: argparse.Namespace) -> int:
+    print("socket:", args.socket)
+    with ServiceWriter(args.socket) as writer:
+        prev = writer.head
+        print("starting_head:", prev[:16] + "...")
+        print("do_model:", bool(args.do_model))
+        print("cycles:", args.cycles)
+
+        for i in range(1, args.cycles + 1):
+            prev = cycle_block(writer, i, bool(args.do_model))
+            print(f"[CYCLE {i}] head -> {prev[:16]}...")
+            if args.sleep:
+                time.sleep(args.sleep)
+
     print("=== GOVERNOR COMPLETE ===")
     print("final_head:", prev)
     return 0
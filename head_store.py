@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+HEAD STORE
+----------
+One place that reads and writes ledger head files (events.head,
+events.saferoom.head, ...).
+
+Writes go through atomic_file.atomic_write (unique temp file, fsync,
+rename, directory fsync), so a crash leaves either the old head or the
+new one, never an empty or half-written file, and concurrent writers of
+one head cannot rename each other's temp files. When the caller names the
+event file, it is fsynced first: the head is only moved once the record
+it points at is durable.
+
+The last value read or written is cached per path and revalidated with a
+stat, so writers stop re-reading the file on every append.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from atomic_file import atomic_write, fsync_file
+
+_Stamp = Tuple[int, int, int]
+
+
+def _stamp(st: os.stat_result) -> _Stamp:
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class HeadStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._value: Optional[str] = None
+        self._stamp: Optional[_Stamp] = None
+
+    def read(self, default: Optional[str] = None) -> Optional[str]:
+        """Current head, or default if the file is missing or empty."""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._value, self._stamp = None, None
+                return default
+
+            if self._stamp != _stamp(st):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._value = f.read().strip() or None
+                    self._stamp = _stamp(os.fstat(f.fileno()))
+
+            return self._value if self._value else default
+
+    def write(self, h: str, event_file: Optional[str] = None) -> None:
+        """Atomically replace the head; fsync event_file first when given."""
+        if event_file is not None and os.path.exists(event_file):
+            fsync_file(event_file)
+
+        with self._lock:
+            st = atomic_write(self.path, h + "\n")
+
+            self._value = h or None
+            self._stamp = _stamp(st)
+
+
+_stores: Dict[str, HeadStore] = {}
+_stores_lock = threading.Lock()
+
+
+def head_store(path: str) -> HeadStore:
+    """Shared HeadStore for path (one cache per file per process)."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = HeadStore(path)
+        return store
+
+
+def read_head(path: str, default: Optional[str] = None) -> Optional[str]:
+    return head_store(path).read(default)
+
+
+def write_head(path: str, h: str, event_file: Optional[str] = None) -> None:
+    head_store(path).write(h, event_file)
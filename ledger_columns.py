@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+LEDGER COLUMNS
+--------------
+Columnar copy of events.jsonl for analytics (<events>.cols/).
+
+  type / actor / outcome   dictionary-encoded uint32 codes (+ dict.json)
+  cycle                    int64, -1 when absent
+  ts / S / delta           float64 seconds / values, NaN when absent
+
+Each column is a raw little-endian array file, so it loads with one
+numpy.fromfile (or array.fromfile when NumPy is not installed). sync()
+appends only records added since the last run. Counts and transition
+matrices are computed with bincount over the code columns instead of
+per-record dict loops.
+
+Usage:
+  python ledger_columns.py sync
+  python ledger_columns.py export events.npz      (needs NumPy)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+from array import array
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from atomic_file import atomic_write_json
+from ledger_index import to_epoch
+from ledger_reader import iter_records, record_at
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python fallback
+    np = None
+
+# Fields that are dictionary-encoded; missing/non-string values become "unknown"
+CATEGORICAL = ("type", "actor", "outcome")
+# Numeric fields: (array typecode, missing value)
+NUMERIC = {"cycle": ("q", -1), "ts": ("d", math.nan), "S": ("d", math.nan), "delta": ("d", math.nan)}
+
+UNKNOWN = "unknown"
+FIELDS = CATEGORICAL + tuple(NUMERIC) + ("hash",)
+
+
+def _codes_typecode() -> str:
+    return "I" if array("I").itemsize == 4 else "L"
+
+
+def _numeric(name: str, v: Any) -> Any:
+    if name == "ts":
+        ts = to_epoch(v)
+        return math.nan if ts is None else ts
+    if name == "cycle":
+        return v if isinstance(v, int) and not isinstance(v, bool) else -1
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return float(v)
+    return math.nan
+
+
+class ColumnStore:
+    def __init__(self, event_file: str = "events.jsonl", directory: Optional[str] = None):
+        self.event_file = event_file
+        self.directory = directory or event_file + ".cols"
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.meta = self._load_json("meta.json", {"rows": 0, "offset": 0, "line": 0, "last": None})
+        names = self._load_json("dict.json", {c: [] for c in CATEGORICAL})
+        self.dictionary: Dict[str, List[str]] = {c: names.get(c, []) for c in CATEGORICAL}
+        self._lookup = {c: {s: i for i, s in enumerate(v)} for c, v in self.dictionary.items()}
+
+        self.typecodes = {c: _codes_typecode() for c in CATEGORICAL}
+        self.typecodes.update({n: tc for n, (tc, _) in NUMERIC.items()})
+
+    # --- files ---
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load_json(self, name: str, default: Any) -> Any:
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+
+    def _save_json(self, name: str, obj: Any) -> None:
+        atomic_write_json(self._path(name), obj)
+
+    def column_path(self, name: str) -> str:
+        return self._path(name + ".bin")
+
+    # --- maintenance ---
+
+    def _stale(self) -> bool:
+        size = os.path.getsize(self.event_file)
+        if size < self.meta["offset"]:
+            return True
+        last = self.meta["last"]
+        if last is None:
+            return False
+        rec = record_at(self.event_file, last[0], self.meta["offset"], ("hash",))
+        return rec is None or rec.get("hash") != last[1]
+
+    def clear(self) -> None:
+        for name in self.typecodes:
+            try:
+                os.remove(self.column_path(name))
+            except FileNotFoundError:
+                pass
+        self.meta = {"rows": 0, "offset": 0, "line": 0, "last": None}
+        self.dictionary = {c: [] for c in CATEGORICAL}
+        self._lookup = {c: {} for c in CATEGORICAL}
+        self._save_json("dict.json", self.dictionary)
+        self._save_json("meta.json", self.meta)
+
+    def _encode(self, col: str, v: Any) -> int:
+        s = v if isinstance(v, str) else UNKNOWN
+        code = self._lookup[col].get(s)
+        if code is None:
+            code = self._lookup[col][s] = len(self.dictionary[col])
+            self.dictionary[col].append(s)
+        return code
+
+    def sync(self) -> int:
+        """
+        Append columns for records added since the last sync; returns how
+        many. Lines that are not valid JSON are skipped, as load_records does.
+        """
+        if not os.path.exists(self.event_file):
+            return 0
+        if self._stale():
+            self.clear()
+
+        cols = {name: array(tc) for name, tc in self.typecodes.items()}
+        offset, line, last = self.meta["offset"], self.meta["line"], self.meta["last"]
+
+        # A line still being appended is picked up next time
+        for idx, start, end, rec in iter_records(self.event_file, FIELDS, offset, line,
+                                                 skip_errors=True, complete_only=True):
+            for c in CATEGORICAL:
+                cols[c].append(self._encode(c, rec.get(c)))
+            for n in NUMERIC:
+                cols[n].append(_numeric(n, rec.get(n)))
+            offset, line, last = end, idx, [start, rec.get("hash")]
+
+        added = len(cols["type"])
+        rows = self.meta["rows"]
+        for name, arr in cols.items():
+            with open(self.column_path(name), "ab") as f:
+                # Drop rows written by a run that died before saving meta
+                f.truncate(rows * arr.itemsize)
+                f.seek(0, os.SEEK_END)
+                if sys.byteorder != "little":
+                    arr.byteswap()
+                arr.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+
+        self._save_json("dict.json", self.dictionary)
+        self.meta = {"rows": rows + added, "offset": offset, "line": line, "last": last}
+        self._save_json("meta.json", self.meta)
+        return added
+
+    # --- loading ---
+
+    @property
+    def rows(self) -> int:
+        return self.meta["rows"]
+
+    def column(self, name: str):
+        """One column as a NumPy array (or array.array without NumPy)."""
+        tc = self.typecodes[name]
+        n = self.rows
+        path = self.column_path(name)
+        if np is not None:
+            dtype = np.dtype(tc).newbyteorder("<")
+            if n == 0 or not os.path.exists(path):
+                return np.zeros(0, dtype=dtype)
+            return np.fromfile(path, dtype=dtype, count=n)
+
+        arr = array(tc)
+        if n and os.path.exists(path):
+            with open(path, "rb") as f:
+                arr.fromfile(f, n)
+            if sys.byteorder != "little":
+                arr.byteswap()
+        return arr
+
+    def load(self, names=None) -> Dict[str, Any]:
+        return {name: self.column(name) for name in (names or self.typecodes)}
+
+    def export_npz(self, path: str) -> None:
+        if np is None:
+            raise RuntimeError("export_npz needs NumPy")
+        cols = self.load()
+        for c in CATEGORICAL:
+            cols[c + "_dict"] = np.array(self.dictionary[c])
+        np.savez(path, **cols)
+
+    # --- analytics ---
+
+    def counts(self, col: str) -> Counter:
+        """Value -> count for a categorical column."""
+        names = self.dictionary[col]
+        codes = self.column(col)
+        if np is not None:
+            bins = np.bincount(codes, minlength=len(names))
+            return Counter({names[i]: int(bins[i]) for i in np.flatnonzero(bins)})
+        return Counter({names[c]: n for c, n in Counter(codes).items()})
+
+    def transitions(self, col: str = "type") -> Counter:
+        """(a, b) -> count of consecutive records with values a then b."""
+        names = self.dictionary[col]
+        codes = self.column(col)
+        k = len(names)
+        if len(codes) < 2:
+            return Counter()
+        if np is not None:
+            pairs = codes[:-1].astype(np.int64) * k + codes[1:]
+            bins = np.bincount(pairs, minlength=k * k)
+            return Counter({(names[i // k], names[i % k]): int(bins[i]) for i in np.flatnonzero(bins)})
+        return Counter({(names[a], names[b]): n for (a, b), n in Counter(zip(codes, codes[1:])).items()})
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Columnar store for an event ledger")
+    ap.add_argument("--events", default="events.jsonl")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("sync")
+    p_exp = sub.add_parser("export")
+    p_exp.add_argument("npz_path")
+    args = ap.parse_args()
+
+    store = ColumnStore(args.events)
+    added = store.sync()
+
+    if args.cmd == "sync":
+        print("COLUMNS SYNC OK")
+        print("new_rows:", added)
+        print("rows:", store.rows)
+        print("numpy:", np is not None)
+        return 0
+
+    try:
+        store.export_npz(args.npz_path)
+    except RuntimeError as e:
+        print(f"EXPORT FAILED: {e}")
+        return 2
+    print("EXPORT OK")
+    print("rows:", store.rows)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
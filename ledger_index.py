@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+LEDGER INDEX
+------------
+SQLite sidecar (<events>.idx) mapping eid, cycle, type, actor and
+timestamp bucket to byte offsets in events.jsonl, so triage queries read
+only the matching records instead of scanning the whole ledger.
+
+sync() indexes whatever was appended since the last call (governor.py
+--index runs it after each run; every CLI query runs it first). If the
+ledger was truncated or rewritten under the index, sync() rebuilds.
+
+Appends do not update the index: LedgerWriter and ledger_service.py
+never touch it. Code that queries a LedgerIndex directly must call
+sync() first, or it will not see records appended since the last sync.
+
+Usage:
+  python ledger_index.py sync
+  python ledger_index.py rebuild
+  python ledger_index.py query --type action_blocked --cycles 1000-2000
+  python ledger_index.py query --actor openai --since 2026-03-01T00:00:00+00:00 --count
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ledger_reader import iter_records, record_at
+
+# Width of a timestamp bucket, in seconds
+BUCKET_SECONDS = 3600
+
+FIELDS = ("eid", "cycle", "type", "actor", "ts", "hash")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    line   INTEGER PRIMARY KEY,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    eid    INTEGER,
+    cycle  INTEGER,
+    type   TEXT,
+    actor  TEXT,
+    ts     REAL,
+    bucket INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_eid    ON events(eid);
+CREATE INDEX IF NOT EXISTS events_cycle  ON events(cycle);
+CREATE INDEX IF NOT EXISTS events_type   ON events(type, cycle);
+CREATE INDEX IF NOT EXISTS events_actor  ON events(actor, cycle);
+CREATE INDEX IF NOT EXISTS events_bucket ON events(bucket);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+"""
+
+CycleFilter = Union[int, Tuple[Optional[int], Optional[int]]]
+
+
+def to_epoch(ts: Any) -> Optional[float]:
+    """
+    Ledger timestamps come as ISO strings, float seconds or integer
+    nanoseconds (also ms/us from older writers); normalize to seconds.
+    """
+    if ts is None or isinstance(ts, bool):
+        return None
+    if isinstance(ts, (int, float)):
+        v = float(ts)
+        for scale in (1e18, 1e15, 1e12):
+            if abs(v) >= scale:
+                return v / (scale / 1e9)
+        return v
+    if isinstance(ts, str):
+        try:
+            dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    return None
+
+
+def _int(v: Any) -> Optional[int]:
+    return v if isinstance(v, int) and not isinstance(v, bool) else None
+
+
+def _str(v: Any) -> Optional[str]:
+    return v if isinstance(v, str) else None
+
+
+class LedgerIndex:
+    def __init__(self, event_file: str = "events.jsonl", path: Optional[str] = None,
+                 bucket_seconds: int = BUCKET_SECONDS):
+        self.event_file = event_file
+        self.path = path or event_file + ".idx"
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript(SCHEMA)
+
+        stored = self._meta("bucket_seconds")
+        if stored is not None and stored != bucket_seconds:
+            # Buckets are baked into rows; changing the width needs a rebuild
+            self._clear()
+        self.bucket_seconds = bucket_seconds
+        self._set_meta("bucket_seconds", bucket_seconds)
+        self.db.commit()
+
+    # --- meta ---
+
+    def _meta(self, key: str, default: Any = None) -> Any:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def _set_meta(self, key: str, value: Any) -> None:
+        self.db.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+    def _clear(self) -> None:
+        self.db.execute("DELETE FROM events")
+        self.db.execute("DELETE FROM meta WHERE key IN ('offset', 'line', 'last_offset', 'last_hash')")
+
+    # --- maintenance ---
+
+    def _stale(self, size: int) -> bool:
+        """True if the indexed prefix no longer matches the ledger."""
+        offset = self._meta("offset", 0)
+        if size < offset:
+            return True
+        last_offset = self._meta("last_offset")
+        if last_offset is None:
+            return False
+        rec = record_at(self.event_file, last_offset, offset, ("hash",))
+        return rec is None or rec.get("hash") != self._meta("last_hash")
+
+    def sync(self) -> int:
+        """
+        Index records appended since the last sync; returns how many.
+        Lines that are not valid JSON are skipped, as load_records does.
+        """
+        if not os.path.exists(self.event_file):
+            return 0
+
+        size = os.path.getsize(self.event_file)
+        if self._stale(size):
+            self._clear()
+
+        offset, line = self._meta("offset", 0), self._meta("line", 0)
+        last: Optional[Tuple[int, Any]] = None
+        rows: List[tuple] = []
+
+        # A line still being appended is picked up next time
+        for idx, start, end, rec in iter_records(self.event_file, FIELDS, offset, line,
+                                                 skip_errors=True, complete_only=True):
+            ts = to_epoch(rec.get("ts"))
+            rows.append((
+                idx, start, end - start,
+                _int(rec.get("eid")), _int(rec.get("cycle")),
+                _str(rec.get("type")), _str(rec.get("actor")),
+                ts, None if ts is None else int(ts // self.bucket_seconds),
+            ))
+            offset, line = end, idx
+            last = (start, rec.get("hash"))
+
+        if rows:
+            self.db.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._set_meta("last_offset", last[0])
+            self._set_meta("last_hash", last[1])
+        self._set_meta("offset", offset)
+        self._set_meta("line", line)
+        self.db.commit()
+        return len(rows)
+
+    def rebuild(self) -> int:
+        self._clear()
+        self.db.commit()
+        return self.sync()
+
+    @property
+    def size(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    # --- queries ---
+
+    def _where(self, eid: Optional[int] = None, cycle: Optional[CycleFilter] = None,
+               type: Optional[Union[str, Sequence[str]]] = None, actor: Optional[str] = None,
+               since: Any = None, until: Any = None) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+
+        if eid is not None:
+            clauses.append("eid = ?")
+            params.append(eid)
+        if cycle is not None:
+            lo, hi = (cycle, cycle) if isinstance(cycle, int) else cycle
+            if lo is not None:
+                clauses.append("cycle >= ?")
+                params.append(lo)
+            if hi is not None:
+                clauses.append("cycle <= ?")
+                params.append(hi)
+        if type is not None:
+            types = [type] if isinstance(type, str) else list(type)
+            clauses.append("type IN (%s)" % ",".join("?" * len(types)))
+            params.extend(types)
+        if actor is not None:
+            clauses.append("actor = ?")
+            params.append(actor)
+
+        # Bucket bounds let SQLite narrow by index before the exact ts test
+        for bound, bucket_op, op in ((since, ">=", ">="), (until, "<=", "<")):
+            if bound is None:
+                continue
+            ts = to_epoch(bound)
+            if ts is None:
+                raise ValueError(f"unrecognized timestamp: {bound!r}")
+            clauses.append(f"bucket {bucket_op} ?")
+            params.append(int(ts // self.bucket_seconds))
+            clauses.append(f"ts {op} ?")
+            params.append(ts)
+
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    def locate(self, limit: Optional[int] = None, **filters: Any) -> List[Tuple[int, int, int]]:
+        """(line, offset, length) of matching records, in ledger order."""
+        where, params = self._where(**filters)
+        sql = "SELECT line, offset, length FROM events" + where + " ORDER BY line"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.db.execute(sql, params).fetchall()
+
+    def count(self, **filters: Any) -> int:
+        where, params = self._where(**filters)
+        return self.db.execute("SELECT COUNT(*) FROM events" + where, params).fetchone()[0]
+
+    def histogram(self, by: str = "type", **filters: Any) -> Dict[Any, int]:
+        """Counts grouped by one indexed column (type, actor, cycle or bucket)."""
+        if by not in ("type", "actor", "cycle", "bucket", "eid"):
+            raise ValueError(f"cannot group by {by!r}")
+        where, params = self._where(**filters)
+        sql = f"SELECT {by}, COUNT(*) FROM events{where} GROUP BY {by} ORDER BY {by}"
+        return dict(self.db.execute(sql, params).fetchall())
+
+    def query(self, limit: Optional[int] = None, **filters: Any) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (line, record) for matches, reading only their bytes."""
+        hits = self.locate(limit=limit, **filters)
+        if not hits:
+            return
+        with open(self.event_file, "rb") as f:
+            for line, offset, length in hits:
+                f.seek(offset)
+                yield line, json.loads(f.read(length))
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "LedgerIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _parse_cycles(s: str) -> CycleFilter:
+    if "-" not in s:
+        return int(s)
+    lo, hi = s.split("-", 1)
+    return (int(lo) if lo else None, int(hi) if hi else None)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Offset/field index for an event ledger")
+    ap.add_argument("--events", default="events.jsonl")
+    ap.add_argument("--bucket", type=int, default=BUCKET_SECONDS, help="timestamp bucket width (s)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("sync")
+    sub.add_parser("rebuild")
+
+    q = sub.add_parser("query")
+    q.add_argument("--eid", type=int)
+    q.add_argument("--cycles", type=_parse_cycles, help="N, A-B, A- or -B")
+    q.add_argument("--type", action="append", help="repeatable")
+    q.add_argument("--actor")
+    q.add_argument("--since", help="ISO time or epoch seconds")
+    q.add_argument("--until", help="ISO time or epoch seconds (exclusive)")
+    q.add_argument("--limit", type=int)
+    q.add_argument("--count", action="store_true", help="print only the number of matches")
+    q.add_argument("--by", choices=["type", "actor", "cycle", "bucket"], help="print counts grouped by a field")
+    args = ap.parse_args()
+
+    with LedgerIndex(args.events, bucket_seconds=args.bucket) as index:
+        if args.cmd == "rebuild":
+            n = index.rebuild()
+            print("INDEX REBUILT")
+            print("records:", n)
+            return 0
+
+        added = index.sync()
+        if args.cmd == "sync":
+            print("INDEX SYNC OK")
+            print("new_records:", added)
+            print("records:", index.size)
+            return 0
+
+        def bound(v: Optional[str]) -> Any:
+            if v is None:
+                return None
+            try:
+                return float(v)
+            except ValueError:
+                return v
+
+        filters = {
+            "eid": args.eid, "cycle": args.cycles, "type": args.type, "actor": args.actor,
+            "since": bound(args.since), "until": bound(args.until),
+        }
+        try:
+            if args.count:
+                print(index.count(**filters))
+            elif args.by:
+                for key, n in index.histogram(by=args.by, **filters).items():
+                    print(f"{key}\t{n}")
+            else:
+                for line, rec in index.query(limit=args.limit, **filters):
+                    print(json.dumps({"line": line, **rec}, ensure_ascii=False))
+        except ValueError as e:
+            print(f"QUERY FAILED: {e}")
+            return 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+LEDGER READER
+-------------
+Shared, zero-copy scanning of JSONL ledgers (events.jsonl and lanes).
+
+The file is mmapped and each line is handed out as a memoryview slice,
+so nothing is text-decoded unless a tool asks for it. Tools that only
+need a few top-level fields (type, actor, hash, ...) get them without a
+full json.loads when the line allows it.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+# "key": value, where value is a JSON string, number or literal.
+# A key in quotes can only be a real key: inside a string its quotes are escaped.
+_FIELD = re.compile(
+    rb'"([A-Za-z_][A-Za-z0-9_]*)"\s*:\s*'
+    rb'("(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null)'
+)
+
+_LITERALS = {b"true": True, b"false": False, b"null": None}
+
+
+def iter_lines(
+    path: str, start_offset: int = 0, start_line: int = 0, end_offset: Optional[int] = None,
+    complete_only: bool = False,
+) -> Iterator[Tuple[int, int, int, memoryview]]:
+    """
+    Yield (line_no, start, end, view) for every non-blank line in
+    [start_offset, end_offset). end includes the newline; view does not
+    include surrounding whitespace. Views are only valid until the next
+    item is requested. complete_only stops before a last line with no
+    newline yet (one that may still be mid-append), so incremental readers
+    pick it up once it is finished. A missing file raises
+    FileNotFoundError; callers that treat it as empty check for it first.
+    """
+    size = os.path.getsize(path)
+    if size == 0 or start_offset >= size:
+        return
+
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mm)
+    try:
+        limit = size if end_offset is None else min(end_offset, size)
+        pos = start_offset
+        line_no = start_line
+        while pos < limit:
+            nl = mm.find(b"\n", pos, limit)
+            if nl < 0 and complete_only:
+                break
+            end = limit if nl < 0 else nl + 1
+            line_no += 1
+
+            a, b = pos, end
+            while a < b and mm[a] in b" \t\r\n":
+                a += 1
+            while b > a and mm[b - 1] in b" \t\r\n":
+                b -= 1
+
+            if a < b:
+                line = view[a:b]
+                yield line_no, pos, end, line
+                line.release()
+            pos = end
+    finally:
+        view.release()
+        try:
+            mm.close()
+        except BufferError:
+            # A caller kept a view past its iteration; let GC close the map
+            pass
+
+
+def scan_fields(line, fields: Sequence[str]) -> Dict[str, Any]:
+    """
+    Top-level fields from one JSON line. Uses a regex over the raw bytes
+    when the record is flat (no nested objects/arrays), else json.loads.
+    Missing fields are left out, as with dict.get on a parsed record.
+    """
+    raw = bytes(line)
+    # Only a complete flat object; a truncated line falls through to json.loads
+    if raw[:1] == b"{" and raw[-1:] == b"}" and raw.count(b"{") == 1 and b"[" not in raw:
+        wanted = set(fields)
+        out: Dict[str, Any] = {}
+        for m in _FIELD.finditer(raw):
+            key = m.group(1).decode("ascii")
+            if key not in wanted:
+                continue
+            token = m.group(2)
+            if token[:1] == b'"':
+                out[key] = token[1:-1].decode("utf-8") if b"\\" not in token else json.loads(token)
+            elif token in _LITERALS:
+                out[key] = _LITERALS[token]
+            else:
+                out[key] = json.loads(token)
+        return out
+
+    rec = json.loads(raw)
+    return {k: rec[k] for k in fields if k in rec}
+
+
+def iter_records(
+    path: str,
+    fields: Optional[Sequence[str]] = None,
+    start_offset: int = 0,
+    start_line: int = 0,
+    end_offset: Optional[int] = None,
+    skip_errors: bool = False,
+    complete_only: bool = False,
+) -> Iterator[Tuple[int, int, int, Dict[str, Any]]]:
+    """
+    Yield (line_no, start, end, record). With fields, the record holds just
+    those fields. skip_errors drops lines that are not valid JSON;
+    complete_only is as for iter_lines.
+    """
+    for line_no, start, end, line in iter_lines(path, start_offset, start_line, end_offset, complete_only):
+        try:
+            if fields is None:
+                rec = json.loads(bytes(line))
+            else:
+                rec = scan_fields(line, fields)
+        except ValueError:
+            if skip_errors:
+                continue
+            raise
+        yield line_no, start, end, rec
+
+
+def record_at(path: str, offset: int, end_offset: Optional[int] = None,
+              fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    The record whose line starts exactly at byte offset, or None if no
+    valid record starts there (a rewritten file, a mid-line offset, EOF).
+    Sidecars use it to check that the prefix they indexed is unchanged.
+    """
+    with open(path, "rb") as f:
+        if offset > 0:
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                return None
+    for _, start, _, line in iter_lines(path, offset, 0, end_offset):
+        if start != offset:
+            return None
+        try:
+            return json.loads(bytes(line)) if fields is None else scan_fields(line, fields)
+        except ValueError:
+            return None
+    return None
+
+
+def load_records(path: str, fields: Optional[Sequence[str]] = None,
+                 skip_errors: bool = True) -> Iterable[Dict[str, Any]]:
+    """Records only, in file order (a generator; wrap in list() if needed)."""
+    for _, _, _, rec in iter_records(path, fields, skip_errors=skip_errors):
+        yield rec
+
+
+def follow(
+    path: str,
+    fields: Optional[Sequence[str]] = None,
+    poll: float = 0.5,
+    from_start: bool = False,
+    idle=None,
+) -> Iterator[Tuple[int, int, int, Dict[str, Any]]]:
+    """
+    Tail a ledger like `tail -F`: yield records as complete lines are
+    appended, forever. Starts at the current end unless from_start. If the
+    file shrinks (rotated or rewritten) it is read again from the top.
+    idle(), if given, is called after each empty poll; returning True
+    stops the generator.
+    """
+    offset, line_no = 0, 0
+    if not from_start:
+        try:
+            offset = os.path.getsize(path)
+        except FileNotFoundError:
+            pass
+
+    while True:
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            size = 0
+        if size < offset:
+            offset, line_no = 0, 0
+
+        got = False
+        if size > offset:
+            try:
+                # A line still being written is picked up on a later poll
+                for idx, start, end, rec in iter_records(path, fields, offset, line_no, size,
+                                                         skip_errors=True, complete_only=True):
+                    offset, line_no = end, idx
+                    got = True
+                    yield idx, start, end, rec
+            except FileNotFoundError:
+                # Rotated away mid-read; the next poll starts on the new file
+                pass
+
+        if not got:
+            if idle is not None and idle():
+                return
+            time.sleep(poll)
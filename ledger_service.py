@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+LEDGER SERVICE
+--------------
+One process owns events.jsonl / events.head; any number of governed
+workers append through it over a Unix socket.
+
+A single sequencer thread assigns prev/hash, so concurrent writers can
+never fork or interleave the chain. Requests that arrive while a batch
+is being written are chained and fsynced together (group commit), then
+each caller gets back the hashes of its own records.
+
+Protocol: one JSON object per line each way.
+
+  -> {"op": "append", "records": [{...}, ...]}
+  <- {"ok": true, "hashes": ["...", ...], "head": "..."}
+  -> {"op": "head"}
+  <- {"ok": true, "head": "..."}
+
+Run:
+  python ledger_service.py --socket ledger.sock --events events.jsonl --head events.head
+
+Workers:
+  governor.py --socket ledger.sock, saferoom.py --socket ledger.sock,
+  or LEDGER_SOCKET=ledger.sock for governed_autonomous / governed_runtime.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ledger_writer import LedgerWriter
+from verify_events import verify
+
+SOCKET_DEFAULT = "ledger.sock"
+
+
+class LedgerServiceError(RuntimeError):
+    pass
+
+
+class _Request:
+    __slots__ = ("records", "done", "hashes", "error")
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.records = records
+        self.done = threading.Event()
+        self.hashes: List[str] = []
+        self.error: Optional[str] = None
+
+
+class LedgerService:
+    """
+    Sequencer over one ledger. append() may be called from any thread;
+    serve() additionally accepts appends from other processes.
+    """
+
+    def __init__(self, event_path: str = "events.jsonl", head_path: str = "events.head",
+                 max_batch: int = 1024, max_delay: float = 0.002):
+        self.event_path = event_path
+        self.head_path = head_path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self._writer = LedgerWriter(event_path, head_path)
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+        self._socket_path: Optional[str] = None
+
+        self._sequencer = threading.Thread(target=self._run, name="ledger-sequencer", daemon=True)
+        self._sequencer.start()
+
+    @property
+    def head(self) -> str:
+        return self._writer.head
+
+    def append(self, records: List[Dict[str, Any]]) -> List[str]:
+        """Chain and persist records in order; returns their hashes once durable."""
+        req = _Request(records)
+        self._queue.put(req)
+        req.done.wait()
+        if req.error is not None:
+            raise LedgerServiceError(req.error)
+        return req.hashes
+
+    # --- sequencer ---
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        batch = [first]
+        count = len(first.records)
+        deadline = time.monotonic() + self.max_delay
+        while count < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                req = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if req is None:
+                # Put the stop marker back for _run once this batch is written
+                self._queue.put(None)
+                break
+            batch.append(req)
+            count += len(req.records)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = self._collect(first)
+            try:
+                for req in batch:
+                    req.hashes = [self._writer.add(dict(rec)) for rec in req.records]
+                self._writer.flush()
+            except Exception as e:
+                self._writer.discard()
+                for req in batch:
+                    req.hashes = []
+                    req.error = f"{type(e).__name__}: {e}"
+
+            for req in batch:
+                req.done.set()
+
+    # --- socket front end ---
+
+    def serve(self, socket_path: str = SOCKET_DEFAULT) -> None:
+        """Accept appends on socket_path until shutdown() (blocks)."""
+        if os.path.exists(socket_path):
+            # A live service still answers; a stale socket file does not
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                os.remove(socket_path)
+            else:
+                probe.close()
+                raise LedgerServiceError(f"ledger service already running on {socket_path}")
+
+        service = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    reply = service._handle(line)
+                    self.wfile.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+        self._socket_path = socket_path
+        self._server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+        self._server.daemon_threads = True
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def _handle(self, line: bytes) -> Dict[str, Any]:
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            return {"ok": False, "error": "bad request"}
+
+        op = msg.get("op")
+        if op == "head":
+            return {"ok": True, "head": self.head}
+        if op == "append":
+            records = msg.get("records")
+            if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+                return {"ok": False, "error": "records must be a list of objects"}
+            try:
+                hashes = self.append(records)
+            except LedgerServiceError as e:
+                return {"ok": False, "error": str(e)}
+            return {"ok": True, "hashes": hashes, "head": hashes[-1] if hashes else self.head}
+        return {"ok": False, "error": f"unknown op: {op}"}
+
+    def shutdown(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+        if self._socket_path is not None:
+            try:
+                os.remove(self._socket_path)
+            except FileNotFoundError:
+                pass
+            self._socket_path = None
+
+        self._queue.put(None)
+        self._sequencer.join()
+        self._writer.close()
+
+
+class LedgerClient:
+    """Connection to a LedgerService socket."""
+
+    def __init__(self, socket_path: str = SOCKET_DEFAULT):
+        self.socket_path = socket_path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(socket_path)
+        self._rfile = self._sock.makefile("rb")
+
+    def _call(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        self._sock.sendall(json.dumps(msg, ensure_ascii=False).encode("utf-8") + b"\n")
+        line = self._rfile.readline()
+        if not line:
+            raise LedgerServiceError("ledger service closed the connection")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise LedgerServiceError(reply.get("error", "append failed"))
+        return reply
+
+    def append(self, rec: Dict[str, Any]) -> str:
+        return self.append_many([rec])[0]
+
+    def append_many(self, records: List[Dict[str, Any]]) -> List[str]:
+        return self._call({"op": "append", "records": records})["hashes"]
+
+    def head(self) -> str:
+        return self._call({"op": "head"})["head"]
+
+    def close(self) -> None:
+        self._rfile.close()
+        self._sock.close()
+
+    def __enter__(self) -> "LedgerClient":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class ServiceWriter:
+    """
+    LedgerWriter look-alike backed by a LedgerService: add() buffers,
+    flush() sends the batch in one request. prev/hash are assigned by the
+    service, so add() cannot return the hash.
+    """
+
+    def __init__(self, socket_path: str = SOCKET_DEFAULT):
+        self._client = LedgerClient(socket_path)
+        self._pending: List[Dict[str, Any]] = []
+        self.head = self._client.head()
+
+    def add(self, rec: Dict[str, Any]) -> None:
+        self._pending.append(rec)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> str:
+        if self._pending:
+            hashes = self._client.append_many(self._pending)
+            self._pending.clear()
+            self.head = hashes[-1]
+        return self.head
+
+    def discard(self) -> None:
+        self._pending.clear()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._client.close()
+
+    def __enter__(self) -> "ServiceWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.discard()
+        self.close()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Serialize ledger appends from many processes")
+    ap.add_argument("--socket", default=SOCKET_DEFAULT)
+    ap.add_argument("--events", default="events.jsonl")
+    ap.add_argument("--head", default="events.head")
+    ap.add_argument("--max-batch", type=int, default=1024)
+    ap.add_argument("--max-delay", type=float, default=0.002,
+                    help="seconds to wait for more appends before an fsync")
+    args = ap.parse_args()
+
+    # Fail closed: never extend a broken chain
+    if os.path.exists(args.events):
+        if verify(args.events, args.head) != 0:
+            print("PRE-VERIFY FAILED (chain broken). Run rechain_events.py first.")
+            return 1
+
+    service = LedgerService(args.events, args.head, args.max_batch, args.max_delay)
+    print("=== LEDGER SERVICE ===")
+    print("socket:", args.socket)
+    print("events:", args.events)
+    print("head:", service.head)
+
+    try:
+        service.serve(args.socket)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.shutdown()
+
+    print("final_head:", service.head)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
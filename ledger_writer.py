@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+LEDGER WRITER
+-------------
+Buffered, chained appends to an event ledger (events.jsonl + events.head).
+
+Records are hashed and linked as they are added but only reach disk on
+flush(): one write and one fsync for the whole batch, then one head
+update via tmp+rename. The head is never written before the records it
+names are durable, so after a crash it points at or behind the last
+complete record, never past it.
+
+A writer may be shared between threads: add() links records one at a
+time under a lock, and flush() writes everything buffered so far. The
+ledger must still have a single writer; processes coordinate through
+ledger_service.py instead.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from atomic_file import fsync_dir
+from head_store import head_store
+from verify_events import legacy_hash
+
+GENESIS = "0" * 64
+
+
+class LedgerWriter:
+    """
+    Keeps the event file open and chains records from `prev`.
+
+        with LedgerWriter("events.jsonl", "events.head", prev) as w:
+            w.add({...})
+            w.add({...})
+            w.flush()
+    """
+
+    def __init__(self, event_path: str, head_path: str, prev: Optional[str] = None):
+        self.event_path = event_path
+        self.head_path = head_path
+        self._heads = head_store(head_path)
+        self.head = prev or self._heads.read(GENESIS)
+        self._pending: List[bytes] = []
+        self._pending_head = self.head
+        self._lock = threading.Lock()
+
+        created = not os.path.exists(event_path)
+        self._f = open(event_path, "ab")
+        if created:
+            fsync_dir(event_path)
+
+    def add(self, rec: Dict[str, Any]) -> str:
+        """Link and hash rec onto the chain (in place) and buffer it. Returns its hash."""
+        with self._lock:
+            rec["prev"] = self._pending_head
+            rec["hash"] = legacy_hash(rec)
+            self._pending.append((json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8"))
+            self._pending_head = rec["hash"]
+            return rec["hash"]
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> str:
+        """Make buffered records durable, then move the head. Returns the head."""
+        with self._lock:
+            if not self._pending:
+                return self.head
+
+            self._f.write(b"".join(self._pending))
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._pending.clear()
+
+            # Records are already fsynced; no need to sync event_path again
+            self._heads.write(self._pending_head)
+            self.head = self._pending_head
+            return self.head
+
+    def discard(self) -> None:
+        """Drop buffered records that have not been flushed."""
+        with self._lock:
+            self._pending.clear()
+            self._pending_head = self.head
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._f.close()
+
+    def __enter__(self) -> "LedgerWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.discard()
+        self.close()
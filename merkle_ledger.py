@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+MERKLE LEDGER INDEX
+-------------------
+Incremental Merkle tree (RFC 9162 layout) over the records of an event
+ledger, kept in a sidecar directory next to it (events.jsonl.merkle/).
+
+- leaf i  = sha256(0x00 || hash field of record i)
+- node    = sha256(0x01 || left || right)
+- level-NN.bin holds every complete subtree of width 2**NN, 32 bytes each,
+  so any subtree hash, inclusion proof or consistency proof needs only
+  O(log n) reads no matter how long the ledger is.
+- offsets.bin holds the ledger byte offset of each leaf's record.
+
+Usage:
+  python merkle_ledger.py sync
+  python merkle_ledger.py root [--size N]
+  python merkle_ledger.py prove --index I [--size N]  > proof.json
+  python merkle_ledger.py prove --hash H              > proof.json
+  python merkle_ledger.py check proof.json
+  python merkle_ledger.py consistency OLD_SIZE [NEW_SIZE] > proof.json
+  python merkle_ledger.py check-consistency proof.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+from typing import Any, Dict, List, Optional
+
+from atomic_file import atomic_write_json
+from ledger_reader import iter_records, record_at
+
+NODE = 32
+OFFSET = struct.Struct("<Q")
+
+
+def leaf_hash(record_hash: str) -> bytes:
+    return hashlib.sha256(b"\x00" + record_hash.encode("utf-8")).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _split(n: int) -> int:
+    """Largest power of two strictly less than n (n > 1)."""
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+class MerkleLedger:
+    """
+    Merkle index for one ledger file. Call sync() after appends; it hashes
+    only records past the last indexed byte offset.
+    """
+
+    def __init__(self, event_file: str = "events.jsonl", directory: Optional[str] = None):
+        self.event_file = event_file
+        self.directory = directory or event_file + ".merkle"
+        self.meta_path = os.path.join(self.directory, "meta.json")
+        self.offsets_path = os.path.join(self.directory, "offsets.bin")
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.meta = self._load_meta()
+        self._trim_levels()
+
+    # --- storage ---
+
+    def _level_path(self, level: int) -> str:
+        return os.path.join(self.directory, f"level-{level:02d}.bin")
+
+    def _load_meta(self) -> Dict[str, Any]:
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"size": 0, "offset": 0, "line": 0}
+
+    def _save_meta(self) -> None:
+        atomic_write_json(self.meta_path, self.meta)
+
+    def _trim_levels(self) -> None:
+        """Drop nodes written after the last saved meta (crash mid-sync)."""
+        size = self.meta["size"]
+        if os.path.exists(self.offsets_path) and os.path.getsize(self.offsets_path) > size * OFFSET.size:
+            os.truncate(self.offsets_path, size * OFFSET.size)
+
+        level = 0
+        while os.path.exists(self._level_path(level)):
+            want = (size >> level) * NODE
+            if os.path.getsize(self._level_path(level)) > want:
+                os.truncate(self._level_path(level), want)
+            level += 1
+
+    @property
+    def size(self) -> int:
+        return self.meta["size"]
+
+    def _node(self, level: int, index: int) -> bytes:
+        with open(self._level_path(level), "rb") as f:
+            f.seek(index * NODE)
+            return f.read(NODE)
+
+    # --- building ---
+
+    def append_leaves(self, record_hashes: List[str]) -> None:
+        """Add leaves and every subtree they complete."""
+        files: Dict[int, Any] = {}
+        # Right edge of each level, so new parents need no reads
+        pending: Dict[int, bytes] = {}
+        size = self.meta["size"]
+
+        try:
+            for h in record_hashes:
+                node = leaf_hash(h)
+                index, level = size, 0
+                while True:
+                    if level not in files:
+                        files[level] = open(self._level_path(level), "ab")
+                    files[level].write(node)
+                    if index % 2 == 0:
+                        pending[level] = node
+                        break
+                    left = pending.pop(level, None)
+                    if left is None:
+                        left = self._node(level, index - 1)
+                    node = node_hash(left, node)
+                    index //= 2
+                    level += 1
+                size += 1
+        finally:
+            for f in files.values():
+                f.flush()
+                os.fsync(f.fileno())
+                f.close()
+
+        self.meta["size"] = size
+
+    def _stale(self, size: int) -> bool:
+        """True if the indexed prefix no longer matches the ledger."""
+        if size < self.meta["offset"]:
+            return True
+        n = self.meta["size"]
+        if n == 0:
+            return False
+        with open(self.offsets_path, "rb") as f:
+            f.seek((n - 1) * OFFSET.size)
+            (last,) = OFFSET.unpack(f.read(OFFSET.size))
+        rec = record_at(self.event_file, last, self.meta["offset"], ("hash",))
+        if rec is None or not isinstance(rec.get("hash"), str):
+            return True
+        return leaf_hash(rec["hash"]) != self._node(0, n - 1)
+
+    def clear(self) -> None:
+        if os.path.exists(self.offsets_path):
+            os.remove(self.offsets_path)
+        level = 0
+        while os.path.exists(self._level_path(level)):
+            os.remove(self._level_path(level))
+            level += 1
+        self.meta = {"size": 0, "offset": 0, "line": 0}
+        self._save_meta()
+
+    def sync(self) -> int:
+        """
+        Index records appended to the ledger since the last sync.
+        Returns the number of new leaves. If the ledger was truncated or
+        rewritten (e.g. by rechain_events.py) the tree is rebuilt. Lines
+        that are not valid JSON or carry no hash are not leaves.
+        """
+        if not os.path.exists(self.event_file):
+            return 0
+
+        hashes: List[str] = []
+        starts: List[int] = []
+        offset, line = self.meta["offset"], self.meta["line"]
+        with open(self.event_file, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+        if self._stale(size):
+            self.clear()
+            offset, line = 0, 0
+
+        # A line still being appended is picked up next time
+        for idx, start, end, rec in iter_records(self.event_file, ("hash",), offset, line,
+                                                 skip_errors=True, complete_only=True):
+            offset, line = end, idx
+            if not isinstance(rec.get("hash"), str):
+                continue
+            hashes.append(rec["hash"])
+            starts.append(start)
+
+        if hashes:
+            with open(self.offsets_path, "ab") as f:
+                f.write(b"".join(OFFSET.pack(s) for s in starts))
+                f.flush()
+                os.fsync(f.fileno())
+            self.append_leaves(hashes)
+        self.meta["offset"], self.meta["line"] = offset, line
+        self._save_meta()
+        return len(hashes)
+
+    # --- tree hashes ---
+
+    def subtree(self, a: int, b: int) -> bytes:
+        """MTH of leaves [a, b) from stored complete subtrees."""
+        n = b - a
+        if n & (n - 1) == 0 and a % n == 0:
+            return self._node(n.bit_length() - 1, a // n)
+        k = _split(n)
+        return node_hash(self.subtree(a, a + k), self.subtree(a + k, b))
+
+    def root(self, size: Optional[int] = None) -> bytes:
+        size = self.size if size is None else size
+        if size == 0:
+            return hashlib.sha256(b"").digest()
+        return self.subtree(0, size)
+
+    # --- proofs ---
+
+    def inclusion_proof(self, index: int, size: Optional[int] = None) -> List[bytes]:
+        size = self.size if size is None else size
+        if not 0 <= index < size <= self.size:
+            raise IndexError(f"leaf {index} not in tree of size {size}")
+
+        def path(a: int, b: int) -> List[bytes]:
+            if b - a == 1:
+                return []
+            k = _split(b - a)
+            if index < a + k:
+                return path(a, a + k) + [self.subtree(a + k, b)]
+            return path(a + k, b) + [self.subtree(a, a + k)]
+
+        return path(0, size)
+
+    def consistency_proof(self, old_size: int, new_size: Optional[int] = None) -> List[bytes]:
+        new_size = self.size if new_size is None else new_size
+        if not 0 < old_size <= new_size <= self.size:
+            raise IndexError(f"no consistency proof for sizes {old_size} -> {new_size}")
+
+        def subproof(m: int, a: int, b: int, start: bool) -> List[bytes]:
+            if m == b - a:
+                return [] if start else [self.subtree(a, b)]
+            k = _split(b - a)
+            if m <= k:
+                return subproof(m, a, a + k, start) + [self.subtree(a + k, b)]
+            return subproof(m - k, a + k, b, False) + [self.subtree(a, a + k)]
+
+        return subproof(old_size, 0, new_size, True)
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """The ledger record behind leaf index, read by byte offset."""
+        if not 0 <= index < self.size:
+            raise IndexError(f"leaf {index} not in tree of size {self.size}")
+        with open(self.offsets_path, "rb") as f:
+            f.seek(index * OFFSET.size)
+            (offset,) = OFFSET.unpack(f.read(OFFSET.size))
+        with open(self.event_file, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def find(self, record_hash: str) -> Optional[int]:
+        """Leaf index of the record with this hash field, if indexed."""
+        target = leaf_hash(record_hash)
+        with open(self._level_path(0), "rb") as f:
+            index = 0
+            while True:
+                block = f.read(NODE * 4096)
+                if not block:
+                    return None
+                for i in range(0, len(block), NODE):
+                    if block[i:i + NODE] == target:
+                        return index + i // NODE
+                index += len(block) // NODE
+
+
+# --- verification (no index needed) ---
+
+def verify_inclusion(record_hash: str, index: int, size: int, proof: List[bytes], root: bytes) -> bool:
+    if index >= size:
+        return False
+    fn, sn = index, size - 1
+    r = leaf_hash(record_hash)
+    for p in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            if not fn & 1:
+                while not fn & 1 and fn != 0:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def verify_consistency(old_size: int, new_size: int, old_root: bytes, new_root: bytes,
+                       proof: List[bytes]) -> bool:
+    if old_size == new_size:
+        return not proof and old_root == new_root
+    if old_size == 0 or old_size > new_size:
+        return False
+
+    if old_size & (old_size - 1) == 0:
+        proof = [old_root] + list(proof)
+    if not proof:
+        return False
+
+    fn, sn = old_size - 1, new_size - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+
+    fr = sr = proof[0]
+    for c in proof[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = node_hash(c, fr)
+            sr = node_hash(c, sr)
+            if not fn & 1:
+                while not fn & 1 and fn != 0:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            sr = node_hash(sr, c)
+        fn >>= 1
+        sn >>= 1
+
+    return sn == 0 and fr == old_root and sr == new_root
+
+
+# --- CLI ---
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Merkle index and proofs for an event ledger")
+    ap.add_argument("--events", default="events.jsonl")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("sync")
+
+    p_root = sub.add_parser("root")
+    p_root.add_argument("--size", type=int)
+
+    p_prove = sub.add_parser("prove")
+    g = p_prove.add_mutually_exclusive_group(required=True)
+    g.add_argument("--index", type=int)
+    g.add_argument("--hash", dest="record_hash")
+    p_prove.add_argument("--size", type=int)
+
+    p_check = sub.add_parser("check")
+    p_check.add_argument("proof_file")
+
+    p_cons = sub.add_parser("consistency")
+    p_cons.add_argument("old_size", type=int)
+    p_cons.add_argument("new_size", type=int, nargs="?")
+
+    p_ccheck = sub.add_parser("check-consistency")
+    p_ccheck.add_argument("proof_file")
+
+    args = ap.parse_args()
+
+    if args.cmd in ("check", "check-consistency"):
+        with open(args.proof_file, "r", encoding="utf-8") as f:
+            proof = json.load(f)
+        path = [bytes.fromhex(p) for p in proof["path"]]
+
+        if args.cmd == "check":
+            ok = verify_inclusion(proof["record_hash"], proof["index"], proof["size"],
+                                  path, bytes.fromhex(proof["root"]))
+        else:
+            ok = verify_consistency(proof["old_size"], proof["new_size"],
+                                    bytes.fromhex(proof["old_root"]),
+                                    bytes.fromhex(proof["new_root"]), path)
+
+        print("PROOF OK" if ok else "PROOF INVALID")
+        return 0 if ok else 1
+
+    tree = MerkleLedger(args.events)
+    tree.sync()
+
+    if args.cmd == "sync":
+        print("MERKLE SYNC OK")
+        print("size:", tree.size)
+        print("root:", tree.root().hex())
+        return 0
+
+    if args.cmd == "root":
+        size = tree.size if args.size is None else args.size
+        print(json.dumps({"size": size, "root": tree.root(size).hex()}))
+        return 0
+
+    if args.cmd == "prove":
+        index = args.index
+        record_hash = args.record_hash
+        if record_hash is not None:
+            index = tree.find(record_hash)
+            if index is None:
+                print("record not found in index", file=sys.stderr)
+                return 2
+        else:
+            record_hash = tree.record(index)["hash"]
+
+        size = tree.size if args.size is None else args.size
+        print(json.dumps({
+            "index": index,
+            "size": size,
+            "record_hash": record_hash,
+            "root": tree.root(size).hex(),
+            "path": [p.hex() for p in tree.inclusion_proof(index, size)],
+        }, indent=2))
+        return 0
+
+    if args.cmd == "consistency":
+        new_size = tree.size if args.new_size is None else args.new_size
+        print(json.dumps({
+            "old_size": args.old_size,
+            "new_size": new_size,
+            "old_root": tree.root(args.old_size).hex(),
+            "new_root": tree.root(new_size).hex(),
+            "path": [p.hex() for p in tree.consistency_proof(args.old_size, new_size)],
+        }, indent=2))
+        return 0
+
+    return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
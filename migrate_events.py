@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import json, sys, os, hashlib, hmac
 
+from head_store import write_head
+
 """
 MIGRATE events.jsonl -> canonical chained log v2
 
@@ -73,8 +75,7 @@ def migrate(in_path: str, out_path: str, head_path: str):
             count += 1
 
     # write new head
-    with open(head_path, "w", encoding="utf-8") as fh:
-        fh.write(last_hash)
+    write_head(head_path, last_hash, out_path)
 
     print("MIGRATION OK")
     print("records:", count)
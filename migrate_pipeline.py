@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+MIGRATE PIPELINE
+----------------
+One streaming pass that does what migrate_events.py, rechain_events.py
+and regen_head.py do separately:
+
+  read -> verify (source scheme) -> normalize prev -> rehash (target scheme) -> write
+
+Each stage is a generator over (line_no, record), so the ledger is read
+once and never held in memory. Hash schemes are pluggable: SCHEMES maps a
+name to the canonical payload the existing tools already hash.
+
+  legacy  verify_events / rechain_events  (drops hash, prev_hash)
+  v2      migrate_events                  (drops hash, hmac; signs with EVENT_HMAC_KEY)
+  regen   regen_head                      (drops hash)
+
+Only schemes whose payload excludes hmac can carry one; an existing hmac
+is dropped before rehashing, and a key with any other target is refused.
+
+Usage:
+  python migrate_pipeline.py events.jsonl out.jsonl --head out.head \
+      --source legacy --target v2
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+import migrate_events
+import regen_head
+import verify_events
+from head_store import write_head
+from ledger_reader import iter_records
+
+Record = Tuple[int, Dict[str, Any]]
+
+# Output buffer for the new ledger
+WRITE_BUFFER = 1 << 20
+
+
+class HashScheme(NamedTuple):
+    payload: Callable[[Dict[str, Any]], bytes]
+    genesis: str
+    ensure_ascii: bool
+    # True when payload() leaves out "hmac", so records can be signed
+    hmac: bool = False
+
+
+SCHEMES: Dict[str, HashScheme] = {
+    "legacy": HashScheme(verify_events.canonical_payload, "0" * 64, False),
+    "v2": HashScheme(migrate_events.canonical_payload, "", True, hmac=True),
+    "regen": HashScheme(lambda rec: regen_head.canonical_payload(rec).encode("utf-8"), "0" * 64, False),
+}
+
+
+def register_scheme(name: str, payload: Callable[[Dict[str, Any]], bytes],
+                    genesis: str = "0" * 64, ensure_ascii: bool = False, hmac: bool = False) -> None:
+    """Make another hash scheme available to --source/--target."""
+    SCHEMES[name] = HashScheme(payload, genesis, ensure_ascii, hmac)
+
+
+class PipelineError(RuntimeError):
+    pass
+
+
+# --- stages ---
+
+def read_stage(path: str) -> Iterator[Record]:
+    try:
+        for line_no, _start, _end, rec in iter_records(path):
+            yield line_no, rec
+    except ValueError:
+        raise PipelineError("Bad JSON line encountered in input log.")
+
+
+def verify_stage(records: Iterable[Record], scheme: HashScheme, stats: Dict[str, Any]) -> Iterator[Record]:
+    """Check stored hash and linkage under the source scheme as records pass."""
+    last: Optional[str] = None
+    for line_no, rec in records:
+        stored = rec.get("hash")
+        if stored is None:
+            raise PipelineError(f"MISSING HASH at line {line_no}")
+        if stored != verify_events.sha256_hex(scheme.payload(rec)):
+            raise PipelineError(f"HASH MISMATCH at line {line_no}")
+
+        prev = rec.get("prev", rec.get("prev_hash"))
+        if last is not None and prev != last:
+            raise PipelineError(f"CHAIN BREAK at line {line_no}")
+
+        last = stored
+        stats["source_head"] = stored
+        yield line_no, rec
+
+
+def normalize_stage(records: Iterable[Record], relink: bool) -> Iterator[Record]:
+    """
+    Collapse prev/prev_hash into "prev". relink points prev at the hash
+    the previous output record will get; without it the stored value is
+    kept, as migrate_events does. The hash stage fills in relinked prevs.
+    """
+    for line_no, rec in records:
+        prev = rec.pop("prev_hash", None)
+        if rec.get("prev") is not None:
+            prev = rec["prev"]
+        if relink:
+            prev = None
+        rec["prev"] = prev
+        yield line_no, rec
+
+
+def hash_stage(records: Iterable[Record], scheme: HashScheme,
+               hmac_key: bytes = b"") -> Iterator[Record]:
+    last = scheme.genesis
+    for line_no, rec in records:
+        if rec["prev"] is None:
+            rec["prev"] = last
+        # A carried-over hmac would otherwise end up inside the payload
+        rec.pop("hmac", None)
+        payload = scheme.payload(rec)
+        rec["hash"] = verify_events.sha256_hex(payload)
+        if hmac_key:
+            rec["hmac"] = hmac.new(hmac_key, payload, hashlib.sha256).hexdigest()
+        last = rec["hash"]
+        yield line_no, rec
+
+
+def write_stage(records: Iterable[Record], out_path: str, scheme: HashScheme) -> Tuple[int, str]:
+    """Write to <out>.tmp, fsync and rename over out_path. Returns (count, head)."""
+    tmp = out_path + ".tmp"
+    count = 0
+    head = ""
+    with open(tmp, "w", encoding="utf-8", buffering=WRITE_BUFFER) as out:
+        for _line_no, rec in records:
+            out.write(json.dumps(rec, separators=(",", ":"), ensure_ascii=scheme.ensure_ascii) + "\n")
+            head = rec["hash"]
+            count += 1
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp, out_path)
+    return count, head
+
+
+def run(in_path: str, out_path: str, head_path: Optional[str], source: Optional[str] = "legacy",
+        target: str = "legacy", relink: bool = True, hmac_key: bytes = b"") -> Dict[str, Any]:
+    """Run the full pipeline; raises PipelineError if the source fails to verify."""
+    for name in (source, target):
+        if name is not None and name not in SCHEMES:
+            raise PipelineError(f"unknown hash scheme: {name}")
+
+    tgt = SCHEMES[target]
+    if hmac_key and not tgt.hmac:
+        raise PipelineError(f"hash scheme {target} hashes hmac into the payload; cannot sign with a key")
+    stats: Dict[str, Any] = {"source_head": None}
+
+    records: Iterable[Record] = read_stage(in_path)
+    if source is not None:
+        records = verify_stage(records, SCHEMES[source], stats)
+    records = normalize_stage(records, relink)
+    records = hash_stage(records, tgt, hmac_key)
+
+    try:
+        count, head = write_stage(records, out_path, tgt)
+    except BaseException:
+        try:
+            os.remove(out_path + ".tmp")
+        except FileNotFoundError:
+            pass
+        raise
+
+    if head_path and head:
+        write_head(head_path, head)
+
+    stats.update(count=count, head=head)
+    return stats
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Verify, migrate and rechain an event ledger in one pass")
+    ap.add_argument("in_events")
+    ap.add_argument("out_events")
+    ap.add_argument("--head", default="events.head", help="head file for the new ledger")
+    ap.add_argument("--source", default="legacy",
+                    help="hash scheme to verify the input against, or 'none' (%s)" % ", ".join(SCHEMES))
+    ap.add_argument("--target", default="legacy", help="hash scheme for the output")
+    ap.add_argument("--keep-prev", action="store_true",
+                    help="keep stored prev values instead of relinking the chain")
+    args = ap.parse_args()
+
+    key = os.environ.get("EVENT_HMAC_KEY", "").encode("utf-8")
+    source = None if args.source == "none" else args.source
+
+    try:
+        stats = run(args.in_events, args.out_events, args.head, source=source, target=args.target,
+                    relink=not args.keep_prev, hmac_key=key)
+    except PipelineError as e:
+        print(f"MIGRATION FAILED: {e}", file=sys.stderr)
+        return 2
+
+    print("MIGRATION OK")
+    print("records:", stats["count"])
+    if source is not None:
+        print("source_head:", stats["source_head"])
+    print("head:", stats["head"])
+    print("hmac_enabled:", bool(key))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,10 +5,13 @@ Reads events.jsonl and reveals behavioral structure through metrics.
 No mutation. Pure observation.
 """
 
-import json
+import argparse
 from collections import Counter, defaultdict
 from datetime import datetime, timezone
 
+from ledger_columns import ColumnStore
+from ledger_reader import load_records
+
 EVENT_FILE = "events.jsonl"
 
 
@@ -16,22 +19,18 @@ def now_iso():
     return datetime.now(timezone.utc).isoformat()
 
 
+def iter_events(path):
+    # Only the fields summarize() reads; skip full JSON decoding where possible
+    return load_records(path, fields=("type", "actor", "outcome"))
+
+
 def load_events(path):
-    events = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                events.append(json.loads(line))
-            except Exception:
-                continue
-    return events
+    return list(iter_events(path))
 
 
 def summarize(events):
-    total = len(events)
+    # One pass over any iterable, so a stream of records is never held whole
+    total = 0
 
     types = Counter()
     actors = Counter()
@@ -45,6 +44,7 @@ def summarize(events):
         a = e.get("actor", "unknown")
         o = e.get("outcome", "unknown")
 
+        total += 1
         types[t] += 1
         actors[a] += 1
         outcomes[o] += 1
@@ -62,23 +62,42 @@ def summarize(events):
     }
 
 
+def summarize_columns(store):
+    """summarize() over the columnar store, using vectorized counts."""
+    return {
+        "total": store.rows,
+        "types": store.counts("type"),
+        "actors": store.counts("actor"),
+        "outcomes": store.counts("outcome"),
+        "transitions": store.transitions("type"),
+    }
+
+
 def print_section(title):
     print("\n" + "=" * 60)
     print(title)
     print("=" * 60)
 
 
-def reveal():
+def reveal(columnar=False):
     print("=== MODEL REVEAL OBSERVER ===")
     print("ts:", now_iso())
 
-    events = load_events(EVENT_FILE)
+    if columnar:
+        store = ColumnStore(EVENT_FILE)
+        store.sync()
+        if not store.rows:
+            print("No events found.")
+            return
+        s = summarize_columns(store)
+    else:
+        events = load_events(EVENT_FILE)
 
-    if not events:
-        print("No events found.")
-        return
+        if not events:
+            print("No events found.")
+            return
 
-    s = summarize(events)
+        s = summarize(events)
 
     print_section("GLOBAL")
     print("total_events:", s["total"])
@@ -108,4 +127,7 @@ def reveal():
 
 
 if __name__ == "__main__":
-    reveal()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--columnar", action="store_true",
+                    help="summarize from the ledger_columns.py store (synced first)")
+    reveal(ap.parse_args().columnar)
@@ -0,0 +1,242 @@
+"""
+Persistent (immutable) hash map with structural sharing.
+
+A hash array mapped trie: 32-way nodes indexed by 5-bit slices of the
+key hash. set/delete copy only the nodes on one root-to-leaf path, so an
+update costs O(log32 n) and every older map stays valid and unchanged.
+"""
+
+from collections.abc import Mapping
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_BITS = 64
+
+
+def _hash(key) -> int:
+    return hash(key) & ((1 << _HASH_BITS) - 1)
+
+
+def _index(bitmap: int, bit: int) -> int:
+    return bin(bitmap & (bit - 1)).count("1")
+
+
+class _Node:
+    """Bitmap-indexed node. Items are (key, value) tuples or child nodes."""
+
+    __slots__ = ("bitmap", "items")
+
+    def __init__(self, bitmap, items):
+        self.bitmap = bitmap
+        self.items = items
+
+
+class _Collision:
+    """Keys whose full hashes are equal."""
+
+    __slots__ = ("pairs",)
+
+    def __init__(self, pairs):
+        self.pairs = pairs
+
+
+_EMPTY = _Node(0, ())
+_MISSING = object()
+
+
+def _get(node, h, shift, key):
+    while True:
+        if type(node) is _Collision:
+            for k, v in node.pairs:
+                if k == key:
+                    return v
+            return _MISSING
+
+        bit = 1 << ((h >> shift) & _MASK)
+        if not node.bitmap & bit:
+            return _MISSING
+
+        item = node.items[_index(node.bitmap, bit)]
+        if type(item) is tuple:
+            return item[1] if item[0] == key else _MISSING
+
+        node = item
+        shift += _BITS
+
+
+def _merge(pair1, h1, pair2, h2, shift):
+    """Smallest subtree holding two leaves with different keys."""
+    if shift >= _HASH_BITS:
+        return _Collision((pair1, pair2))
+
+    b1 = (h1 >> shift) & _MASK
+    b2 = (h2 >> shift) & _MASK
+    if b1 == b2:
+        return _Node(1 << b1, (_merge(pair1, h1, pair2, h2, shift + _BITS),))
+    if b1 < b2:
+        return _Node((1 << b1) | (1 << b2), (pair1, pair2))
+    return _Node((1 << b1) | (1 << b2), (pair2, pair1))
+
+
+def _set(node, h, shift, key, value):
+    """Returns (new_node, added)."""
+    if type(node) is _Collision:
+        for i, (k, v) in enumerate(node.pairs):
+            if k == key:
+                if v is value:
+                    return node, False
+                return _Collision(node.pairs[:i] + ((key, value),) + node.pairs[i + 1:]), False
+        return _Collision(node.pairs + ((key, value),)), True
+
+    bit = 1 << ((h >> shift) & _MASK)
+    idx = _index(node.bitmap, bit)
+    items = node.items
+
+    if not node.bitmap & bit:
+        return _Node(node.bitmap | bit, items[:idx] + ((key, value),) + items[idx:]), True
+
+    item = items[idx]
+    if type(item) is tuple:
+        if item[0] == key:
+            if item[1] is value:
+                return node, False
+            new_item = (key, value)
+            added = False
+        else:
+            new_item = _merge(item, _hash(item[0]), (key, value), h, shift + _BITS)
+            added = True
+    else:
+        new_item, added = _set(item, h, shift + _BITS, key, value)
+        if new_item is item:
+            return node, False
+
+    return _Node(node.bitmap, items[:idx] + (new_item,) + items[idx + 1:]), added
+
+
+def _delete(node, h, shift, key):
+    """Returns the new node, None when it became empty, or node if key is absent."""
+    if type(node) is _Collision:
+        pairs = tuple(p for p in node.pairs if p[0] != key)
+        if len(pairs) == len(node.pairs):
+            return node
+        return _Collision(pairs) if len(pairs) > 1 else pairs[0]
+
+    bit = 1 << ((h >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return node
+
+    idx = _index(node.bitmap, bit)
+    items = node.items
+    item = items[idx]
+
+    if type(item) is tuple:
+        if item[0] != key:
+            return node
+        new_item = None
+    else:
+        new_item = _delete(item, h, shift + _BITS, key)
+        if new_item is item:
+            return node
+        # Pull a lone leaf up so lookups stay short
+        if type(new_item) is _Node and len(new_item.items) == 1 and type(new_item.items[0]) is tuple:
+            new_item = new_item.items[0]
+
+    if new_item is None:
+        if node.bitmap == bit:
+            return None
+        return _Node(node.bitmap & ~bit, items[:idx] + items[idx + 1:])
+
+    return _Node(node.bitmap, items[:idx] + (new_item,) + items[idx + 1:])
+
+
+def _iter(node):
+    if type(node) is _Collision:
+        yield from node.pairs
+        return
+    for item in node.items:
+        if type(item) is tuple:
+            yield item
+        else:
+            yield from _iter(item)
+
+
+class PersistentMap(Mapping):
+    """
+    Immutable mapping; set/delete/update return a new map that shares
+    all untouched structure with the old one.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, items=None):
+        self._root = _EMPTY
+        self._size = 0
+        if items:
+            other = self.update(items)
+            self._root, self._size = other._root, other._size
+
+    @classmethod
+    def _make(cls, root, size):
+        m = cls.__new__(cls)
+        m._root = root
+        m._size = size
+        return m
+
+    def __getitem__(self, key):
+        v = _get(self._root, _hash(key), 0, key)
+        if v is _MISSING:
+            raise KeyError(key)
+        return v
+
+    def get(self, key, default=None):
+        v = _get(self._root, _hash(key), 0, key)
+        return default if v is _MISSING else v
+
+    def __contains__(self, key):
+        return _get(self._root, _hash(key), 0, key) is not _MISSING
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for k, _ in _iter(self._root):
+            yield k
+
+    def items(self):
+        return list(_iter(self._root))
+
+    def __eq__(self, other):
+        if isinstance(other, PersistentMap) and other._root is self._root:
+            return True
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"PersistentMap({dict(_iter(self._root))!r})"
+
+    def set(self, key, value):
+        root, added = _set(self._root, _hash(key), 0, key, value)
+        if root is self._root:
+            return self
+        return self._make(root, self._size + added)
+
+    def delete(self, key):
+        root = _delete(self._root, _hash(key), 0, key)
+        if root is self._root:
+            return self
+        return self._make(root if root is not None else _EMPTY, self._size - 1)
+
+    def update(self, items):
+        """New map with every key/value from a mapping or iterable of pairs."""
+        if isinstance(items, Mapping):
+            items = items.items()
+
+        root, size = self._root, self._size
+        for k, v in items:
+            root, added = _set(root, _hash(k), 0, k, v)
+            size += added
+
+        if root is self._root:
+            return self
+        return self._make(root, size)
@@ -1,15 +1,27 @@
 #!/usr/bin/env python3
 
+import argparse
 import json
-import hashlib
+import os
 from datetime import datetime, timezone
 
+import head_store
+from atomic_file import atomic_write_json, fsync_dir
+from ledger_reader import iter_records
+from verify_events import legacy_hash
+
 MAIN_FILE = "events.jsonl"
 MAIN_HEAD_FILE = "events.head"
 
 SAFE_FILE = "events.saferoom.jsonl"
 SAFE_HEAD_FILE = "events.saferoom.head"
 
+# prev of the first record in an empty ledger, as verify_events expects
+GENESIS = "0" * 64
+
+# Bulk mode: bytes buffered before each write to the main ledger
+CHUNK_BYTES = 4 << 20
+
 
 # -------------------------------------------------
 # utils
@@ -18,18 +30,6 @@ SAFE_HEAD_FILE = "events.saferoom.head"
 def now_iso():
     return datetime.now(timezone.utc).isoformat()
 
-def sha256_hex(payload: bytes):
-    return hashlib.sha256(payload).hexdigest()
-
-def canonical_payload(rec):
-    clean = dict(rec)
-    clean.pop("hash", None)
-    return json.dumps(
-        clean,
-        sort_keys=True,
-        separators=(",", ":")
-    ).encode()
-
 def read_lines(path):
     try:
         with open(path, "r", encoding="utf-8") as f:
@@ -43,15 +43,10 @@ def write_lines(path, records):
             f.write(json.dumps(r, separators=(",", ":")) + "\n")
 
 def load_head(path):
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read().strip() or None
-    except FileNotFoundError:
-        return None
+    return head_store.read_head(path)
 
-def write_head(path, head):
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(head or "")
+def write_head(path, head, event_file=None):
+    head_store.write_head(path, head or "", event_file)
 
 
 # -------------------------------------------------
@@ -69,7 +64,7 @@ def promote():
     print("safe_records:", len(safe))
     print("starting_main_head:", main_head)
 
-    prev = main_head
+    prev = main_head or GENESIS
 
     promoted = 0
 
@@ -84,8 +79,8 @@ def promote():
         r["lane"] = "promoted_saferoom"
         r["promoted_ts"] = now_iso()
 
-        payload = canonical_payload(r)
-        h = sha256_hex(payload)
+        # Same canonical encoding verify_events checks
+        h = legacy_hash(r)
 
         r["hash"] = h
         prev = h
@@ -94,7 +89,7 @@ def promote():
         promoted += 1
 
     write_lines(MAIN_FILE, main)
-    write_head(MAIN_HEAD_FILE, prev)
+    write_head(MAIN_HEAD_FILE, prev, MAIN_FILE)
 
     print("PROMOTION COMPLETE")
     print("promoted_records:", promoted)
@@ -103,5 +98,207 @@ def promote():
     return 0
 
 
+# -------------------------------------------------
+# bulk promotion (streaming)
+# -------------------------------------------------
+
+class PromotionError(RuntimeError):
+    pass
+
+
+def journal_path(main_file):
+    return main_file + ".promote"
+
+
+def write_journal(main_file, state):
+    atomic_write_json(journal_path(main_file), state)
+
+
+def last_record_hash(path):
+    """Hash of the last record in a JSONL file, reading only its tail."""
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return None
+
+    block = 1 << 16
+    with open(path, "rb") as f:
+        tail = b""
+        pos = size
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            stripped = tail.rstrip()
+            if b"\n" in stripped or pos == 0:
+                line = stripped.rsplit(b"\n", 1)[-1]
+                return json.loads(line).get("hash") if line.strip() else None
+    return None
+
+
+def lane_hash_ok(rec):
+    """Current saferoom records hash prev too; older ones were hashed without it."""
+    stored = rec.get("hash")
+    if stored is None:
+        return False
+    if stored == legacy_hash(rec):
+        return True
+    unlinked = dict(rec)
+    unlinked.pop("prev", None)
+    return stored == legacy_hash(unlinked)
+
+
+def iter_verified_lane(path, lane_head):
+    """
+    Stream the saferoom lane, checking each record's hash and linkage as it
+    passes. Each saferoom session opens with prev=None (fresh lane) or the
+    lane head it started from.
+    """
+    last = None
+    for line_no, _start, _end, rec in iter_records(path):
+        stored = rec.get("hash")
+        if not lane_hash_ok(rec):
+            raise PromotionError(f"saferoom HASH MISMATCH at line {line_no}")
+        prev = rec.get("prev", rec.get("prev_hash"))
+        if last is None:
+            if prev not in (None, "", "0" * 64):
+                raise PromotionError(f"saferoom CHAIN BREAK at line {line_no}")
+        elif prev != last:
+            raise PromotionError(f"saferoom CHAIN BREAK at line {line_no}")
+        last = stored
+        yield rec
+
+    if lane_head is not None and last is not None and lane_head != last:
+        raise PromotionError("saferoom head does not match last lane record")
+
+
+def finish_lane(safe_file, safe_head_file, stamp):
+    """Retire the promoted lane so the next saferoom session starts fresh."""
+    if os.path.exists(safe_file):
+        os.replace(safe_file, f"{safe_file}.promoted-{stamp}")
+    try:
+        os.remove(safe_head_file)
+    except FileNotFoundError:
+        pass
+    fsync_dir(safe_file)
+
+
+def recover_bulk(main_file, main_head_file, safe_file, safe_head_file):
+    """
+    Complete or roll back a bulk promotion interrupted by a crash. Returns
+    True if the promotion had already committed (main head moved).
+    """
+    try:
+        with open(journal_path(main_file), "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return False
+
+    if state["phase"] == "append":
+        # Main head never moved: drop the partial splice
+        with open(main_file, "r+b") as f:
+            f.truncate(state["main_size"])
+            f.flush()
+            os.fsync(f.fileno())
+        committed = False
+    else:
+        write_head(main_head_file, state["head"])
+        finish_lane(safe_file, safe_head_file, state["stamp"])
+        committed = True
+
+    os.remove(journal_path(main_file))
+    return committed
+
+
+def promote_bulk(main_file=MAIN_FILE, main_head_file=MAIN_HEAD_FILE,
+                 safe_file=SAFE_FILE, safe_head_file=SAFE_HEAD_FILE, chunk_bytes=CHUNK_BYTES):
+    """
+    Single streaming pass: verify the saferoom lane, re-link each record
+    onto the main head and append them to main in large chunks. The main
+    ledger is never rewritten, only extended. A journal next to it records
+    the pre-splice size so a crash either rolls the splice back (head not
+    yet moved) or finishes retiring the lane (head moved).
+    """
+    print("=== PROMOTE SAFEROOM → MAIN (BULK) ===")
+
+    if recover_bulk(main_file, main_head_file, safe_file, safe_head_file):
+        print("completed interrupted promotion")
+        print("new_head:", load_head(main_head_file))
+        return 0
+
+    main_head = load_head(main_head_file)
+    if main_head != last_record_hash(main_file):
+        print("PROMOTION FAILED: main head does not match last main record")
+        return 1
+
+    if not os.path.exists(safe_file):
+        print("nothing to promote")
+        return 0
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    main_size = os.path.getsize(main_file) if os.path.exists(main_file) else 0
+    print("starting_main_head:", main_head)
+
+    write_journal(main_file, {"phase": "append", "main_size": main_size, "stamp": stamp})
+
+    prev = main_head or GENESIS
+    promoted = 0
+    buf = []
+    buffered = 0
+
+    try:
+        with open(main_file, "ab") as out:
+            for r in iter_verified_lane(safe_file, load_head(safe_head_file)):
+                r.pop("prev_hash", None)
+                r["prev"] = prev
+                r["lane"] = "promoted_saferoom"
+                r["promoted_ts"] = now_iso()
+                r["hash"] = prev = legacy_hash(r)
+
+                line = (json.dumps(r, separators=(",", ":")) + "\n").encode("utf-8")
+                buf.append(line)
+                buffered += len(line)
+                promoted += 1
+                if buffered >= chunk_bytes:
+                    out.write(b"".join(buf))
+                    buf.clear()
+                    buffered = 0
+
+            out.write(b"".join(buf))
+            out.flush()
+            os.fsync(out.fileno())
+    except BaseException as e:
+        recover_bulk(main_file, main_head_file, safe_file, safe_head_file)
+        if isinstance(e, PromotionError):
+            print(f"PROMOTION FAILED: {e}")
+            return 1
+        raise
+
+    if promoted:
+        # Commit point: from here recovery rolls forward, not back
+        write_journal(main_file, {"phase": "heads", "main_size": main_size, "stamp": stamp, "head": prev})
+        write_head(main_head_file, prev)
+        finish_lane(safe_file, safe_head_file, stamp)
+    os.remove(journal_path(main_file))
+
+    print("PROMOTION COMPLETE")
+    print("promoted_records:", promoted)
+    print("new_head:", prev)
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bulk", action="store_true",
+                    help="stream and verify the lane, append to main in chunks and retire the lane")
+    ap.add_argument("--chunk-bytes", type=int, default=CHUNK_BYTES)
+    args = ap.parse_args()
+
+    if args.bulk:
+        return promote_bulk(chunk_bytes=args.chunk_bytes)
+    return promote()
+
+
 if __name__ == "__main__":
-    raise SystemExit(promote())
+    raise SystemExit(main())
@@ -1,51 +1,143 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-import sys
+import argparse
 import json
-from typing import Any, Dict, List
+import os
+from typing import Any, Dict, Optional
+from atomic_file import atomic_write_json
+from head_store import write_head
+from ledger_reader import iter_records, record_at
 from verify_events import legacy_hash
 
-def write_head(head_path: str, head: str) -> None:
-    with open(head_path, "w", encoding="utf-8") as f:
-        f.write(head + "\n")
+# Records between progress checkpoints
+CHECKPOINT_EVERY = 10000
+
+
+def progress_path(out_path: str) -> str:
+    return out_path + ".progress"
+
+
+def load_progress(out_path: str, in_path: str) -> Optional[Dict[str, Any]]:
+    """Progress of an interrupted run over the same input, if usable."""
+    try:
+        with open(progress_path(out_path), "r", encoding="utf-8") as f:
+            prog = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if prog.get("in_path") != os.path.abspath(in_path):
+        return None
+    if not os.path.exists(out_path + ".tmp"):
+        return None
+    if os.path.getsize(out_path + ".tmp") < prog["out_bytes"]:
+        return None
+    if os.path.getsize(in_path) < prog["in_offset"]:
+        return None
+    if prog["line"]:
+        # The last input record consumed must still be there, unchanged
+        try:
+            rec = record_at(in_path, prog["in_record_offset"], prog["in_offset"])
+        except (FileNotFoundError, KeyError):
+            return None
+        if rec is None or legacy_hash(rec) != prog.get("in_hash"):
+            return None
+    return prog
+
+
+def save_progress(out_path: str, prog: Dict[str, Any]) -> None:
+    atomic_write_json(progress_path(out_path), prog)
 
-def main() -> int:
-    if len(sys.argv) != 4:
-        print("Usage: python rechain_events.py <in_events.jsonl> <out_events.jsonl> <head_file>")
-        return 2
 
-    in_path, out_path, head_path = sys.argv[1], sys.argv[2], sys.argv[3]
+def rechain(in_path: str, out_path: str, head_path: str,
+            every: int = CHECKPOINT_EVERY, restart: bool = False) -> Dict[str, Any]:
+    """
+    Stream in_path into out_path with a fresh legacy-hash chain.
 
-    prev = "0" * 64
-    out_lines: List[str] = []
-    count = 0
+    Output goes to <out>.tmp; every `every` records it is fsynced and
+    <out>.progress records the input offset and chain head reached, plus
+    the hash of the last input record consumed, so an interrupted run over
+    the same, unchanged input picks up where it left off. The tmp file is renamed
+    over out_path and the head written only once the whole input is done.
+    """
+    tmp_path = out_path + ".tmp"
+    prog = None if restart else load_progress(out_path, in_path)
+    if prog is None:
+        prog = {
+            "in_path": os.path.abspath(in_path),
+            "in_offset": 0,
+            "line": 0,
+            "out_bytes": 0,
+            "count": 0,
+            "prev": "0" * 64,
+        }
+        resumed = False
+    else:
+        resumed = True
 
-    with open(in_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+    out = open(tmp_path, "r+b" if resumed else "wb")
+    try:
+        # Drop anything written after the last checkpoint
+        out.truncate(prog["out_bytes"])
+        out.seek(prog["out_bytes"])
 
-            rec: Dict[str, Any] = json.loads(line)
+        prev = prog["prev"]
+        count = prog["count"]
+        since = 0
+
+        for line_no, start, end, rec in iter_records(in_path, start_offset=prog["in_offset"],
+                                                      start_line=prog["line"]):
             rec.pop("prev_hash", None)
 
             rec["prev"] = prev
             rec["hash"] = legacy_hash(rec)
 
             prev = rec["hash"]
-            out_lines.append(json.dumps(rec, ensure_ascii=False) + "\n")
+            out.write((json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8"))
             count += 1
+            since += 1
+
+            if since >= every:
+                out.flush()
+                os.fsync(out.fileno())
+                prog.update(in_offset=end, line=line_no, out_bytes=out.tell(), count=count, prev=prev,
+                            in_record_offset=start, in_hash=legacy_hash(record_at(in_path, start, end)))
+                save_progress(out_path, prog)
+                since = 0
 
-    with open(out_path, "w", encoding="utf-8") as out:
-        out.writelines(out_lines)
+        out.flush()
+        os.fsync(out.fileno())
+    finally:
+        out.close()
 
+    os.replace(tmp_path, out_path)
     write_head(head_path, prev)
+    try:
+        os.remove(progress_path(out_path))
+    except FileNotFoundError:
+        pass
+
+    return {"count": count, "head": prev, "resumed": resumed}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Rebuild the hash chain of an event ledger")
+    ap.add_argument("in_events")
+    ap.add_argument("out_events")
+    ap.add_argument("head_file")
+    ap.add_argument("--every", type=int, default=CHECKPOINT_EVERY,
+                    help="records between progress checkpoints")
+    ap.add_argument("--restart", action="store_true",
+                    help="ignore progress from an interrupted run")
+    args = ap.parse_args()
+
+    result = rechain(args.in_events, args.out_events, args.head_file,
+                     every=max(1, args.every), restart=args.restart)
 
-    print("RECHAIN OK")
-    print("in_records:", count)
-    print("out_records:", count)
-    print("head:", prev)
+    print("RECHAIN OK" + (" (resumed)" if result["resumed"] else ""))
+    print("in_records:", result["count"])
+    print("out_records:", result["count"])
+    print("head:", result["head"])
     return 0
 
 if __name__ == "__main__":
@@ -1,51 +1,47 @@
-import json
 from atomic_state import CanonicalState
+from checkpoint import CheckpointStore
+from wal import WALCorruption
 
 
 class RecoveryEngine:
     """
     Deterministic reconstruction of canonical state from WAL.
     Schema-tolerant recovery.
+
+    With a checkpoint_dir, recovery starts from the newest valid checkpoint
+    and replays only WAL entries after the seq it covers. If segments were
+    dropped past what that checkpoint covers (or there is no checkpoint),
+    the state cannot be rebuilt and WALCorruption is raised.
     """
 
-    def __init__(self, wal_path="wal.log"):
+    def __init__(self, wal_path="wal.log", checkpoint_dir=None):
         self.wal_path = wal_path
+        self.checkpoint_dir = checkpoint_dir
 
     def recover(self) -> CanonicalState:
-        state = CanonicalState(self.wal_path)
-
-        entries = state.wal.read_all()
-
-        committed = set()
-        transitions = {}
-
-        # First pass: classify entries
-        for entry in entries:
-            status = entry.get("status")
-
-            if status == "pending":
-                transitions[entry["seq"]] = entry
-
-            elif status == "committed":
-                committed.add(entry["seq"])
-
-            elif status == "failed":
-                transitions.pop(entry["seq"], None)
-
-        # Second pass: apply only committed transitions
-        for seq in sorted(committed):
-            if seq not in transitions:
-                continue
-
-            transition_block = transitions[seq].get("transition", {})
-
-            # Schema-tolerant extraction
-            if isinstance(transition_block, dict):
-                event = transition_block.get("event", transition_block)
-            else:
-                continue
-
-            state.data = state.apply_transition(event)
-            state.version += 1
+        checkpoints = None
+        if self.checkpoint_dir is not None:
+            checkpoints = CheckpointStore(self.checkpoint_dir)
+
+        state = CanonicalState(self.wal_path, checkpoints=checkpoints)
+
+        if checkpoints is not None:
+            cp = checkpoints.latest()
+            if cp is not None:
+                state.restore(cp["data"], cp["version"], cp["seq"])
+
+        dropped = state.wal.dropped_seq()
+        if dropped > state.applied_seq:
+            state.wal.close()
+            raise WALCorruption(
+                f"{self.wal_path}: records up to seq {dropped} were dropped "
+                f"but the checkpoint only covers seq {state.applied_seq}"
+            )
+
+        # Drop a torn tail from a crash mid-append before replaying
+        state.wal.repair()
+
+        # Replay only what the checkpoint (if any) does not cover
+        state.replay(state.wal.iter_entries(from_seq=state.applied_seq + 1))
 
         return state
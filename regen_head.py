@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 import json, hashlib, sys, argparse
 
+from head_store import write_head
+from ledger_reader import iter_records
+
 def canonical_payload(evt: dict) -> str:
     """
     Canonicalize the payload for hashing:
@@ -25,48 +28,42 @@ def main():
     last_hash = None
     line_no = 0
 
-    with open(args.events, "r", encoding="utf-8") as f:
-        for raw in f:
-            raw = raw.strip()
-            if not raw:
-                continue
-            line_no += 1
-            evt = json.loads(raw)
+    for _idx, _start, _end, evt in iter_records(args.events):
+        line_no += 1
+
+        stored = evt.get("hash")
+        prev = evt.get("prev")
 
-            stored = evt.get("hash")
-            prev = evt.get("prev")
+        calc = sha256_hex(canonical_payload(evt))
 
-            calc = sha256_hex(canonical_payload(evt))
+        if stored != calc:
+            msg = f"HASH MISMATCH at line {line_no}\n  expected: {stored}\n  found   : {calc}"
+            if args.strict:
+                print(msg, file=sys.stderr)
+                return 2
+            else:
+                # stop at last good; treat remaining as non-canonical/noise
+                break
 
-            if stored != calc:
-                msg = f"HASH MISMATCH at line {line_no}\n  expected: {stored}\n  found   : {calc}"
+        if line_no == 1:
+            # first record can have prev null/""/None
+            pass
+        else:
+            if prev != last_hash:
+                msg = f"CHAIN BREAK at line {line_no}\n  prev field: {prev}\n  expected  : {last_hash}"
                 if args.strict:
                     print(msg, file=sys.stderr)
-                    return 2
+                    return 3
                 else:
-                    # stop at last good; treat remaining as non-canonical/noise
                     break
 
-            if line_no == 1:
-                # first record can have prev null/""/None
-                pass
-            else:
-                if prev != last_hash:
-                    msg = f"CHAIN BREAK at line {line_no}\n  prev field: {prev}\n  expected  : {last_hash}"
-                    if args.strict:
-                        print(msg, file=sys.stderr)
-                        return 3
-                    else:
-                        break
-
-            last_hash = stored
+        last_hash = stored
 
     if not last_hash:
         print("No valid events found; cannot write head.", file=sys.stderr)
         return 4
 
-    with open(args.head, "w", encoding="utf-8") as out:
-        out.write(last_hash + "\n")
+    write_head(args.head, last_hash)
 
     print("HEAD REGENERATED OK")
     print("head:", last_hash)
@@ -20,6 +20,9 @@ import time
 from datetime import datetime, UTC
 from typing import Dict, Any, List, Optional
 
+import head_store
+from ledger_service import LedgerClient
+
 # --- canonical hashing: identical to verifier ---
 try:
     from verify_events import canonical_payload, sha256_hex
@@ -42,17 +45,11 @@ def now_iso() -> str:
 
 
 def read_head(path: str) -> Optional[str]:
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            s = f.read().strip()
-            return s or None
-    except FileNotFoundError:
-        return None
+    return head_store.read_head(path)
 
 
-def write_head(path: str, h: str) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(h + "\n")
+def write_head(path: str, h: str, event_file: Optional[str] = None) -> None:
+    head_store.write_head(path, h, event_file)
 
 
 def append_jsonl(path: str, rec: Dict[str, Any]) -> None:
@@ -76,7 +73,7 @@ def make_event(event_type: str, cycle: int, prev: Optional[str], **fields: Any)
 def open_saferoom(event_file: str, head_file: str, prev: Optional[str]) -> str:
     rec = make_event("SAFEROOM_OPEN", 0, prev)
     append_jsonl(event_file, rec)
-    write_head(head_file, rec["hash"])
+    write_head(head_file, rec["hash"], event_file)
     return rec["hash"]
 
 
@@ -86,19 +83,37 @@ def saferoom_cycles(event_file: str, head_file: str, start_prev: str, n: int, sl
         rec = make_event("SAFEROOM_CYCLE", i, prev)
         append_jsonl(event_file, rec)
         prev = rec["hash"]
-        write_head(head_file, prev)
+        write_head(head_file, prev, event_file)
         print(f"[SAFE CYCLE {i}] -> {prev[:16]}...")
         if sleep_s > 0:
             time.sleep(sleep_s)
     return prev
 
 
+def saferoom_via_service(socket_path: str, n: int, sleep_s: float) -> str:
+    # The service assigns prev/hash, so records go out unchained
+    with LedgerClient(socket_path) as client:
+        print("starting_head:", client.head())
+        prev = client.append({"ts": now_iso(), "type": "SAFEROOM_OPEN", "cycle": 0})
+        print("(SAFEROOM OPENED)")
+
+        print("Starting saferoom push")
+        for i in range(1, n + 1):
+            prev = client.append({"ts": now_iso(), "type": "SAFEROOM_CYCLE", "cycle": i})
+            print(f"[SAFE CYCLE {i}] -> {prev[:16]}...")
+            if sleep_s > 0:
+                time.sleep(sleep_s)
+    return prev
+
+
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--lane", choices=["main", "isolated"], default="isolated",
                     help="main=append into events.jsonl/events.head; isolated=separate saferoom ledger")
     ap.add_argument("--push", type=int, default=5, help="number of SAFEROOM_CYCLE events")
     ap.add_argument("--sleep", type=float, default=1.0, help="sleep seconds between cycles (0 disables)")
+    ap.add_argument("--socket", default=None,
+                    help="append through a ledger_service.py socket serving this lane's ledger")
     args = ap.parse_args()
 
     if args.lane == "main":
@@ -108,6 +123,15 @@ def main() -> int:
         event_file = DEFAULT_EVENT_FILE_SAFE
         head_file  = DEFAULT_HEAD_FILE_SAFE
 
+    if args.socket:
+        print("SAFEROOM v2")
+        print("lane:", args.lane)
+        print("socket:", args.socket)
+        prev = saferoom_via_service(args.socket, args.push, args.sleep)
+        print("SAFEROOM PUSH COMPLETE")
+        print("final_head:", prev)
+        return 0
+
     prev = read_head(head_file)
 
     print("SAFEROOM v2")
@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+from collections import Counter
+
+from baseline_store import BaselineStore, Sketch, transition_drift
+
+root = tempfile.mkdtemp()
+ledger = os.path.join(root, "events.jsonl")
+T0 = 1_770_000_000 // 3600 * 3600
+
+
+def write(path, types, start=0, tag="a", mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        for i, t in enumerate(types, start):
+            f.write(json.dumps({"type": t, "ts": T0 + i * 600, "hash": f"{tag}{i:04d}"}) + "\n")
+
+
+def totals(store):
+    merged = store.merged()
+    return merged.total, dict(merged.types)
+
+
+# Incremental ingest: only new, complete lines are folded in
+types = ["cycle", "action_allowed"] * 5
+write(ledger, types)
+store = BaselineStore(os.path.join(root, "store"))
+assert store.ingest(ledger) == 10
+write(ledger, ["action_blocked"] * 3, start=10, mode="a")
+with open(ledger, "a", encoding="utf-8") as f:
+    f.write('{"type": "cycle", "ts"')
+assert store.ingest(ledger) == 3
+assert store.ingest(ledger) == 0
+assert totals(store) == (13, {"cycle": 5, "action_allowed": 5, "action_blocked": 3})
+assert len(store.bucket_starts()) == 3
+
+# Buckets merge into exactly what counting the whole run gives
+direct = Sketch()
+for t in types + ["action_blocked"] * 3:
+    direct.add(t)
+merged = store.merged()
+assert merged.transitions == direct.transitions
+assert (merged.first, merged.last) == (direct.first, direct.last)
+
+# A shorter rewrite replaces the counts instead of adding to them
+write(ledger, ["cycle"] * 8, tag="b")
+reopened = BaselineStore(os.path.join(root, "store"))
+assert reopened.ingest(ledger) == 8
+assert totals(reopened) == (8, {"cycle": 8})
+
+# A same-size rewrite is caught through the last record's hash
+write(ledger, ["action_blocked"] * 8, tag="c")
+assert reopened.ingest(ledger) == 8
+assert totals(reopened) == (8, {"action_blocked": 8})
+
+# Rewriting one ledger keeps the counts of the others in the store
+other = os.path.join(root, "other.jsonl")
+write(other, ["cycle"] * 4, tag="o")
+assert reopened.ingest(other) == 4
+write(ledger, ["action_allowed"] * 2, tag="d")
+assert reopened.ingest(ledger) == 2
+assert totals(reopened) == (6, {"cycle": 4, "action_allowed": 2})
+
+# Count-Min transition sketches merge by addition and stay close to exact
+cms_store = BaselineStore(os.path.join(root, "cms"), cms=(512, 4))
+write(ledger, types * 3, tag="e")
+assert cms_store.ingest(ledger) == 30
+cms = cms_store.merged()
+exact = Sketch()
+for t in types * 3:
+    exact.add(t)
+assert cms.cms.total == sum(exact.transitions.values())
+for pair, n in exact.transitions.items():
+    assert cms.transition_estimate(pair) >= n
+assert transition_drift(cms, exact) < 0.05
+assert Counter(cms.types) == exact.types
+
+# compare(): whole-bucket windows on either side of "now"
+result = cms_store.compare(3600, 3 * 3600)
+assert result["current"].total + result["baseline"].total <= 30
+assert result["type_drift"] is not None
+
+print("✓ Baseline store verified")
@@ -0,0 +1,37 @@
+import json
+import os
+import tempfile
+
+from fleet_report import expand, report, run, summarize_ledger
+from model_reveal import iter_events, load_events, summarize
+
+root = tempfile.mkdtemp()
+
+# 30 distinct transitions per ledger, more than the default listing of 20
+for n in range(3):
+    with open(os.path.join(root, f"run{n}.jsonl"), "w", encoding="utf-8") as f:
+        for i in range(31):
+            f.write(json.dumps({"type": f"t{i}", "actor": f"a{n}", "outcome": "ok"}) + "\n")
+
+summaries = run(expand([os.path.join(root, "*.jsonl")]), jobs=2)
+assert len(summaries) == 3
+
+assert len(report(summaries)["fleet"]["top_transitions"]) == 20
+rep = report(summaries, top=50)
+assert len(rep["fleet"]["top_transitions"]) == 30
+assert all(t["count"] == 3 for t in rep["fleet"]["top_transitions"])
+assert rep["fleet"]["events"] == 93
+assert all(row["drift_vs_fleet"] == 0 for row in rep["ledgers"])
+
+# Workers fold a record stream; the counts match the list-based summary
+path = os.path.join(root, "run0.jsonl")
+assert not isinstance(iter_events(path), list)
+assert summarize(iter_events(path)) == summarize(load_events(path))
+assert {k: v for k, v in summarize_ledger(path).items() if k != "path"} == summarize(load_events(path))
+
+# A bad line mid-ledger is skipped, as load_records does everywhere else
+with open(path, "a", encoding="utf-8") as f:
+    f.write("not json\n")
+assert summarize_ledger(path)["total"] == 31
+
+print("✓ Fleet report verified")
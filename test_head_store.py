@@ -0,0 +1,51 @@
+import multiprocessing
+import os
+import tempfile
+
+from head_store import HeadStore, read_head, write_head
+
+root = tempfile.mkdtemp()
+head = os.path.join(root, "events.head")
+
+
+def writer(tag, n, errors):
+    try:
+        for i in range(n):
+            write_head(head, f"{tag}{i:04d}")
+    except Exception as e:
+        errors.put(repr(e))
+
+
+# Writers in two child processes and this one never trip over
+# each other's temp files and always leave a complete head behind
+ctx = multiprocessing.get_context("fork")
+errors = ctx.Queue()
+procs = [ctx.Process(target=writer, args=(tag, 300, errors)) for tag in "ab"]
+for p in procs:
+    p.start()
+writer("c", 300, errors)
+for p in procs:
+    p.join()
+    assert p.exitcode == 0
+
+assert errors.empty(), errors.get()
+final = HeadStore(head).read()
+assert final in {f"{tag}{i:04d}" for tag in "abc" for i in range(300)}, final
+assert os.listdir(root) == ["events.head"], os.listdir(root)
+print("✓ Concurrent writes left one complete head")
+
+# Reads are cached until the file changes under the store
+store = HeadStore(head)
+write_head(head, "1" * 64)
+assert store.read() == "1" * 64
+assert read_head(head) == "1" * 64
+with open(head, "w", encoding="utf-8") as f:
+    f.write("2" * 40 + "\n")
+assert store.read() == "2" * 40
+
+os.remove(head)
+assert store.read("0" * 64) == "0" * 64
+write_head(head, "")
+assert store.read("0" * 64) == "0" * 64
+
+print("✓ Head store verified")
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+
+from ledger_columns import ColumnStore
+from model_reveal import load_events, summarize, summarize_columns
+
+root = tempfile.mkdtemp()
+path = os.path.join(root, "events.jsonl")
+
+types = ["cycle", "action_allowed", "cycle", "action_blocked", "cycle"]
+with open(path, "w", encoding="utf-8") as f:
+    for i, t in enumerate(types):
+        f.write(json.dumps({"eid": i, "type": t, "actor": "openai", "cycle": i, "hash": f"h{i}"}) + "\n")
+        if i == 1:
+            f.write("not json\n")
+
+store = ColumnStore(path)
+assert store.sync() == 5
+
+# A bad line is skipped, so the columnar summary matches the row-based one
+assert summarize_columns(store) == summarize(load_events(path))
+
+# Later appends are picked up incrementally, past the bad line
+with open(path, "a", encoding="utf-8") as f:
+    f.write(json.dumps({"eid": 5, "type": "action_allowed", "actor": "local", "hash": "h5"}) + "\n")
+    f.write("garbage\n")
+reopened = ColumnStore(path)
+assert reopened.sync() == 1
+assert reopened.rows == 6
+assert list(reopened.column("cycle")) == [0, 1, 2, 3, 4, -1]
+assert summarize_columns(reopened) == summarize(load_events(path))
+
+# A rewrite that leaves the last synced offset mid-line starts over
+with open(path, "w", encoding="utf-8") as f:
+    for i in range(40):
+        f.write(json.dumps({"eid": i, "type": "cycle", "hash": f"r{i}"}) + "\n")
+assert reopened.sync() == 40
+assert reopened.rows == 40
+assert summarize_columns(reopened) == summarize(load_events(path))
+
+print("✓ Ledger columns verified")
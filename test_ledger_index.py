@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+
+from ledger_index import LedgerIndex
+
+root = tempfile.mkdtemp()
+path = os.path.join(root, "events.jsonl")
+
+with open(path, "w", encoding="utf-8") as f:
+    for i in range(6):
+        rec = {"eid": i, "cycle": i // 2, "type": "action_blocked" if i % 3 == 0 else "cycle",
+               "actor": "openai", "ts": f"2026-03-01T0{i}:00:00+00:00", "hash": f"h{i}"}
+        f.write(json.dumps(rec) + "\n")
+        if i == 2:
+            f.write("not json\n")
+
+# A bad line is skipped; line numbers still point at the real file lines
+with LedgerIndex(path) as index:
+    assert index.sync() == 6
+    assert index.count(type="action_blocked") == 2
+    hits = list(index.query(type="action_blocked"))
+    assert [line for line, _ in hits] == [1, 5]
+    assert [rec["eid"] for _, rec in hits] == [0, 3]
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("garbage\n")
+        f.write(json.dumps({"eid": 6, "cycle": 3, "type": "cycle", "hash": "h6"}) + "\n")
+    assert index.sync() == 1
+    assert index.count(cycle=(3, None)) == 1
+    assert index.histogram(by="type") == {"action_blocked": 2, "cycle": 5}
+
+    # A half-written line is left for the next sync
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"eid": 7, "type": "cy')
+    assert index.sync() == 0
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('cle", "hash": "h7"}\n')
+    assert index.sync() == 1
+
+    # A rewrite that leaves the last indexed offset mid-line rebuilds the index
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(40):
+            f.write(json.dumps({"eid": i, "type": "cycle", "hash": f"r{i}"}) + "\n")
+    assert index.sync() == 40
+    assert index.size == 40
+
+print("✓ Ledger index verified")
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+
+from ledger_reader import follow, iter_records, load_records
+from migrate_pipeline import run
+from verify_events import verify
+
+root = tempfile.mkdtemp()
+missing = os.path.join(root, "missing.jsonl")
+
+# A missing ledger is an error for every integrity tool, never an empty pass
+for name, call in (
+    ("iter_records", lambda: list(iter_records(missing))),
+    ("verify", lambda: verify(missing, os.path.join(root, "missing.head"))),
+    ("verify --jobs 2", lambda: verify(missing, os.path.join(root, "missing.head"), jobs=2)),
+    ("migrate_pipeline", lambda: run(missing, os.path.join(root, "out.jsonl"), None)),
+):
+    try:
+        call()
+        raise AssertionError(f"{name} accepted a missing ledger")
+    except FileNotFoundError:
+        print(f"✓ {name} fails closed")
+assert not os.path.exists(os.path.join(root, "out.jsonl"))
+
+# Bad lines are an error unless the caller asks to skip them
+path = os.path.join(root, "events.jsonl")
+with open(path, "w", encoding="utf-8") as f:
+    f.write(json.dumps({"type": "a", "actor": "x"}) + "\n")
+    f.write("not json\n\n")
+    f.write('{"type": "torn", "act\n')
+    f.write(json.dumps({"type": "b", "nested": {"type": "inner"}}) + "\n")
+
+assert [r["type"] for r in load_records(path, fields=("type",))] == ["a", "b"]
+try:
+    list(iter_records(path))
+    raise AssertionError("bad line accepted")
+except ValueError:
+    pass
+
+# complete_only leaves a last line with no newline yet for the next read
+with open(path, "a", encoding="utf-8") as f:
+    f.write(json.dumps({"type": "c"}))
+assert [r["type"] for r in load_records(path, fields=("type",))] == ["a", "b", "c"]
+complete = list(iter_records(path, ("type",), skip_errors=True, complete_only=True))
+assert [r["type"] for _, _, _, r in complete] == ["a", "b"]
+assert complete[-1][2] == os.path.getsize(path) - len(json.dumps({"type": "c"}))
+cut = complete[-1][1] + 5
+assert [r["type"] for _, _, _, r in iter_records(path, ("type",), end_offset=cut, skip_errors=True,
+                                                   complete_only=True)] == ["a"]
+
+# A record finished between polls is followed once, whole
+with open(path, "w", encoding="utf-8") as f:
+    f.write(json.dumps({"type": "first"}) + "\n" + '{"type": "sec')
+rest = ['ond"}\n', json.dumps({"type": "third"}) + "\n"]
+
+
+def finish():
+    if not rest:
+        return True
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(rest.pop(0))
+    return False
+
+
+seen = [rec["type"] for _, _, _, rec in follow(path, ("type",), poll=0, from_start=True, idle=finish)]
+assert seen == ["first", "second", "third"], seen
+
+# follow() waits for a ledger that does not exist yet
+polls = []
+
+
+def idle():
+    polls.append(1)
+    if len(polls) == 2:
+        with open(missing, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"type": "late"}) + "\n")
+    return len(polls) > 3
+
+
+seen = [rec["type"] for _, _, _, rec in follow(missing, ("type",), poll=0, from_start=True, idle=idle)]
+assert seen == ["late"], seen
+
+print("✓ Ledger reader verified")
@@ -0,0 +1,114 @@
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from ledger_service import LedgerClient, LedgerService, LedgerServiceError, ServiceWriter
+from verify_events import verify
+
+THREADS = 8
+PROCESSES = 2
+PER_CLIENT = 25
+
+
+def wait_for(path):
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            with LedgerClient(path):
+                return
+        except OSError:
+            time.sleep(0.01)
+    raise AssertionError("ledger service did not start")
+
+
+def thread_client(worker, results):
+    hashes = []
+    with LedgerClient(sock) as client:
+        for i in range(0, PER_CLIENT, 5):
+            if i % 10:
+                hashes += client.append_many([{"worker": worker, "i": j} for j in range(i, i + 5)])
+            else:
+                hashes += [client.append({"worker": worker, "i": j}) for j in range(i, i + 5)]
+    results[worker] = hashes
+
+
+def process_client(worker, sock):
+    with ServiceWriter(sock) as writer:
+        for i in range(PER_CLIENT):
+            writer.add({"worker": worker, "i": i})
+            if writer.pending == 10:
+                writer.flush()
+
+
+if __name__ == "__main__":
+    root = tempfile.mkdtemp()
+    events = os.path.join(root, "events.jsonl")
+    head = os.path.join(root, "events.head")
+    sock = os.path.join(root, "ledger.sock")
+
+    # A stale socket file from a dead service is replaced
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(sock)
+    stale.close()
+
+    service = LedgerService(events, head, max_batch=16, max_delay=0.005)
+    server = threading.Thread(target=service.serve, args=(sock,), daemon=True)
+    server.start()
+    wait_for(sock)
+
+    # A second service on the same socket is refused
+    other = LedgerService(os.path.join(root, "other.jsonl"), os.path.join(root, "other.head"))
+    try:
+        other.serve(sock)
+        raise AssertionError("second service started on a live socket")
+    except LedgerServiceError as e:
+        print("✓ Refused:", e)
+    finally:
+        other.shutdown()
+
+    results = {}
+    threads = [threading.Thread(target=thread_client, args=(f"t{n}", results)) for n in range(THREADS)]
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=process_client, args=(f"p{n}", sock)) for n in range(PROCESSES)]
+    for t in threads + procs:
+        t.start()
+    for t in threads + procs:
+        t.join()
+    assert all(p.exitcode == 0 for p in procs)
+
+    # In-process appends share the same sequencer
+    local = service.append([{"worker": "local", "i": 0}])
+
+    with LedgerClient(sock) as client:
+        assert client.head() == local[0]
+        client._sock.sendall(b"not json\n")
+        assert json.loads(client._rfile.readline()) == {"ok": False, "error": "bad request"}
+        try:
+            client._call({"op": "append", "records": "nope"})
+            raise AssertionError("bad records accepted")
+        except LedgerServiceError:
+            pass
+
+    service.shutdown()
+    server.join(5)
+    assert not os.path.exists(sock)
+
+    with open(events, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    total = (THREADS + PROCESSES) * PER_CLIENT + 1
+    print("Records from concurrent clients:", len(records))
+    assert len(records) == total
+
+    # One unbroken chain; each writer's records keep their own order
+    assert verify(events, head, full=True) == 0
+    for worker in [f"t{n}" for n in range(THREADS)] + [f"p{n}" for n in range(PROCESSES)]:
+        mine = [r for r in records if r["worker"] == worker]
+        assert [r["i"] for r in mine] == list(range(PER_CLIENT)), worker
+        if worker in results:
+            assert [r["hash"] for r in mine] == results[worker]
+
+    print("✓ Ledger service verified")
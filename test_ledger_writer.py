@@ -0,0 +1,65 @@
+import io
+import json
+import os
+import tempfile
+import threading
+from contextlib import redirect_stdout
+
+from head_store import read_head
+from ledger_writer import LedgerWriter
+from verify_events import verify
+
+root = tempfile.mkdtemp()
+events = os.path.join(root, "events.jsonl")
+head = os.path.join(root, "events.head")
+
+
+def check():
+    """verify_events passes and the head names the last record."""
+    out = io.StringIO()
+    with redirect_stdout(out):
+        assert verify(events, head, full=True) == 0, out.getvalue()
+    with open(events, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert read_head(head) == records[-1]["hash"]
+    return records
+
+
+# Threads share one writer, adding and flushing in their own rhythm
+writer = LedgerWriter(events, head)
+
+
+def worker(tag):
+    for i in range(200):
+        writer.add({"type": "cycle", "thread": tag, "n": i})
+        if i % (tag + 3) == 0:
+            writer.flush()
+
+
+threads = [threading.Thread(target=worker, args=(t,)) for t in range(8)]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+writer.close()
+
+records = check()
+assert len(records) == 8 * 200
+assert {(r["thread"], r["n"]) for r in records} == {(t, i) for t in range(8) for i in range(200)}
+print("✓ Concurrent appends:", len(records), "records chained")
+
+# A new writer picks the chain up from the head file
+with LedgerWriter(events, head) as writer:
+    writer.add({"type": "cycle", "n": "again"})
+assert len(check()) == 8 * 200 + 1
+
+# Records discarded on error never reach the ledger or the head
+try:
+    with LedgerWriter(events, head) as writer:
+        writer.add({"type": "cycle", "n": "lost"})
+        raise RuntimeError("cycle failed")
+except RuntimeError:
+    pass
+assert check()[-1]["n"] == "again"
+
+print("✓ Ledger writer verified")
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from merkle_ledger import MerkleLedger, verify_consistency, verify_inclusion
+
+root = tempfile.mkdtemp()
+path = os.path.join(root, "events.jsonl")
+
+
+def reference_root(hashes):
+    """RFC 9162 MTH computed straight from the definition."""
+    if not hashes:
+        return hashlib.sha256(b"").digest()
+    if len(hashes) == 1:
+        return hashlib.sha256(b"\x00" + hashes[0].encode("utf-8")).digest()
+    k = 1
+    while k * 2 < len(hashes):
+        k *= 2
+    return hashlib.sha256(b"\x01" + reference_root(hashes[:k]) + reference_root(hashes[k:])).digest()
+
+
+hashes = [hashlib.sha256(f"record-{i}".encode()).hexdigest() for i in range(37)]
+
+
+def append(batch):
+    with open(path, "a", encoding="utf-8") as f:
+        for h in batch:
+            f.write(json.dumps({"type": "cycle", "hash": h}) + "\n")
+
+
+# Grow the ledger in uneven batches, reopening the index each time
+done = 0
+for step in (1, 2, 5, 8, 13, 8):
+    append(hashes[done:done + step])
+    done += step
+    tree = MerkleLedger(path)
+    assert tree.sync() == step
+    assert tree.size == done
+assert done == len(hashes)
+
+for size in range(len(hashes) + 1):
+    assert tree.root(size) == reference_root(hashes[:size]), size
+
+# Inclusion: every leaf in every tree size, against the reference root
+for size in range(1, len(hashes) + 1):
+    ref = reference_root(hashes[:size])
+    for index in range(size):
+        proof = tree.inclusion_proof(index, size)
+        assert verify_inclusion(hashes[index], index, size, proof, ref), (index, size)
+
+proof = tree.inclusion_proof(5)
+ref = reference_root(hashes)
+assert not verify_inclusion(hashes[6], 5, len(hashes), proof, ref)
+assert not verify_inclusion(hashes[5], 6, len(hashes), proof, ref)
+assert not verify_inclusion(hashes[5], 5, len(hashes), proof[:-1], ref)
+assert not verify_inclusion(hashes[5], 5, len(hashes), [bytes(32)] + proof[1:], ref)
+
+# Consistency: every old size against every later size
+for old in range(1, len(hashes) + 1):
+    for new in range(old, len(hashes) + 1):
+        proof = tree.consistency_proof(old, new)
+        assert verify_consistency(old, new, reference_root(hashes[:old]), reference_root(hashes[:new]), proof)
+
+# A rewritten history cannot be proven consistent
+forked = hashes[:10] + [hashlib.sha256(b"forged").hexdigest()] + hashes[11:]
+proof = tree.consistency_proof(12, 30)
+assert not verify_consistency(12, 30, reference_root(forked[:12]), reference_root(hashes[:30]), proof)
+assert not verify_consistency(12, 30, reference_root(hashes[:12]), reference_root(forked[:30]), proof)
+
+# Records are found by hash and read back by offset
+assert tree.find(hashes[20]) == 20
+assert tree.find("0" * 64) is None
+assert tree.record(20)["hash"] == hashes[20]
+
+# Nodes written by a sync that died before saving meta are dropped
+with open(os.path.join(tree.directory, "level-00.bin"), "ab") as f:
+    f.write(bytes(32) * 3)
+append(hashes[:1])
+tree = MerkleLedger(path)
+assert tree.sync() == 1
+assert tree.root() == reference_root(hashes + hashes[:1])
+
+# A rewritten ledger rebuilds the tree instead of resuming mid-line
+rewritten = [hashlib.sha256(f"rechained-{i}".encode()).hexdigest() for i in range(20)]
+with open(path, "w", encoding="utf-8") as f:
+    for h in rewritten:
+        f.write(json.dumps({"type": "rechained", "hash": h}) + "\n")
+tree = MerkleLedger(path)
+assert tree.sync() == 20
+assert tree.root() == reference_root(rewritten)
+
+# Same line lengths, so the old offset lands on a line boundary
+swapped = [h[::-1] for h in rewritten] + rewritten[:5]
+with open(path, "w", encoding="utf-8") as f:
+    for h in swapped:
+        f.write(json.dumps({"type": "rechained", "hash": h}) + "\n")
+tree = MerkleLedger(path)
+assert tree.sync() == 25
+assert tree.root() == reference_root(swapped)
+
+# Lines without a hash, or not JSON at all, are not leaves
+with open(path, "a", encoding="utf-8") as f:
+    f.write(json.dumps({"type": "unchained"}) + "\n")
+    f.write("not json\n")
+    f.write(json.dumps({"type": "rechained", "hash": hashes[0]}) + "\n")
+assert tree.sync() == 1
+assert tree.root() == reference_root(swapped + hashes[:1])
+assert tree.record(25)["hash"] == hashes[0]
+
+print("✓ Merkle ledger verified")
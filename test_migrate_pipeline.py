@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+
+from migrate_pipeline import SCHEMES, PipelineError, run
+from verify_events import verify
+
+root = tempfile.mkdtemp()
+KEY = b"test-key"
+
+
+def path(name):
+    return os.path.join(root, name)
+
+
+def check(out, head, scheme):
+    """Output verifies under its own scheme; legacy through verify_events."""
+    if scheme == "legacy":
+        assert verify(out, head, full=True) == 0, out
+    run(out, path("check.jsonl"), None, source=scheme, target=scheme,
+        hmac_key=KEY if SCHEMES[scheme].hmac else b"")
+
+
+# Unhashed input, including non-ASCII text and a stray prev_hash
+with open(path("raw.jsonl"), "w", encoding="utf-8") as f:
+    for i in range(25):
+        rec = {"eid": i, "type": "cycle", "actor": "ε-agent", "ts": f"2026-01-01T00:00:{i:02d}+00:00"}
+        if i == 3:
+            rec["prev_hash"] = "stale"
+        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+# One ledger per scheme; v2 is signed, so it carries hmac into every hop
+ledgers = {}
+for scheme in SCHEMES:
+    out = path(f"{scheme}.jsonl")
+    stats = run(path("raw.jsonl"), out, path(f"{scheme}.head"), source=None, target=scheme,
+                hmac_key=KEY if SCHEMES[scheme].hmac else b"")
+    assert stats["count"] == 25
+    check(out, path(f"{scheme}.head"), scheme)
+    ledgers[scheme] = out
+
+with open(ledgers["v2"], encoding="utf-8") as f:
+    assert all("hmac" in json.loads(line) for line in f)
+
+# Every source -> target pair round-trips into a ledger that verifies
+for source in SCHEMES:
+    for target in SCHEMES:
+        out, head = path(f"{source}-{target}.jsonl"), path(f"{source}-{target}.head")
+        stats = run(ledgers[source], out, head, source=source, target=target,
+                    hmac_key=KEY if SCHEMES[target].hmac else b"")
+        assert stats["count"] == 25
+        check(out, head, target)
+        with open(out, encoding="utf-8") as f:
+            has_hmac = ["hmac" in json.loads(line) for line in f]
+        assert all(has_hmac) if SCHEMES[target].hmac else not any(has_hmac)
+        print(f"✓ {source} -> {target}")
+
+# A key cannot sign a scheme that hashes hmac into its payload
+for target in ("legacy", "regen"):
+    try:
+        run(ledgers["v2"], path("signed.jsonl"), None, source="v2", target=target, hmac_key=KEY)
+        raise AssertionError(f"key accepted for {target}")
+    except PipelineError as e:
+        print("✓ Refused:", e)
+assert not os.path.exists(path("signed.jsonl"))
+
+# A tampered source stops the pipeline before anything is written
+with open(ledgers["legacy"], encoding="utf-8") as f:
+    lines = f.readlines()
+rec = json.loads(lines[10])
+rec["actor"] = "mallory"
+lines[10] = json.dumps(rec, ensure_ascii=False) + "\n"
+with open(path("tampered.jsonl"), "w", encoding="utf-8") as f:
+    f.writelines(lines)
+try:
+    run(path("tampered.jsonl"), path("tampered-out.jsonl"), None)
+    raise AssertionError("tampered ledger migrated")
+except PipelineError as e:
+    print("✓ Tamper detected:", e)
+assert not os.path.exists(path("tampered-out.jsonl"))
+assert not os.path.exists(path("tampered-out.jsonl") + ".tmp")
+
+print("✓ Migrate pipeline verified")
@@ -0,0 +1,76 @@
+import os
+import tempfile
+
+from atomic_state import CanonicalState, VersionConflict
+
+path = os.path.join(tempfile.mkdtemp(), "wal.log")
+
+# Two runtimes sharing same WAL
+runtime_a = CanonicalState(path)
+runtime_b = CanonicalState(path, history_limit=4)
+
+runtime_a.transition({"role": "engineer"}, expected_version=0)
+
+# Readers pin a version and keep a stable view while writers commit
+with runtime_a.pin(1) as view:
+    runtime_a.transition({"role": "lead"}, expected_version=1)
+    assert view == {"role": "engineer"}
+    assert runtime_a.snapshot(version=2) == {"role": "lead"}
+
+# B is behind; a disjoint key rebases onto the latest version
+assert runtime_b.transition_with_retry({"location": "kona"}, expected_version=0)
+print("B after rebase:", runtime_b.data, runtime_b.version)
+assert runtime_b.version == 3
+assert runtime_b.data == {"role": "lead", "location": "kona"}
+assert runtime_b.snapshot(version=1) == {"role": "engineer"}
+
+# An overlapping key is a real conflict and is not rebased
+runtime_a.refresh()
+assert runtime_a.version == 3
+runtime_a.transition({"location": "hilo"}, expected_version=3)
+try:
+    runtime_b.transition_with_retry({"location": "kailua"}, expected_version=3)
+    raise AssertionError("overlapping rebase was allowed")
+except VersionConflict as e:
+    print("✓ Overlapping write rejected:", e)
+assert runtime_b.data["location"] == "hilo"
+
+# A version from the future is a conflict, not something to rebase onto
+try:
+    runtime_b.transition_with_retry({"fresh": True}, expected_version=999)
+    raise AssertionError("rebased from a version ahead of the WAL")
+except VersionConflict as e:
+    print("✓ Future version rejected:", e)
+assert runtime_b.version == 4 and "fresh" not in runtime_b.data
+
+# History is bounded, except for pinned versions
+with runtime_b.pin(4):
+    for i in range(10):
+        runtime_b.transition({f"k{i}": i}, expected_version=4 + i)
+    assert runtime_b.snapshot(version=4)["location"] == "hilo"
+    assert runtime_b.changed_since(4) is None
+
+runtime_b.transition({"done": True}, expected_version=14)
+try:
+    runtime_b.snapshot(version=4)
+    raise AssertionError("unpinned old version was retained")
+except KeyError:
+    pass
+
+# Mutating what a snapshot returns never reaches later reads
+runtime_c = CanonicalState(os.path.join(os.path.dirname(path), "nested.log"))
+runtime_c.transition({"tags": ["a"], "meta": {"n": 1}}, expected_version=0)
+runtime_c.snapshot()["tags"].append("b")
+with runtime_c.pin(1) as view:
+    view["meta"]["n"] = 2
+runtime_c.transition({"other": 1}, expected_version=1)
+for v in (1, 2):
+    assert runtime_c.snapshot(version=v)["tags"] == ["a"]
+    assert runtime_c.snapshot(version=v)["meta"] == {"n": 1}
+assert runtime_c.data["tags"] == ["a"]
+
+runtime_a.wal.close()
+runtime_b.wal.close()
+runtime_c.wal.close()
+
+print("✓ MVCC reads verified")
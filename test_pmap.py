@@ -0,0 +1,64 @@
+import os
+import random
+import tempfile
+
+from atomic_state import CanonicalState
+from pmap import PersistentMap
+
+
+class Colliding:
+    """Key type with heavy hash collisions."""
+
+    def __init__(self, v):
+        self.v = v
+
+    def __hash__(self):
+        return self.v % 7
+
+    def __eq__(self, other):
+        return isinstance(other, Colliding) and other.v == self.v
+
+
+random.seed(7)
+
+for make_key in (int, str, Colliding):
+    m = PersistentMap()
+    d = {}
+    versions = []
+
+    for step in range(5000):
+        k = make_key(random.randrange(500))
+        if random.random() < 0.3:
+            m = m.delete(k)
+            d.pop(k, None)
+        else:
+            m = m.set(k, step)
+            d[k] = step
+        if step % 500 == 0:
+            versions.append((m, dict(d)))
+
+    assert m == d and len(m) == len(d)
+
+    # Every older map is still exactly what it was
+    for old_map, old_dict in versions:
+        assert old_map == old_dict and len(old_map) == len(old_dict)
+
+# CanonicalState snapshots stay stable across later commits
+state = CanonicalState(os.path.join(tempfile.mkdtemp(), "wal.log"))
+state.transition({"role": "engineer", "tags": ["a"]}, expected_version=0)
+
+before = state.snapshot()
+state.transition({"location": "kona"}, expected_version=1)
+
+print("Snapshot:", before)
+print("Current:", state.data)
+
+assert before == {"role": "engineer", "tags": ["a"]}
+assert state.data == {"role": "engineer", "tags": ["a"], "location": "kona"}
+# Versions share the stored value; readers get their own copy of it
+assert state.data["tags"] is state._history[1][0]["tags"]
+assert before["tags"] is not state.data["tags"]
+
+state.wal.close()
+
+print("✓ Persistent map verified")
@@ -0,0 +1,146 @@
+import json
+import multiprocessing
+import os
+import tempfile
+
+import promote_saferoom as p
+from head_store import write_head
+from ledger_writer import LedgerWriter
+from verify_events import legacy_hash, verify
+
+LANE = 20
+
+
+def setup(root, main_records=5, note="x" * 9000):
+    files = {
+        "main_file": os.path.join(root, "events.jsonl"),
+        "main_head_file": os.path.join(root, "events.head"),
+        "safe_file": os.path.join(root, "events.saferoom.jsonl"),
+        "safe_head_file": os.path.join(root, "events.saferoom.head"),
+    }
+    with LedgerWriter(files["main_file"], files["main_head_file"]) as w:
+        for i in range(main_records):
+            w.add({"type": "cycle", "cycle": i})
+        w.flush()
+
+    prev = None
+    with open(files["safe_file"], "w", encoding="utf-8") as f:
+        for i in range(LANE):
+            # Records larger than io's write buffer reach the file as each chunk is written
+            rec = {"type": "saferoom_action", "i": i, "note": note, "prev": prev}
+            rec["hash"] = prev = legacy_hash(rec)
+            f.write(json.dumps(rec) + "\n")
+    write_head(files["safe_head_file"], prev)
+    return files
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def crash_during_append(files):
+    # Die without cleanup partway through the lane, after a chunk was written
+    calls = []
+
+    def now_iso():
+        calls.append(1)
+        if len(calls) == 12:
+            os._exit(1)
+        return "2026-01-01T00:00:00+00:00"
+
+    p.now_iso = now_iso
+    p.promote_bulk(chunk_bytes=256, **files)
+
+
+def crash_after_commit(files):
+    # Die after the main head moved but before the lane was retired
+    def finish_lane(*args):
+        os._exit(1)
+
+    p.finish_lane = finish_lane
+    p.promote_bulk(**files)
+
+
+def run_crashing(target, files):
+    proc = multiprocessing.get_context("fork").Process(target=target, args=(files,))
+    proc.start()
+    proc.join()
+    assert proc.exitcode == 1
+
+
+def promoted(files):
+    with open(files["main_file"], encoding="utf-8") as f:
+        return [json.loads(line)["i"] for line in f if "promoted_saferoom" in line]
+
+
+if __name__ == "__main__":
+    # Crash mid-splice: the journal rolls main back to its original bytes
+    files = setup(tempfile.mkdtemp())
+    original = read(files["main_file"])
+    original_head = read(files["main_head_file"])
+
+    run_crashing(crash_during_append, files)
+    assert len(read(files["main_file"])) > len(original)
+    assert read(files["main_head_file"]) == original_head
+    assert os.path.exists(p.journal_path(files["main_file"]))
+
+    assert p.recover_bulk(**files) is False
+    assert read(files["main_file"]) == original
+    assert not os.path.exists(p.journal_path(files["main_file"]))
+    assert os.path.exists(files["safe_file"])
+    print("✓ Interrupted splice rolled back")
+
+    # The rerun then promotes the whole lane
+    assert p.promote_bulk(chunk_bytes=256, **files) == 0
+    assert promoted(files) == list(range(LANE))
+    assert not os.path.exists(files["safe_file"])
+    assert not os.path.exists(files["safe_head_file"])
+    assert verify(files["main_file"], files["main_head_file"], full=True) == 0
+
+    # Crash after the commit point: the rerun finishes instead of undoing
+    files = setup(tempfile.mkdtemp())
+    run_crashing(crash_after_commit, files)
+    assert os.path.exists(files["safe_file"])
+    assert verify(files["main_file"], files["main_head_file"], full=True) == 0
+
+    assert p.promote_bulk(**files) == 0
+    assert promoted(files) == list(range(LANE))
+    assert not os.path.exists(files["safe_file"])
+    assert not os.path.exists(p.journal_path(files["main_file"]))
+    assert any(".promoted-" in name for name in os.listdir(os.path.dirname(files["safe_file"])))
+    assert verify(files["main_file"], files["main_head_file"], full=True) == 0
+    print("✓ Committed promotion completed on rerun")
+
+    # A tampered lane is refused and main is left untouched
+    files = setup(tempfile.mkdtemp())
+    original = read(files["main_file"])
+    with open(files["safe_file"], encoding="utf-8") as f:
+        lines = f.readlines()
+    lines[7] = lines[7].replace('"i": 7', '"i": 70')
+    with open(files["safe_file"], "w", encoding="utf-8") as f:
+        f.writelines(lines)
+
+    assert p.promote_bulk(chunk_bytes=256, **files) == 1
+    assert read(files["main_file"]) == original
+    assert not os.path.exists(p.journal_path(files["main_file"]))
+    assert verify(files["main_file"], files["main_head_file"], full=True) == 0
+
+    # Empty main and non-ASCII payloads, in both promotion modes
+    for bulk in (True, False):
+        files = setup(tempfile.mkdtemp(), main_records=0, note="Überprüfung — 検証 ✓")
+        if bulk:
+            assert p.promote_bulk(**files) == 0
+        else:
+            p.MAIN_FILE, p.MAIN_HEAD_FILE = files["main_file"], files["main_head_file"]
+            p.SAFE_FILE = files["safe_file"]
+            assert p.promote() == 0
+        with open(files["main_file"], encoding="utf-8") as f:
+            first = json.loads(f.readline())
+        assert first["prev"] == "0" * 64
+        assert first["note"] == "Überprüfung — 検証 ✓"
+        assert promoted(files) == list(range(LANE))
+        assert verify(files["main_file"], files["main_head_file"], full=True) == 0
+    print("✓ Promotion into an empty main with non-ASCII records")
+
+    print("✓ Bulk promotion verified")
@@ -0,0 +1,89 @@
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+from contextlib import redirect_stdout
+
+import rechain_events
+from verify_events import verify
+
+root = tempfile.mkdtemp()
+src = os.path.join(root, "broken.jsonl")
+
+
+def path(name):
+    return os.path.join(root, name)
+
+
+def write_input(n, tag="x"):
+    # Records bigger than the io buffer, so a crash leaves partial output
+    with open(src, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({"type": "cycle", "n": i, "note": tag * 9000, "prev_hash": "bad"}) + "\n")
+
+
+def crash_at(record, out):
+    """Run rechain in a child that dies while hashing record `record`."""
+    seen = [0]
+    legacy_hash = rechain_events.legacy_hash
+
+    def dying_hash(rec):
+        if "prev" in rec:
+            seen[0] += 1
+            if seen[0] == record:
+                os._exit(1)
+        return legacy_hash(rec)
+
+    def child():
+        rechain_events.legacy_hash = dying_hash
+        rechain_events.rechain(src, out, out + ".head", every=5)
+
+    p = multiprocessing.get_context("fork").Process(target=child)
+    p.start()
+    p.join()
+    assert p.exitcode == 1
+
+
+def verify_ok(out):
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        rc = verify(out, out + ".head", full=True)
+    return rc == 0 and "VERIFY OK" in buf.getvalue()
+
+
+def read(name):
+    with open(name, "rb") as f:
+        return f.read()
+
+
+write_input(23)
+clean = rechain_events.rechain(src, path("clean.jsonl"), path("clean.jsonl.head"), every=5)
+assert verify_ok(path("clean.jsonl"))
+
+# Crash between checkpoints, then resume from the last one
+crash_at(17, path("out.jsonl"))
+prog = rechain_events.load_progress(path("out.jsonl"), src)
+assert prog["count"] == 15
+assert os.path.getsize(path("out.jsonl") + ".tmp") > prog["out_bytes"]
+
+result = rechain_events.rechain(src, path("out.jsonl"), path("out.jsonl.head"), every=5)
+assert result["resumed"] and result == dict(clean, resumed=True)
+assert read(path("out.jsonl")) == read(path("clean.jsonl"))
+assert verify_ok(path("out.jsonl"))
+assert not os.path.exists(rechain_events.progress_path(path("out.jsonl")))
+print("✓ Resumed output is byte-identical")
+
+# Input edited in place (same size) after the crash: progress is discarded
+crash_at(12, path("edited.jsonl"))
+assert rechain_events.load_progress(path("edited.jsonl"), src)["count"] == 10
+write_input(23, tag="y")
+assert rechain_events.load_progress(path("edited.jsonl"), src) is None
+
+result = rechain_events.rechain(src, path("edited.jsonl"), path("edited.jsonl.head"), every=5)
+assert not result["resumed"]
+fresh = rechain_events.rechain(src, path("fresh.jsonl"), path("fresh.jsonl.head"), every=5)
+assert read(path("edited.jsonl")) == read(path("fresh.jsonl"))
+assert verify_ok(path("edited.jsonl"))
+
+print("✓ Rechain resume verified")
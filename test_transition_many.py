@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+from atomic_state import CanonicalState
+from recovery import RecoveryEngine
+
+path = os.path.join(tempfile.mkdtemp(), "wal.log")
+
+state = CanonicalState(path)
+state.transition({"role": "engineer"}, expected_version=0)
+
+events = [{f"k{i}": i} for i in range(100)] + [{"role": "lead"}]
+assert state.transition_many(events, expected_version=1)
+
+print("After batch:", len(state.data), state.version)
+assert state.version == 2
+assert state.data["role"] == "lead"
+assert state.data["k99"] == 99
+
+# One pending record and one commit marker for the whole batch
+entries = state.wal.read_all()
+assert [e["status"] for e in entries] == ["pending", "committed"] * 2
+assert len(entries[2]["transition"]["events"]) == 101
+
+# All or nothing: a bad event fails the whole batch
+before = state.snapshot()
+assert not state.transition_many([{"ok": 1}, None], expected_version=2)
+assert state.data == before
+assert state.version == 2
+assert state.wal.read_all()[-1]["status"] == "failed"
+
+state.wal.close()
+
+recovered = RecoveryEngine(path).recover()
+print("Recovered:", len(recovered.data), recovered.version)
+assert recovered.data == state.data
+assert recovered.version == 2
+recovered.wal.close()
+
+print("✓ Batch transitions verified")
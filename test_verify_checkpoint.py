@@ -0,0 +1,95 @@
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+
+from verify_events import checkpoint_path, legacy_hash, load_checkpoint, verify
+
+root = tempfile.mkdtemp()
+events = os.path.join(root, "events.jsonl")
+head = os.path.join(root, "events.head")
+
+
+def chain(payloads, prev="0" * 64):
+    recs = []
+    for p in payloads:
+        rec = dict(p, prev=prev)
+        rec["hash"] = prev = legacy_hash(rec)
+        recs.append(rec)
+    return recs
+
+
+def write(recs, mode="w", newline=True):
+    with open(events, mode, encoding="utf-8") as f:
+        for i, rec in enumerate(recs):
+            last = i == len(recs) - 1
+            f.write(json.dumps(rec) + ("\n" if newline or not last else ""))
+    with open(head, "w", encoding="utf-8") as f:
+        f.write(recs[-1]["hash"] + "\n")
+
+
+def run(**options):
+    out = io.StringIO()
+    with redirect_stdout(out):
+        rc = verify(events, head, **options)
+    return rc, out.getvalue()
+
+
+records = chain({"type": "cycle", "n": i} for i in range(10))
+write(records)
+assert run() == (0, "VERIFY OK\n")
+cp = load_checkpoint(events)
+assert cp["hash"] == records[-1]["hash"] and cp["line"] == 10
+
+# Records appended after the checkpoint are still verified on resume
+more = chain(({"type": "cycle", "n": i} for i in range(10, 15)), records[-1]["hash"])
+more[2]["n"] = "tampered"
+write(more, mode="a")
+rc, out = run()
+assert rc == 1 and "HASH MISMATCH at line 13" in out, out
+assert load_checkpoint(events)["line"] == 10
+
+# A same-size edit inside the checkpointed prefix is skipped on resume;
+# full=True (governor --full) re-verifies from genesis and catches it
+more = chain(({"type": "cycle", "n": i} for i in range(10, 15)), records[-1]["hash"])
+tampered = [dict(r) for r in records]
+tampered[3]["n"] = 7
+write(tampered + more)
+assert run()[0] == 0
+rc, out = run(full=True)
+assert rc == 1 and "HASH MISMATCH at line 4" in out, out
+print("✓ Tampering after the checkpoint detected")
+
+# A rewritten prefix (same sizes, new hashes) invalidates the checkpoint
+write(records + more)
+assert run()[0] == 0
+rewritten = chain({"type": "cycle", "n": i + 100} for i in range(15))
+rewritten[6]["n"] = 999
+write(rewritten)
+assert load_checkpoint(events) is None
+rc, out = run()
+assert rc == 1 and "HASH MISMATCH at line 7" in out, out
+
+# So does one that moves record boundaries so the old offset is mid-line
+shorter = chain({"type": "c", "n": i} for i in range(20))
+write(shorter)
+assert load_checkpoint(events) is None
+assert run()[0] == 0
+print("✓ Rewritten prefix invalidates the checkpoint")
+
+# An unterminated last line may still be mid-append: never resume after it
+tail = chain([{"type": "cycle", "n": 20}], shorter[-1]["hash"])
+write(tail, mode="a", newline=False)
+assert run()[0] == 0
+cp = load_checkpoint(events)
+assert cp["line"] == 20 and cp["hash"] == shorter[-1]["hash"]
+
+with open(events, "a", encoding="utf-8") as f:
+    f.write("\n")
+assert run()[0] == 0
+assert load_checkpoint(events)["hash"] == tail[0]["hash"]
+
+os.remove(checkpoint_path(events))
+assert run(full=True)[0] == 0
+print("✓ Verify checkpoint verified")
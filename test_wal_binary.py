@@ -0,0 +1,129 @@
+import os
+import tempfile
+
+from recovery import RecoveryEngine
+from wal import WAL, SegmentedWAL, WALCorruption, convert_wal
+
+root = tempfile.mkdtemp()
+path = os.path.join(root, "wal.bin")
+
+with WAL(path, record_format="binary") as wal:
+    for i in range(10):
+        seq = wal.append({"event": {"i": i}, "version_before": i})
+        wal.mark_committed(seq)
+    wal.mark_failed(wal.append({"event": {"bad": True}}), "boom")
+
+    entries = wal.read_all()
+    assert [e["status"] for e in entries[-2:]] == ["pending", "failed"]
+    assert entries[-1]["reason"] == "boom"
+    assert entries[0]["transition"] == {"event": {"i": 0}, "version_before": 0}
+
+    good_size = os.path.getsize(path)
+
+# Format is detected on reopen without being asked for
+reopened = WAL(path)
+assert reopened.codec.name == "binary"
+assert reopened.sequence == 11
+assert reopened.committed_count() == 10
+
+# Torn tail: half a record at EOF is ignored, then cut exactly
+with open(path, "ab") as f:
+    f.write(reopened.codec.encode({"seq": 12, "ts": 0, "status": "committed"})[:9])
+assert reopened.committed_count() == 10
+removed = reopened.repair()
+print("Torn bytes removed:", removed)
+assert removed == 9
+assert os.path.getsize(path) == good_size
+reopened.close()
+
+state = RecoveryEngine(path).recover()
+assert state.version == 10
+assert state.data == {"i": 9}
+state.wal.close()
+
+# Damage followed by more records is corruption, not a torn tail
+with open(path, "r+b") as f:
+    f.seek(40)
+    f.write(b"\xff")
+try:
+    WAL(path).repair()
+    raise AssertionError("corruption was not detected")
+except WALCorruption as e:
+    print("✓ Corruption detected:", e)
+
+# A damaged length prefix mid-file must not pass for a torn tail
+length_path = os.path.join(root, "length.bin")
+offsets = []
+with WAL(length_path, record_format="binary") as wal:
+    for i in range(10):
+        offsets.append(os.path.getsize(length_path))
+        seq = wal.append({"event": {"i": i}, "version_before": i})
+        wal.mark_committed(seq)
+length_size = os.path.getsize(length_path)
+
+with open(length_path, "r+b") as f:
+    f.seek(offsets[2] + 1)
+    f.write(b"\x7f")
+try:
+    RecoveryEngine(length_path).recover()
+    raise AssertionError("damaged length prefix was treated as a torn tail")
+except WALCorruption as e:
+    print("✓ Length corruption detected:", e)
+assert os.path.getsize(length_path) == length_size
+
+# Existing line-JSON logs convert to the binary format
+json_path = os.path.join(root, "wal.log")
+with WAL(json_path) as wal:
+    for i in range(3):
+        wal.mark_committed(wal.append({"event": {"j": i}}))
+
+assert convert_wal(json_path, os.path.join(root, "converted.bin")) == 6
+with WAL(os.path.join(root, "converted.bin")) as wal:
+    assert wal.read_all() == WAL(json_path).read_all()
+
+# Conversion streams in bounded batches
+assert convert_wal(json_path, os.path.join(root, "batched.bin"), batch_bytes=64) == 6
+with WAL(os.path.join(root, "batched.bin")) as wal:
+    assert wal.read_all() == WAL(json_path).read_all()
+
+# A mistyped source is an error and creates neither file
+typo = os.path.join(root, "wal.lgo")
+try:
+    convert_wal(typo, os.path.join(root, "typo.bin"))
+    raise AssertionError("converted a missing WAL")
+except FileNotFoundError:
+    pass
+assert not os.path.exists(typo) and not os.path.exists(os.path.join(root, "typo.bin"))
+
+# A failed conversion leaves no partial output, so it can be retried
+damaged_path = os.path.join(root, "damaged.log")
+with open(json_path, "rb") as src, open(damaged_path, "wb") as dst:
+    lines = src.readlines()
+    dst.writelines(lines[:3] + [b"not a record\n"] + lines[3:])
+try:
+    convert_wal(damaged_path, os.path.join(root, "damaged.bin"), batch_bytes=1)
+    raise AssertionError("converted a damaged WAL")
+except WALCorruption:
+    pass
+assert not [n for n in os.listdir(root) if n.startswith("damaged.bin")]
+
+with open(damaged_path, "wb") as dst:
+    dst.writelines(lines)
+assert convert_wal(damaged_path, os.path.join(root, "damaged.bin")) == 6
+try:
+    convert_wal(json_path, os.path.join(root, "damaged.bin"))
+    raise AssertionError("replaced an existing WAL")
+except FileExistsError:
+    pass
+
+# Segments inherit the format from the manifest
+directory = os.path.join(root, "wal.d")
+with SegmentedWAL(directory, segment_bytes=256, record_format="binary") as wal:
+    for i in range(20):
+        wal.mark_committed(wal.append({"event": {"i": i}}))
+with SegmentedWAL(directory) as wal:
+    assert wal.codec.name == "binary"
+    assert wal.committed_count() == 20
+    assert len(wal.read_all()) == 40
+
+print("✓ Binary WAL format verified")
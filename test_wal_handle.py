@@ -0,0 +1,37 @@
+import os
+import tempfile
+
+from wal import WAL
+
+path = os.path.join(tempfile.mkdtemp(), "wal.log")
+
+with WAL(path) as wal:
+    fd = wal._fd
+    for i in range(10):
+        wal.mark_committed(wal.append({"event": {"i": i}}))
+
+    # Same descriptor for every record
+    assert wal._fd == fd
+    assert len(wal.read_all()) == 20
+
+    # Rotate the file away; the next write lands in a fresh file
+    os.rename(path, path + ".1")
+    seq = wal.append({"event": {"i": 10}})
+    print("Appended after rotation:", seq)
+
+    assert seq == 11
+    assert [e["seq"] for e in wal.read_all()] == [11]
+
+assert wal._fd is None
+
+try:
+    wal.append({"event": {"i": 11}})
+    raise AssertionError("append after close succeeded")
+except RuntimeError as e:
+    print("✓ Closed WAL rejects writes:", e)
+
+with WAL(path, dsync=True) as wal:
+    wal.mark_committed(11)
+    assert wal.read_all()[-1]["status"] == "committed"
+
+print("✓ Persistent WAL handle verified")
@@ -0,0 +1,69 @@
+import os
+import tempfile
+
+from atomic_state import CanonicalState
+from checkpoint import CheckpointStore
+from recovery import RecoveryEngine
+from wal import SegmentedWAL, WALCorruption
+
+directory = os.path.join(tempfile.mkdtemp(), "wal.d")
+
+# Small segments so a handful of transitions rotate several times
+state = CanonicalState(wal=SegmentedWAL(directory, segment_bytes=512))
+
+for i in range(20):
+    state.transition({f"k{i}": i}, expected_version=i)
+
+manifest = state.wal.manifest
+sealed = [s for s in manifest["segments"] if s["sealed"]]
+print("Segments:", [s["name"] for s in manifest["segments"]])
+
+assert len(sealed) >= 3
+assert state.wal.committed_count() == 20
+assert sum(s["committed"] for s in sealed) + state.wal.committed == 20
+assert all(s["first_seq"] <= s["last_seq"] for s in sealed)
+assert os.stat(os.path.join(directory, sealed[0]["name"])).st_mode & 0o222 == 0
+
+# Reopening only reads the manifest and the active segment
+reopened = SegmentedWAL(directory)
+assert reopened.sequence == 20
+assert reopened.committed_count() == 20
+
+recovered = RecoveryEngine(directory).recover()
+print("Recovered version:", recovered.version)
+assert recovered.version == 20
+assert recovered.data == state.data
+
+# Segments are only dropped once a checkpoint covers them
+store = CheckpointStore(directory + ".checkpoints")
+try:
+    state.wal.drop_segments(sealed[1]["last_seq"], store)
+    raise AssertionError("dropped segments without a checkpoint")
+except ValueError:
+    pass
+store.write(state.data, state.version, state.applied_seq)
+
+# Dropping covered segments keeps the committed count intact
+dropped = state.wal.drop_segments(sealed[1]["last_seq"], store, archive_dir=directory + ".archive")
+print("Archived:", dropped)
+assert dropped == [sealed[0]["name"], sealed[1]["name"]]
+assert SegmentedWAL(directory).committed_count() == 20
+
+state.transition({"after": "drop"}, expected_version=20)
+assert state.version == 21
+
+# Recovery without the checkpoint would silently miss the dropped records
+try:
+    RecoveryEngine(directory).recover()
+    raise AssertionError("recovered without the dropped records")
+except WALCorruption:
+    pass
+recovered = RecoveryEngine(directory, checkpoint_dir=directory + ".checkpoints").recover()
+assert recovered.version == 21
+assert recovered.data == state.data
+recovered.wal.close()
+
+state.wal.close()
+reopened.close()
+
+print("✓ Segmented WAL verified")
@@ -4,7 +4,12 @@ from __future__ import annotations
 import argparse
 import hashlib
 import json
-from typing import Any, Dict, Iterable, Tuple
+import multiprocessing
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from atomic_file import atomic_write_json
+from ledger_reader import iter_records, record_at
 
 # Stable exports used by other modules
 def sha256_hex(b: bytes) -> str:
@@ -25,14 +30,121 @@ def legacy_hash(rec: Dict[str, Any]) -> str:
     return sha256_hex(canonical_payload(rec))
 
 def iter_jsonl(path: str) -> Iterable[Tuple[int, Dict[str, Any]]]:
-    with open(path, "r", encoding="utf-8") as f:
-        for idx, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
-                continue
-            yield idx, json.loads(line)
-
-def verify(event_file: str, head_file: str = "events.head") -> int:
+    for idx, _start, _end, rec in iter_records(path):
+        yield idx, rec
+
+def iter_jsonl_offsets(
+    path: str, start_offset: int = 0, start_line: int = 0
+) -> Iterable[Tuple[int, int, int, Dict[str, Any]]]:
+    """
+    Like iter_jsonl, but also yields each record's byte range:
+    (line_no, start_offset, end_offset, record).
+    """
+    return iter_records(path, start_offset=start_offset, start_line=start_line)
+
+# --- record digests: (line_no, start, end, stored_hash, prev, calc) ---
+
+Digest = Tuple[int, int, int, Optional[str], Optional[str], str]
+
+def _digest(idx: int, start: int, end: int, rec: Dict[str, Any]) -> Digest:
+    return (
+        idx, start, end,
+        rec.get("hash"),
+        rec.get("prev", rec.get("prev_hash")),
+        legacy_hash(rec),
+    )
+
+def iter_digests(path: str, start_offset: int = 0, start_line: int = 0) -> Iterable[Digest]:
+    for idx, start, end, rec in iter_jsonl_offsets(path, start_offset, start_line):
+        yield _digest(idx, start, end, rec)
+
+def _digest_range(task: Tuple[str, int, int]) -> Tuple[int, List[Digest]]:
+    """
+    Worker: hash every record in [start, end). Line numbers are relative
+    to the range; returns (lines_in_range, digests).
+    """
+    path, start, end = task
+    out: List[Digest] = []
+    lines = 0
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        while offset < end:
+            raw = f.readline()
+            if not raw:
+                break
+            lines += 1
+            rec_start, offset = offset, offset + len(raw)
+            line = raw.strip()
+            if line:
+                out.append(_digest(lines, rec_start, offset, json.loads(line)))
+    return lines, out
+
+def split_ranges(path: str, start: int, parts: int, min_bytes: int = 1 << 20) -> List[Tuple[int, int]]:
+    """Split [start, EOF) into about parts byte ranges that end on line boundaries."""
+    size = os.path.getsize(path)
+    step = max((size - start) // max(parts, 1), min_bytes)
+    ranges = []
+    with open(path, "rb") as f:
+        pos = start
+        while pos < size:
+            f.seek(min(pos + step, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((pos, end))
+            pos = end
+    return ranges
+
+def iter_digests_parallel(path: str, start_offset: int = 0, start_line: int = 0,
+                          jobs: int = 0) -> Iterable[Digest]:
+    """
+    Same stream as iter_digests, with parsing and sha256 spread over a
+    process pool. Ranges come back in file order, so the caller can do
+    the prev/hash linkage check in one cheap linear pass.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    tasks = [(path, a, b) for a, b in split_ranges(path, start_offset, jobs * 4)]
+
+    line_base = start_line
+    with multiprocessing.Pool(jobs) as pool:
+        for lines, digests in pool.imap(_digest_range, tasks):
+            for idx, start, end, stored, prev, calc in digests:
+                yield line_base + idx, start, end, stored, prev, calc
+            line_base += lines
+
+# --- verification checkpoints ---
+
+def checkpoint_path(event_file: str) -> str:
+    return event_file + ".verified"
+
+def load_checkpoint(event_file: str) -> Optional[Dict[str, Any]]:
+    """
+    Last verified position, if it still describes this file: the record
+    it points at must still be there with the same hash.
+    """
+    try:
+        with open(checkpoint_path(event_file), "r", encoding="utf-8") as f:
+            cp = json.load(f)
+        if os.path.getsize(event_file) < cp["offset"]:
+            return None
+        rec = record_at(event_file, cp["record_offset"], cp["offset"])
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return None
+
+    if not isinstance(rec, dict) or rec.get("hash") != cp["hash"] or legacy_hash(rec) != cp["hash"]:
+        return None
+    return cp
+
+def save_checkpoint(event_file: str, cp: Dict[str, Any]) -> None:
+    atomic_write_json(checkpoint_path(event_file), cp)
+
+def verify(event_file: str, head_file: str = "events.head", full: bool = False,
+           jobs: int = 1) -> int:
+    """
+    Verify the hash chain and head. Resumes after the last verified record
+    recorded in <event_file>.verified unless full=True. jobs > 1 (or 0 for
+    every core) hashes records across a process pool.
+    """
     ok = True
     expected_head = None
 
@@ -44,15 +156,28 @@ def verify(event_file: str, head_file: str = "events.head") -> int:
 
     prev_expected = "0" * 64
     last_hash = None
-
-    for idx, rec in iter_jsonl(event_file):
-        stored_hash = rec.get("hash")
+    start_offset = 0
+    start_line = 0
+
+    cp = None if full else load_checkpoint(event_file)
+    prev_cp = None
+    if cp is not None:
+        prev_expected = cp["hash"]
+        last_hash = cp["hash"]
+        start_offset = cp["offset"]
+        start_line = cp["line"]
+
+    if jobs == 1:
+        digests = iter_digests(event_file, start_offset, start_line)
+    else:
+        digests = iter_digests_parallel(event_file, start_offset, start_line, jobs)
+
+    for idx, start, end, stored_hash, prev, calc in digests:
         if not stored_hash:
             print(f"MISSING HASH at line {idx}")
             ok = False
             break
 
-        prev = rec.get("prev", rec.get("prev_hash"))
         if prev != prev_expected:
             print(f"CHAIN BREAK at line {idx}")
             print(" expected prev:", prev_expected)
@@ -60,7 +185,6 @@ def verify(event_file: str, head_file: str = "events.head") -> int:
             ok = False
             break
 
-        calc = legacy_hash(rec)
         if calc != stored_hash:
             print(f"HASH MISMATCH at line {idx}")
             print(" expected:", calc)
@@ -70,6 +194,17 @@ def verify(event_file: str, head_file: str = "events.head") -> int:
 
         prev_expected = stored_hash
         last_hash = stored_hash
+        prev_cp, cp = cp, {"offset": end, "record_offset": start, "line": idx, "hash": stored_hash}
+
+    if ok and cp is not None:
+        # Only a newline-terminated record is safe to resume after;
+        # the last line may still be mid-append
+        with open(event_file, "rb") as f:
+            f.seek(cp["offset"] - 1)
+            if f.read(1) != b"\n":
+                cp = prev_cp
+        if cp is not None:
+            save_checkpoint(event_file, cp)
 
     if ok and expected_head and last_hash and expected_head != last_hash:
         print("HEAD MISMATCH")
@@ -86,8 +221,12 @@ def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("event_file", nargs="?", default="events.jsonl")
     ap.add_argument("--head", dest="head_file", default="events.head")
+    ap.add_argument("--full", action="store_true",
+                    help="ignore the verification checkpoint and re-verify from genesis")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="hash records across N processes (0 = all cores)")
     args = ap.parse_args()
-    return verify(args.event_file, args.head_file)
+    return verify(args.event_file, args.head_file, full=args.full, jobs=args.jobs)
 
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -1,57 +1,557 @@
 import json
+import mmap
 import os
+import struct
+import tempfile
+import threading
 import time
+import zlib
+
+from atomic_file import atomic_write_json, fsync_dir, fsync_file
+
+try:
+    import crc32c as _crc32c
+except ImportError:  # optional accelerator
+    _crc32c = None
+
+
+class WALCorruption(Exception):
+    pass
+
+
+# ---------------------------------------------------------------
+# Record formats
+# ---------------------------------------------------------------
+
+def _make_crc32c_table():
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC32C_TABLE = _make_crc32c_table()
+
+
+def crc32c(data) -> int:
+    """CRC-32C (Castagnoli); uses the crc32c package when installed."""
+    if _crc32c is not None:
+        return _crc32c.crc32c(data)
+    crc = 0xFFFFFFFF
+    for b in bytes(data):
+        crc = _CRC32C_TABLE[(crc ^ b) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+class JsonCodec:
+    """
+    Original format: one json.dumps line per record.
+    """
+
+    name = "json"
+    header = b""
+
+    def encode(self, entry: dict) -> bytes:
+        return (json.dumps(entry) + "\n").encode("utf-8")
+
+    def decode(self, data):
+        """
+        Parse complete records from data.
+        Returns (entries, consumed_bytes); stops at a partial or corrupt line.
+        """
+        entries = []
+        end = data.rfind(b"\n") + 1
+        pos = 0
+        while pos < end:
+            nl = data.index(b"\n", pos) + 1
+            line = data[pos:nl].strip()
+            if line:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+            pos = nl
+        return entries, pos
+
+    def is_torn(self, tail) -> bool:
+        # Only an unterminated last line can be a torn write
+        return b"\n" not in tail
+
+
+class BinaryCodec:
+    """
+    Length-prefixed, checksummed records:
+
+        u32 payload length | u32 length checksum | u32 checksum |
+        u64 seq | i64 ts | u8 status | payload
+
+    The length prefix has its own checksum, so a damaged length is
+    reported as corruption instead of looking like a record that runs
+    past EOF. The second checksum covers everything after itself. The
+    payload is the compact JSON of the remaining entry fields and is
+    empty for commit markers. Files start with an 8-byte header naming
+    the checksum: CRC-32C when the crc32c package is available,
+    otherwise zlib's CRC-32.
+
+    Transition payloads are still JSON, so the format is not several
+    times cheaper than JsonCodec: encoding costs about the same and a
+    full read is roughly 1.3-1.4x faster. The gains are a ~35% smaller
+    log, checksummed records and exact torn-tail detection. Without the
+    crc32c package, CRC-32C falls back to pure Python and is slow, which
+    is why new files default to zlib's CRC-32 there.
+    """
+
+    name = "binary"
+    MAGIC = b"WALB\x02"
+    RECORD = struct.Struct("<IIIQqB")
+    _LENGTH = struct.Struct("<I")
+    _PREFIX = struct.Struct("<II")
+    _BODY = struct.Struct("<QqB")
+
+    CHECKSUMS = {1: zlib.crc32, 2: crc32c}
+
+    STATUS_CODES = {"pending": 1, "committed": 2, "failed": 3}
+    STATUS_NAMES = {v: k for k, v in STATUS_CODES.items()}
+
+    def __init__(self, checksum_id=None):
+        if checksum_id is None:
+            checksum_id = 2 if _crc32c is not None else 1
+        self.checksum_id = checksum_id
+        self.checksum = self.CHECKSUMS[checksum_id]
+        self.header = self.MAGIC + bytes([checksum_id]) + b"\x00\x00"
+
+    def encode(self, entry: dict) -> bytes:
+        status = self.STATUS_CODES.get(entry.get("status"), 0)
+
+        rest = dict(entry)
+        seq = rest.pop("seq")
+        ts = rest.pop("ts", 0)
+        if status:
+            del rest["status"]
+        payload = json.dumps(rest, separators=(",", ":")).encode("utf-8") if rest else b""
+
+        length = self._LENGTH.pack(len(payload))
+        body = self._BODY.pack(seq, ts, status) + payload
+        return length + self._PREFIX.pack(self.checksum(length), self.checksum(body)) + body
+
+    def decode(self, data):
+        entries = []
+        append = entries.append
+        unpack = self.RECORD.unpack_from
+        size = self.RECORD.size
+        checksum = self.checksum
+        names = self.STATUS_NAMES
+        loads = json.loads
+
+        view = memoryview(data)
+        n = len(view)
+        pos = 0
+        while n - pos >= size:
+            length, length_crc, crc, seq, ts, status = unpack(view, pos)
+            end = pos + size + length
+            if checksum(view[pos:pos + 4]) != length_crc:
+                break
+            if end > n or checksum(view[pos + 12:end]) != crc:
+                break
+
+            entry = {"seq": seq, "ts": ts}
+            if status:
+                entry["status"] = names[status]
+            if length:
+                entry.update(loads(bytes(view[pos + size:end])))
+            append(entry)
+            pos = end
+        return entries, pos
+
+    def is_torn(self, tail) -> bool:
+        # Torn only when the bad record both starts and ends at EOF: too
+        # short for a header, or a verified length that reaches EOF. A
+        # length prefix failing its own checksum is damage, never a tail.
+        if len(tail) < self.RECORD.size:
+            return True
+        length, length_crc = self._PREFIX.unpack_from(tail, 0)
+        if self.checksum(bytes(tail[:4])) != length_crc:
+            return False
+        return self.RECORD.size + length >= len(tail)
+
+
+RECORD_FORMATS = ("json", "binary")
+
+
+def detect_codec(path, record_format=None):
+    """
+    Codec for the file at path. Existing non-empty files keep their own
+    format; new or empty files use record_format (default json).
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(len(BinaryCodec.MAGIC) + 1)
+    except FileNotFoundError:
+        head = b""
+
+    if head.startswith(BinaryCodec.MAGIC) and len(head) > len(BinaryCodec.MAGIC):
+        return BinaryCodec(head[len(BinaryCodec.MAGIC)])
+    if head.startswith(BinaryCodec.MAGIC[:4]):
+        raise WALCorruption(f"{path}: unsupported binary WAL header {head!r}")
+    if head:
+        return JsonCodec()
+
+    if record_format in (None, "json"):
+        return JsonCodec()
+    if record_format == "binary":
+        return BinaryCodec()
+    raise ValueError(f"Unknown WAL record format: {record_format}")
+
+
+class _GroupWrite:
+    """A record waiting in the group-commit queue."""
+
+    __slots__ = ("data", "done", "error")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.done = threading.Event()
+        self.error = None
 
 
 class WAL:
     """
     Write-Ahead Log.
     Guarantees transitions are persisted before state mutation.
+
+    With group_commit=True, records from concurrent writers are queued and
+    a single flusher thread writes them with one fsync per batch. A batch
+    is flushed once it holds max_batch records or max_delay seconds have
+    passed since its first record arrived. Every caller still blocks until
+    its own record is durable, so on-disk format and crash semantics are
+    unchanged.
+
+    The log owns one long-lived O_APPEND descriptor (O_DSYNC when dsync=True)
+    and stages records in a preallocated buffer. The descriptor is reopened
+    if the path is rotated underneath it. Use close() or a with-block to
+    release it.
+
+    record_format="binary" selects length-prefixed, checksummed records
+    (see BinaryCodec) for a new log; existing files keep their format.
     """
 
-    def __init__(self, path="wal.log"):
+    def __init__(self, path="wal.log", group_commit=False, max_batch=256, max_delay=0.002,
+                 dsync=False, buffer_size=64 * 1024, record_format=None):
         self.path = path
         self.sequence = 0
 
-        # Ensure file exists
-        if not os.path.exists(self.path):
-            open(self.path, "w").close()
+        self.record_format = record_format
+        self.codec = detect_codec(path, record_format)
+
+        self.dsync = dsync
+        self._fd = None
+        self._fd_id = None
+        self._buf = bytearray(buffer_size)
+        self._io_lock = threading.Lock()
+
+        self.group_commit = group_commit
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._closed = False
+        self._flusher = None
+
+        # Tail index: committed count and last seq up to _scan_offset
+        self._reset_index()
+        self._scan_lock = threading.Lock()
+        self._scan_offset = 0
+        self._scan_id = None
+
+        # Ensure file exists and hold it open for appends
+        self._open()
 
         # Recover latest sequence number
         self._recover_sequence()
 
+        if self.group_commit:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="wal-flusher", daemon=True
+            )
+            self._flusher.start()
+
     def _recover_sequence(self):
         """Determine last used sequence number from WAL."""
+        with self._scan_lock:
+            self._catch_up()
+
+    def _catch_up(self):
+        """
+        Fold records appended since the last scan into the in-memory index.
+        Only the bytes past the last known offset are read, so the cost is
+        proportional to new records (ours or another process's), not to
+        the length of the log. Caller holds self._scan_lock.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+
+        file_id = (st.st_dev, st.st_ino)
+        if file_id != self._scan_id or st.st_size < self._scan_offset:
+            # Rotated or truncated: the index describes a different file
+            self._scan_id = file_id
+            self._scan_offset = 0
+            self._reset_index()
+
+        if self._scan_offset < len(self.codec.header):
+            if st.st_size < len(self.codec.header):
+                return
+            self._scan_offset = len(self.codec.header)
+
+        if st.st_size == self._scan_offset:
+            return
+
+        # Fold one bounded chunk at a time so memory follows READ_CHUNK,
+        # not the length of the unscanned log. Only complete records are
+        # indexed; a torn tail is picked up once it is finished, and a
+        # corrupt record halts indexing for the higher layer.
+        chunk_size = self.READ_CHUNK
+        with open(self.path, "rb") as f:
+            while self._scan_offset < st.st_size:
+                f.seek(self._scan_offset)
+                chunk = f.read(min(chunk_size, st.st_size - self._scan_offset))
+
+                entries, consumed = self.codec.decode(chunk)
+                for entry in entries:
+                    self._index(entry)
+
+                if consumed:
+                    self._scan_offset += consumed
+                elif self._scan_offset + len(chunk) < st.st_size:
+                    # A record larger than the chunk: widen and retry
+                    chunk_size *= 2
+                else:
+                    break
+
+    def _reset_index(self):
+        self.committed = 0
+        self.last_committed_seq = 0
+
+    def _index(self, entry: dict):
+        if "seq" in entry:
+            self.sequence = max(self.sequence, entry["seq"])
+        if entry.get("status") == "committed":
+            self.committed += 1
+            self.last_committed_seq = max(self.last_committed_seq, entry["seq"])
+
+    def committed_count(self) -> int:
+        """
+        Number of committed transitions on disk.
+        Costs a stat plus a read of any bytes appended since the last call.
+        """
+        with self._scan_lock:
+            self._catch_up()
+            return self.committed
+
+    def dropped_seq(self) -> int:
+        """Highest seq no longer held in the log (0: nothing dropped)."""
+        return 0
+
+    def repair(self) -> int:
+        """
+        Truncate a torn tail left by a crash mid-write.
+        Returns the number of bytes removed. Raises WALCorruption when
+        unreadable bytes are followed by more data, since that is damage
+        rather than an interrupted append.
+        """
+        with self._io_lock, self._scan_lock:
+            self._catch_up()
+
+            size = os.path.getsize(self.path)
+            if size <= self._scan_offset:
+                return 0
+
+            with open(self.path, "rb") as f:
+                f.seek(self._scan_offset)
+                tail = f.read()
+
+            if not self.codec.is_torn(tail):
+                raise WALCorruption(
+                    f"{self.path}: unreadable record at byte {self._scan_offset}"
+                )
+
+            os.truncate(self.path, self._scan_offset)
+            return size - self._scan_offset
+
+    # --- file handle ---
+
+    def _open(self):
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        if self.dsync:
+            flags |= getattr(os, "O_DSYNC", 0)
+
+        fd = os.open(self.path, flags, 0o644)
+        st = os.fstat(fd)
+        if st.st_size == 0 and self.codec.header:
+            os.write(fd, self.codec.header)
+        self._fd = fd
+        self._fd_id = (st.st_dev, st.st_ino)
+
+    def _ensure_open(self):
+        """Reopen the append handle if the path was rotated or removed."""
         try:
-            with open(self.path, "r") as f:
-                for line in f:
-                    entry = json.loads(line.strip())
-                    if "seq" in entry:
-                        self.sequence = max(self.sequence, entry["seq"])
-        except Exception:
-            # Corrupt WAL should halt higher layer
-            pass
+            st = os.stat(self.path)
+            current = (st.st_dev, st.st_ino)
+        except FileNotFoundError:
+            current = None
+
+        if self._fd is not None and current == self._fd_id:
+            return
+
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._open()
+
+    def reopen(self):
+        """Force the append handle onto the file currently at self.path."""
+        with self._io_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._open()
+
+    def _write_durable(self, chunks):
+        """
+        Write encoded records with a single write + fsync.
+        Small batches are staged in the preallocated buffer.
+        """
+        with self._io_lock:
+            self._ensure_open()
+
+            size = sum(len(c) for c in chunks)
+            if size <= len(self._buf):
+                pos = 0
+                for c in chunks:
+                    self._buf[pos:pos + len(c)] = c
+                    pos += len(c)
+                view = memoryview(self._buf)[:size]
+            else:
+                view = memoryview(b"".join(chunks))
+
+            while view:
+                written = os.write(self._fd, view)
+                view = view[written:]
+
+            if not self.dsync:
+                os.fsync(self._fd)
+
+    # --- durable write path ---
+
+    def _write(self, entry: dict):
+        """
+        Persist one entry. Returns only once the entry is fsynced.
+        Must be called with self._cond held so file order follows seq order.
+        """
+        if self._closed:
+            raise RuntimeError("WAL is closed")
+
+        data = self.codec.encode(entry)
+
+        if not self.group_commit:
+            self._write_durable([data])
+            return None
+
+        waiter = _GroupWrite(data)
+        self._queue.append(waiter)
+        self._cond.notify_all()
+        return waiter
+
+    def _wait(self, waiter):
+        if waiter is None:
+            return
+        waiter.done.wait()
+        if waiter.error is not None:
+            raise waiter.error
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+
+                if not self._queue:
+                    return
+
+                # Latency window: let the batch fill up, bounded by max_delay
+                deadline = time.monotonic() + self.max_delay
+                while len(self._queue) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = self._queue[:self.max_batch]
+                del self._queue[:self.max_batch]
+
+            try:
+                self._write_durable([w.data for w in batch])
+            except Exception as e:
+                for w in batch:
+                    w.error = e
+
+            for w in batch:
+                w.done.set()
+
+    def close(self):
+        """
+        Drain the group-commit queue and release the append handle.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+
+        with self._io_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --- public API ---
 
     def append(self, transition: dict) -> int:
         """
         Append transition to WAL with pending status.
         Returns sequence number.
         """
-        self.sequence += 1
+        with self._cond:
+            # Pick up sequence numbers used by other writers of this file
+            with self._scan_lock:
+                self._catch_up()
 
-        entry = {
-            "seq": self.sequence,
-            "ts": time.monotonic_ns(),
-            "status": "pending",
-            "transition": transition
-        }
+            self.sequence += 1
+            seq = self.sequence
 
-        with open(self.path, "a") as f:
-            f.write(json.dumps(entry) + "\n")
-            f.flush()
-            os.fsync(f.fileno())
+            entry = {
+                "seq": seq,
+                "ts": time.monotonic_ns(),
+                "status": "pending",
+                "transition": transition
+            }
 
-        return self.sequence
+            waiter = self._write(entry)
+
+        self._wait(waiter)
+        return seq
 
     def mark_committed(self, seq: int):
         """
@@ -63,10 +563,9 @@ class WAL:
             "status": "committed"
         }
 
-        with open(self.path, "a") as f:
-            f.write(json.dumps(entry) + "\n")
-            f.flush()
-            os.fsync(f.fileno())
+        with self._cond:
+            waiter = self._write(entry)
+        self._wait(waiter)
 
     def mark_failed(self, seq: int, reason: str):
         """
@@ -79,18 +578,354 @@ class WAL:
             "reason": reason
         }
 
-        with open(self.path, "a") as f:
-            f.write(json.dumps(entry) + "\n")
-            f.flush()
-            os.fsync(f.fileno())
+        with self._cond:
+            waiter = self._write(entry)
+        self._wait(waiter)
+
+    READ_CHUNK = 1024 * 1024
+
+    def _iter_file(self, path, offset=0, use_mmap=False):
+        """
+        Yield each record in path after byte offset, decoding one bounded
+        chunk at a time. Sealed files can be mmapped.
+        """
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+
+            if use_mmap:
+                source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                source = f
+
+            try:
+                pos = max(offset, len(self.codec.header))
+                chunk_size = self.READ_CHUNK
+                while pos < size:
+                    if use_mmap:
+                        chunk = source[pos:pos + chunk_size]
+                    else:
+                        f.seek(pos)
+                        chunk = f.read(chunk_size)
+
+                    entries, consumed = self.codec.decode(chunk)
+                    yield from entries
+
+                    if consumed:
+                        pos += consumed
+                    elif pos + len(chunk) < size:
+                        # A record larger than the chunk: widen and retry
+                        chunk_size *= 2
+                    else:
+                        if not self.codec.is_torn(chunk):
+                            raise WALCorruption(f"{path}: unreadable record at byte {pos}")
+                        return
+            finally:
+                if use_mmap:
+                    source.close()
+
+    def _read_file(self, path):
+        return list(self._iter_file(path))
+
+    def iter_entries(self, from_seq=0, from_offset=0):
+        """
+        Lazily yield WAL entries with seq >= from_seq, starting at byte
+        from_offset. Memory stays bounded by the read chunk, not the log.
+        """
+        for entry in self._iter_file(self.path, from_offset):
+            if entry.get("seq", 0) >= from_seq:
+                yield entry
 
     def read_all(self):
         """
         Read all WAL entries.
         """
-        entries = []
-        with open(self.path, "r") as f:
-            for line in f:
-                if line.strip():
-                    entries.append(json.loads(line.strip()))
-        return entries
+        return list(self.iter_entries())
+
+
+class SegmentedWAL(WAL):
+    """
+    WAL split into fixed-size segments inside a directory.
+
+    Records go to the active segment (wal-000001.log, wal-000002.log, ...).
+    Once it reaches segment_bytes it is sealed read-only and its seq range
+    and committed count are recorded in manifest.json, so sequence discovery
+    and version checks only read the manifest and the active segment.
+
+    A segmented WAL has a single writing process; other processes may read
+    it and follow rotations through the manifest.
+    """
+
+    MANIFEST = "manifest.json"
+    DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, directory="wal.d", segment_bytes=None, **options):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, self.MANIFEST)
+        os.makedirs(directory, exist_ok=True)
+
+        self._manifest_id = None
+        self._load_manifest(options.get("record_format") or "json")
+
+        # Every segment uses the format recorded when the WAL was created
+        options["record_format"] = self.manifest.get("record_format", "json")
+
+        if segment_bytes is not None:
+            self.manifest["segment_bytes"] = segment_bytes
+        self.segment_bytes = self.manifest["segment_bytes"]
+
+        super().__init__(self._active_path(), **options)
+
+    # --- manifest ---
+
+    @staticmethod
+    def segment_name(n: int) -> str:
+        return f"wal-{n:06d}.log"
+
+    def _active_path(self):
+        return os.path.join(self.directory, self.manifest["segments"][-1]["name"])
+
+    def _load_manifest(self, record_format="json"):
+        try:
+            with open(self.manifest_path, "r") as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            self.manifest = {
+                "segment_bytes": self.DEFAULT_SEGMENT_BYTES,
+                "record_format": record_format,
+                # Totals for segments dropped after a checkpoint
+                "base": {"committed": 0, "last_seq": 0},
+                "segments": [self._new_segment(1)],
+            }
+            self._write_manifest()
+
+        st = os.stat(self.manifest_path)
+        self._manifest_id = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+        sealed = [s for s in self.manifest["segments"] if s["sealed"]]
+        base = self.manifest["base"]
+        self._sealed_committed = base["committed"] + sum(s["committed"] for s in sealed)
+        self._sealed_last_seq = max([base["last_seq"]] + [s["last_seq"] or 0 for s in sealed])
+
+    def _new_segment(self, n: int) -> dict:
+        return {
+            "name": self.segment_name(n),
+            "first_seq": None,
+            "last_seq": None,
+            "committed": 0,
+            "bytes": 0,
+            "sealed": False,
+        }
+
+    def _write_manifest(self):
+        """Atomically replace manifest.json (tmp + fsync + rename)."""
+        st = atomic_write_json(self.manifest_path, self.manifest, indent=2)
+        self._manifest_id = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    # --- index ---
+
+    def _reset_index(self):
+        super()._reset_index()
+        self.segment_first_seq = None
+        self.segment_last_seq = None
+
+    def _index(self, entry: dict):
+        super()._index(entry)
+        seq = entry.get("seq")
+        if seq is not None:
+            if self.segment_first_seq is None:
+                self.segment_first_seq = seq
+            self.segment_last_seq = max(self.segment_last_seq or 0, seq)
+
+    def _catch_up(self):
+        # Follow rotations made by the writing process
+        st = os.stat(self.manifest_path)
+        if (st.st_ino, st.st_mtime_ns, st.st_size) != self._manifest_id:
+            self._load_manifest()
+            self.path = self._active_path()
+
+        self.sequence = max(self.sequence, self._sealed_last_seq)
+        super()._catch_up()
+
+    def committed_count(self) -> int:
+        with self._scan_lock:
+            self._catch_up()
+            return self._sealed_committed + self.committed
+
+    def dropped_seq(self) -> int:
+        with self._scan_lock:
+            self._catch_up()
+            return self.manifest["base"]["last_seq"]
+
+    # --- rotation ---
+
+    def _write_durable(self, chunks):
+        super()._write_durable(chunks)
+        if os.fstat(self._fd).st_size >= self.segment_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        """Seal the active segment and start the next one."""
+        with self._io_lock, self._scan_lock:
+            # Index the whole active segment before sealing it
+            WAL._catch_up(self)
+
+            active = self.manifest["segments"][-1]
+            active.update(
+                first_seq=self.segment_first_seq,
+                last_seq=self.segment_last_seq,
+                committed=self.committed,
+                bytes=self._scan_offset,
+                sealed=True,
+            )
+
+            os.close(self._fd)
+            self._fd = None
+            os.chmod(self.path, 0o444)
+
+            n = int(active["name"][len("wal-"):-len(".log")]) + 1
+            self.manifest["segments"].append(self._new_segment(n))
+            self._write_manifest()
+
+            self._sealed_committed += active["committed"]
+            self._sealed_last_seq = max(self._sealed_last_seq, active["last_seq"] or 0)
+
+            self.path = self._active_path()
+            self._open()
+
+    def drop_segments(self, upto_seq: int, checkpoints, archive_dir=None) -> list:
+        """
+        Remove sealed segments whose records all have seq <= upto_seq.
+        Segments are moved into archive_dir instead when one is given.
+        Returns the dropped names.
+
+        Recovery needs a checkpoint for everything dropped, so upto_seq
+        may not pass the seq covered by the newest valid checkpoint in
+        checkpoints (a CheckpointStore); ValueError otherwise.
+        """
+        cp = checkpoints.latest()
+        covered = cp["seq"] if cp is not None else 0
+        if upto_seq > covered:
+            raise ValueError(f"cannot drop past seq {covered}: no checkpoint covers seq {upto_seq}")
+
+        dropped = []
+        with self._io_lock, self._scan_lock:
+            segments = self.manifest["segments"]
+            base = self.manifest["base"]
+
+            while segments[0]["sealed"] and (segments[0]["last_seq"] or 0) <= upto_seq:
+                seg = segments.pop(0)
+                src = os.path.join(self.directory, seg["name"])
+
+                if archive_dir is not None:
+                    os.makedirs(archive_dir, exist_ok=True)
+                    os.replace(src, os.path.join(archive_dir, seg["name"]))
+                elif os.path.exists(src):
+                    os.remove(src)
+
+                base["committed"] += seg["committed"]
+                base["last_seq"] = max(base["last_seq"], seg["last_seq"] or 0)
+                dropped.append(seg["name"])
+
+            if dropped:
+                self._write_manifest()
+
+        return dropped
+
+    # --- reads ---
+
+    def segment_paths(self):
+        return [os.path.join(self.directory, s["name"]) for s in self.manifest["segments"]]
+
+    def iter_entries(self, from_seq=0, from_offset=0):
+        """
+        Lazily yield entries with seq >= from_seq, oldest first. Sealed
+        segments that end before from_seq are skipped via the manifest and
+        the rest are mmapped; from_offset applies to the first segment read.
+        """
+        with self._scan_lock:
+            self._catch_up()
+            segments = [dict(s) for s in self.manifest["segments"]]
+
+        first = True
+        for seg in segments:
+            if seg["sealed"] and (seg["last_seq"] or 0) < from_seq:
+                continue
+
+            path = os.path.join(self.directory, seg["name"])
+            offset = from_offset if first else 0
+            first = False
+
+            for entry in self._iter_file(path, offset, use_mmap=seg["sealed"]):
+                if entry.get("seq", 0) >= from_seq:
+                    yield entry
+
+    def read_all(self):
+        """
+        Read all WAL entries still held in segments, oldest first.
+        """
+        return list(self.iter_entries())
+
+
+def convert_wal(src, dst, record_format="binary", batch_bytes=1024 * 1024) -> int:
+    """
+    Rewrite the single-file WAL at src into dst using record_format.
+    Records are streamed and written in batches of about batch_bytes, so
+    memory stays bounded by the batch rather than the log. A torn tail in
+    src is dropped. Returns the number of records written.
+
+    Output goes to a temp file next to dst that is linked into place only
+    once the conversion succeeds, so a failed run leaves no dst behind and
+    can simply be retried. An existing dst is never replaced.
+    """
+    if not os.path.isfile(src):
+        raise FileNotFoundError(src)
+    if os.path.exists(dst):
+        raise FileExistsError(dst)
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(dst)),
+                               prefix=os.path.basename(dst) + ".", suffix=".tmp")
+    os.close(fd)
+
+    count = 0
+    try:
+        reader = WAL(src)
+        try:
+            writer = WAL(tmp, record_format=record_format)
+            try:
+                batch, size = [], 0
+                for entry in reader.iter_entries():
+                    data = writer.codec.encode(entry)
+                    batch.append(data)
+                    size += len(data)
+                    count += 1
+                    if size >= batch_bytes:
+                        writer._write_durable(batch)
+                        batch, size = [], 0
+                if batch:
+                    writer._write_durable(batch)
+            finally:
+                writer.close()
+        finally:
+            reader.close()
+
+        os.chmod(tmp, 0o644)
+        fsync_file(tmp)
+        # link() fails rather than replace a dst created meanwhile
+        os.link(tmp, dst)
+    finally:
+        os.remove(tmp)
+
+    fsync_dir(dst)
+    return count
+
+
+def open_wal(path="wal.log", segment_bytes=None, **options):
+    """
+    Open a WAL at path: a SegmentedWAL when path is a segment directory
+    or segment_bytes is given, otherwise a single-file WAL.
+    """
+    if segment_bytes is not None or os.path.isdir(path):
+        return SegmentedWAL(path, segment_bytes=segment_bytes, **options)
+    return WAL(path, **options)
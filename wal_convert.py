@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+
+from wal import RECORD_FORMATS, convert_wal
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Convert a WAL file between record formats")
+    ap.add_argument("src", help="existing WAL file, e.g. wal.log")
+    ap.add_argument("dst", help="new WAL file to write")
+    ap.add_argument("--format", choices=RECORD_FORMATS, default="binary")
+    args = ap.parse_args()
+
+    count = convert_wal(args.src, args.dst, args.format)
+
+    print("CONVERT OK")
+    print("records:", count)
+    print("format:", args.format)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())